@@ -3,6 +3,7 @@ __description__ = "One-stop solution for HTTP(S) testing."
 
 # import firstly for monkey patch if needed
 from rrtv_httprunner import globalvar
+from rrtv_httprunner.cache import memoize
 from rrtv_httprunner.ext.locust import main_locusts
 from rrtv_httprunner.parser import parse_parameters as Parameters
 from rrtv_httprunner.runner import HttpRunner
@@ -18,4 +19,5 @@ __all__ = [
     "RunRequest",
     "RunTestCase",
     "Parameters",
+    "memoize",
 ]
@@ -0,0 +1,165 @@
+import collections
+import contextvars
+import functools
+import threading
+import time
+from typing import Any, Callable, Dict, List, Tuple, Union
+
+DEFAULT_MAXSIZE = 1024
+
+# scope of current testcase run, copied to threads and tasks running its teststeps
+current_scope: contextvars.ContextVar = contextvars.ContextVar(
+    "function_cache_scope", default=None
+)
+
+
+class FunctionCacheScope(object):
+    """ results of memoized functions without ttl and hits/misses of memoized functions
+        in scope of one testcase run, HttpRunner enters a new scope for each testcase run,
+        thus concurrent testcases never share or clear results of each other.
+
+    Examples:
+        >>> with FunctionCacheScope() as scope:
+        ...     gen_app_version()
+        >>> scope.get_stat(gen_app_version.function_cache)
+        (0, 1)
+
+    """
+
+    def __init__(self):
+        # they are only accessed with lock of the function cache
+        self.entries: Dict["FunctionCache", collections.OrderedDict] = {}
+        self.stats: Dict["FunctionCache", List[int]] = {}
+        self.__tokens: List[contextvars.Token] = []
+
+    def get_stat(self, cache: "FunctionCache") -> Tuple[int, int]:
+        """ get hits and misses of function cache in this scope
+        """
+        hits, misses = self.stats.get(cache, (0, 0))
+        return hits, misses
+
+    def __enter__(self) -> "FunctionCacheScope":
+        self.__tokens.append(current_scope.set(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        current_scope.reset(self.__tokens.pop())
+
+
+class FunctionCache(object):
+    """ memo cache of function results keyed on arguments, at most maxsize results are kept,
+        least recently used results are evicted first.
+
+        entries expire after ttl seconds and are shared by all testcases if ttl is specified,
+        otherwise entries live in scope of current testcase run, see FunctionCacheScope,
+        they are kept in the cache itself if function is called outside any testcase run.
+    """
+
+    def __init__(
+            self,
+            func: Callable,
+            ttl: Union[float, None] = None,
+            maxsize: int = DEFAULT_MAXSIZE,
+    ):
+        self.func = func
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.__entries: collections.OrderedDict = collections.OrderedDict()
+        self.__lock = threading.Lock()
+
+    def __call__(self, *args, **kwargs) -> Any:
+        key = (args, tuple(sorted(kwargs.items()))) if kwargs else (args,)
+        scope = current_scope.get()
+        try:
+            hash(key)
+        except TypeError:
+            # unhashable arguments, e.g. list or dict, are not cached
+            with self.__lock:
+                self.__count(scope, hit=False)
+            return self.func(*args, **kwargs)
+
+        now = time.monotonic()
+        with self.__lock:
+            entries = self.__get_entries(scope)
+            entry = entries.get(key)
+            if entry is not None and (self.ttl is None or now - entry[0] < self.ttl):
+                if self.ttl is None:
+                    entries.move_to_end(key)
+                self.__count(scope, hit=True)
+                return entry[1]
+
+            self.__count(scope, hit=False)
+
+        value = self.func(*args, **kwargs)
+        with self.__lock:
+            entries[key] = (now, value)
+            entries.move_to_end(key)
+            self.__evict(entries, now)
+
+        return value
+
+    def __get_entries(self, scope: Union[FunctionCacheScope, None]) -> collections.OrderedDict:
+        if self.ttl is not None or scope is None:
+            return self.__entries
+
+        try:
+            return scope.entries[self]
+        except KeyError:
+            entries = scope.entries[self] = collections.OrderedDict()
+            return entries
+
+    def __count(self, scope: Union[FunctionCacheScope, None], hit: bool):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+        if scope is not None:
+            scope.stats.setdefault(self, [0, 0])[0 if hit else 1] += 1
+
+    def __evict(self, entries: collections.OrderedDict, now: float):
+        if self.ttl is not None:
+            # entries with ttl are not reordered on hits, the first ones expire first
+            while entries and now - next(iter(entries.values()))[0] >= self.ttl:
+                entries.popitem(last=False)
+
+        while len(entries) > self.maxsize:
+            entries.popitem(last=False)
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+
+
+def memoize(
+        func: Callable = None,
+        ttl: Union[float, None] = None,
+        maxsize: int = DEFAULT_MAXSIZE,
+) -> Callable:
+    """ mark function in debugtalk.py or service modules as cacheable, its results are
+        memoized per testcase run, or for ttl seconds if specified.
+        only use it for functions which are deterministic or change slowly.
+
+    Examples:
+        >>> from rrtv_httprunner import memoize
+        >>> @memoize
+        ... def gen_app_version():
+        ...     return [{"app_version": "2.8.5"}, {"app_version": "2.8.6"}]
+        >>> @memoize(ttl=60, maxsize=100)
+        ... def get_sign_key(app_id):
+        ...     return requests.get(f"https://example.com/keys/{app_id}").text
+
+    """
+    if func is None:
+        return functools.partial(memoize, ttl=ttl, maxsize=maxsize)
+
+    cache = FunctionCache(func, ttl, maxsize)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return cache(*args, **kwargs)
+
+    wrapper.function_cache = cache
+    return wrapper
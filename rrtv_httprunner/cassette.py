@@ -0,0 +1,229 @@
+""" record http exchanges of testcases to cassette file, and replay them without network.
+
+Each line of cassette file is an exchange, prefixed with fingerprint of its request:
+
+    <fingerprint>\t{"status": 200, "reason": "OK", "headers": [...], "body": "<base64>"}
+
+exchanges are matched by method, url and body of request, headers are ignored since they
+contain variable values, e.g. HRUN-Request-ID. exchanges with the same fingerprint are replayed in
+the recorded order, and the last one is repeated once they are exhausted. response body is
+recorded decoded, thus its Content-Encoding and Content-Length headers are rewritten to match it.
+
+    $ hrun testcases/ --record-cassette logs/demo.cassette
+    $ hrun testcases/ --replay-cassette logs/demo.cassette
+
+"""
+
+import base64
+import copy
+import hashlib
+import http.client
+import json
+import mmap
+import os
+import threading
+from typing import Dict, List, NoReturn, Text
+
+from loguru import logger
+from requests import PreparedRequest, Response
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.exceptions import ConnectionError
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from rrtv_httprunner.client import InstrumentedHTTPAdapter
+
+
+def get_request_fingerprint(request: PreparedRequest) -> Text:
+    body = request.body
+    if isinstance(body, Text):
+        body = body.encode("utf-8")
+    elif not isinstance(body, bytes):
+        # streaming body, e.g. MultipartEncoder with random boundary
+        body = b""
+
+    fingerprint = hashlib.sha1(f"{request.method} {request.url}\n".encode("utf-8"))
+    fingerprint.update(body)
+    return fingerprint.hexdigest()
+
+
+def get_recorded_headers(response: Response) -> List[List[Text]]:
+    """ get headers of response matching its decoded body, which is recorded to cassette,
+        duplicated headers are kept, e.g. Set-Cookie.
+    """
+    decoders = getattr(response.raw, "CONTENT_DECODERS", ["gzip", "x-gzip", "deflate"])
+    encodings = [
+        encoding.strip().lower()
+        for encoding in response.raw.headers.get("Content-Encoding", "").split(",")
+        if encoding.strip()
+    ]
+    # body is decoded by urllib3 if all its encodings are supported
+    decoded = bool(encodings) and all(encoding in decoders for encoding in encodings)
+
+    headers = []
+    for key, value in response.raw.headers.items():
+        if key.lower() in ("content-length", "transfer-encoding"):
+            continue
+        if decoded and key.lower() == "content-encoding":
+            continue
+        headers.append([key, value])
+
+    headers.append(["Content-Length", str(len(response.content))])
+    return headers
+
+
+class RecordCassetteAdapter(BaseAdapter):
+    """ send requests with wrapped adapter, and append exchanges to cassette file.
+    """
+
+    def __init__(self, cassette_path: Text, adapter: HTTPAdapter = None):
+        super(RecordCassetteAdapter, self).__init__()
+        cassette_dir = os.path.dirname(cassette_path)
+        if cassette_dir:
+            os.makedirs(cassette_dir, exist_ok=True)
+
+        self.cassette_path = cassette_path
+        self.adapter = adapter or InstrumentedHTTPAdapter()
+        self.__file = open(cassette_path, "w", encoding="utf-8")
+        self.__lock = threading.Lock()
+
+    def with_adapter(self, adapter: HTTPAdapter) -> "RecordCassetteAdapter":
+        """ record requests sent with adapter to the same cassette file, e.g. shared adapter of
+            connection pool, thus its pool settings and network timing are kept.
+        """
+        wrapped = copy.copy(self)
+        wrapped.adapter = adapter
+        return wrapped
+
+    def send(self, request: PreparedRequest, **kwargs) -> Response:
+        response = self.adapter.send(request, **kwargs)
+        # redirects are sent with response.connection
+        response.connection = self
+        exchange = {
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": get_recorded_headers(response),
+            "body": base64.b64encode(response.content).decode("ascii"),
+        }
+        line = f"{get_request_fingerprint(request)}\t{json.dumps(exchange)}\n"
+        with self.__lock:
+            self.__file.write(line)
+            self.__file.flush()
+
+        return response
+
+    def close(self) -> NoReturn:
+        self.adapter.close()
+
+    def close_cassette(self) -> NoReturn:
+        with self.__lock:
+            self.__file.close()
+
+
+class ReplayedRawResponse(object):
+    """ raw response of replayed exchange, only used to extract cookies by requests.
+    """
+
+    def __init__(self, headers: List[List[Text]]):
+        self._original_response = self
+        self.msg = http.client.HTTPMessage()
+        for key, value in headers:
+            self.msg[key] = value
+
+    def close(self) -> NoReturn:
+        pass
+
+
+class ReplayCassetteAdapter(BaseAdapter):
+    """ serve requests with exchanges recorded in cassette file, cassette file is mmapped and
+        exchanges are indexed by request fingerprint.
+    """
+
+    def __init__(self, cassette_path: Text):
+        super(ReplayCassetteAdapter, self).__init__()
+        self.cassette_path = cassette_path
+        with open(cassette_path, "rb") as f:
+            # empty file can not be mmapped
+            self.__mmap = (
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                if os.path.getsize(cassette_path) else b""
+            )
+
+        self.__offsets: Dict[Text, List[int]] = {}
+        offset = 0
+        while offset < len(self.__mmap):
+            line_end = self.__mmap.find(b"\n", offset)
+            if line_end == -1:
+                line_end = len(self.__mmap)
+            fingerprint = self.__mmap[offset:self.__mmap.find(b"\t", offset)].decode("ascii")
+            self.__offsets.setdefault(fingerprint, []).append(offset)
+            offset = line_end + 1
+
+        self.__replayed_times: Dict[Text, int] = {}
+        self.__lock = threading.Lock()
+        self.__adapter_ignored = False
+        exchanges_count = sum(len(offsets) for offsets in self.__offsets.values())
+        logger.info(f"load {exchanges_count} exchanges from cassette: {cassette_path}")
+
+    def send(self, request: PreparedRequest, **kwargs) -> Response:
+        fingerprint = get_request_fingerprint(request)
+        offsets = self.__offsets.get(fingerprint)
+        if not offsets:
+            raise ConnectionError(
+                f"request not recorded in cassette {self.cassette_path}: "
+                f"{request.method} {request.url}",
+                request=request,
+            )
+
+        with self.__lock:
+            replayed_times = self.__replayed_times.get(fingerprint, 0)
+            self.__replayed_times[fingerprint] = replayed_times + 1
+
+        offset = offsets[min(replayed_times, len(offsets) - 1)]
+        line = self.__mmap[offset:self.__mmap.find(b"\n", offset)]
+        exchange = json.loads(line[line.index(b"\t") + 1:])
+
+        response = Response()
+        response.status_code = exchange["status"]
+        response.reason = exchange["reason"]
+        response.headers = CaseInsensitiveDict()
+        for key, value in exchange["headers"]:
+            # duplicated headers are joined as requests does
+            if key in response.headers:
+                response.headers[key] = f"{response.headers[key]}, {value}"
+            else:
+                response.headers[key] = value
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = base64.b64decode(exchange["body"])
+        response._content_consumed = True
+        response.raw = ReplayedRawResponse(exchange["headers"])
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def with_adapter(self, adapter: HTTPAdapter) -> "ReplayCassetteAdapter":
+        """ requests are never sent while replaying, adapter and its pool settings are ignored
+        """
+        if not self.__adapter_ignored:
+            self.__adapter_ignored = True
+            logger.warning(
+                f"connection pool settings are ignored while replaying cassette: {self.cassette_path}"
+            )
+        return self
+
+    def close(self) -> NoReturn:
+        pass
+
+    def close_cassette(self) -> NoReturn:
+        if isinstance(self.__mmap, mmap.mmap):
+            self.__mmap.close()
+
+
+def open_cassette(record_path: Text = None, replay_path: Text = None) -> BaseAdapter:
+    """ open cassette adapter to record exchanges to record_path, or replay exchanges in replay_path.
+    """
+    if replay_path:
+        return ReplayCassetteAdapter(replay_path)
+
+    return RecordCassetteAdapter(record_path)
@@ -2,16 +2,23 @@ import argparse
 import enum
 import os
 import sys
+from typing import List, Text, Union
 
 import pytest
 from loguru import logger
 from sentry_sdk import capture_message
 
 from rrtv_httprunner import __description__, __version__, globalvar
+from rrtv_httprunner.cassette import open_cassette
 from rrtv_httprunner.compat import ensure_cli_args
+from rrtv_httprunner.exceptions import ParamsError
+from rrtv_httprunner.executor import init_executor_parser, main_executor
 from rrtv_httprunner.ext.har2case import init_har2case_parser, main_har2case
 from rrtv_httprunner.make import init_make_parser, main_make
+from rrtv_httprunner.models import ConnectionPool
+from rrtv_httprunner.response import parse_validation_sampling
 from rrtv_httprunner.scaffold import init_parser_scaffold, main_scaffold
+from rrtv_httprunner.spool import open_spool
 from rrtv_httprunner.utils import init_sentry_sdk
 
 init_sentry_sdk()
@@ -24,11 +31,62 @@ def init_parser_run(subparsers):
     return sub_parser_run
 
 
+def __pop_option_value(extra_args: List[Text], option: Text) -> Union[Text, None]:
+    """ pop option and its value from arguments, which are not passed to pytest
+    """
+    if option not in extra_args:
+        return None
+
+    index = extra_args.index(option)
+    extra_args.pop(index)
+    if index >= len(extra_args):
+        logger.error(f"No value specified for {option}")
+        sys.exit(1)
+
+    return extra_args.pop(index)
+
+
 def main_run(extra_args) -> enum.IntEnum:
     capture_message("start to run")
     # keep compatibility with v2
     extra_args = ensure_cli_args(extra_args)
 
+    # append step datas to spool file instead of keeping them in memory
+    spool = None
+    spool_path = __pop_option_value(extra_args, "--spool-results")
+    if spool_path:
+        spool = open_spool(spool_path)
+        globalvar.set_value("step_spool", spool)
+
+    # record requests to cassette, or replay them from cassette without network
+    record_cassette_path = __pop_option_value(extra_args, "--record-cassette")
+    replay_cassette_path = __pop_option_value(extra_args, "--replay-cassette")
+    cassette_adapter = None
+    if record_cassette_path or replay_cassette_path:
+        cassette_adapter = open_cassette(record_cassette_path, replay_cassette_path)
+        globalvar.set_value("cassette_adapter", cassette_adapter)
+
+    # share connections between testcases
+    pool_connections = __pop_option_value(extra_args, "--pool-connections")
+    pool_maxsize = __pop_option_value(extra_args, "--pool-maxsize")
+    if pool_connections or pool_maxsize:
+        globalvar.set_value(
+            "connection_pool",
+            ConnectionPool(
+                pool_connections=int(pool_connections or 10),
+                pool_maxsize=int(pool_maxsize or 10),
+            ),
+        )
+
+    # only run validators of sampled responses, e.g. --sample-validation 10
+    sample_validation = __pop_option_value(extra_args, "--sample-validation")
+    if sample_validation:
+        try:
+            globalvar.set_value("validation_sampling", parse_validation_sampling(sample_validation))
+        except ParamsError as ex:
+            logger.error(ex)
+            sys.exit(1)
+
     tests_path_list = []
     extra_args_new = []
     for item in extra_args:
@@ -57,7 +115,14 @@ def main_run(extra_args) -> enum.IntEnum:
 
     extra_args_new.extend(testcase_path_list)
     logger.info(f"start to run tests with pytest. HttpRunner version: {__version__}")
-    return pytest.main(extra_args_new)
+    try:
+        return pytest.main(extra_args_new)
+    finally:
+        if cassette_adapter is not None:
+            cassette_adapter.close_cassette()
+        if spool is not None:
+            spool.close()
+            logger.info(f"step datas are spooled to {spool.path}")
 
 
 def main():
@@ -73,6 +138,7 @@ def main():
     sub_parser_scaffold = init_parser_scaffold(subparsers)
     sub_parser_har2case = init_har2case_parser(subparsers)
     sub_parser_make = init_make_parser(subparsers)
+    sub_parser_execute = init_executor_parser(subparsers)
 
     if len(sys.argv) == 1:
         # httprunner
@@ -98,6 +164,9 @@ def main():
         elif sys.argv[1] == "make":
             # httprunner make
             sub_parser_make.print_help()
+        elif sys.argv[1] == "execute":
+            # httprunner execute
+            sub_parser_execute.print_help()
         sys.exit(0)
     elif (
             len(sys.argv) == 3 and sys.argv[1] == "run" and sys.argv[2] in ["-h", "--help"]
@@ -124,6 +193,8 @@ def main():
         main_har2case(args)
     elif sys.argv[1] == "make":
         main_make(args.testcase_path)
+    elif sys.argv[1] == "execute":
+        sys.exit(main_executor(args))
 
 
 def main_hrun_alias():
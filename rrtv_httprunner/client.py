@@ -1,13 +1,21 @@
 import json
+import socket
+import threading
 import time
-from typing import Dict
+import weakref
+from typing import Any, Dict, List, NoReturn, Text, Tuple
 
 import curlify as curlify
 import demjson
 import requests
 import urllib3
 from loguru import logger
-from requests import Request, Response
+from requests import PreparedRequest, Request, Response
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import NewConnectionError
+from urllib3.util.connection import allowed_gai_family
 from requests.exceptions import (
     InvalidSchema,
     InvalidURL,
@@ -15,9 +23,15 @@ from requests.exceptions import (
     RequestException,
 )
 
-from rrtv_httprunner.models import RequestData, ResponseData
+from rrtv_httprunner.models import (
+    AddressData,
+    ConnectionPool,
+    RequestData,
+    RequestStat,
+    ResponseData,
+)
 from rrtv_httprunner.models import SessionData, ReqRespData
-from rrtv_httprunner.utils import lower_dict_keys, omit_long_data, quote_dict, unquote_dict, is_json
+from rrtv_httprunner.utils import lower_dict_keys, omit_long_data, quote_dict, unquote_dict
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -29,6 +43,224 @@ class ApiResponse(Response):
         Response.raise_for_status(self)
 
 
+# http adapters shared by sessions of testcases, keyed by pool settings
+__shared_adapters: Dict[Tuple[int, int], HTTPAdapter] = {}
+# sockets or transports which requests have been sent with
+__used_connections = weakref.WeakSet()
+__connections_lock = threading.Lock()
+
+
+def get_shared_adapter(connection_pool: ConnectionPool) -> HTTPAdapter:
+    """ get http adapter with connection pools shared by sessions with the same pool settings.
+    """
+    key = (connection_pool.pool_connections, connection_pool.pool_maxsize)
+    with __connections_lock:
+        if key not in __shared_adapters:
+            __shared_adapters[key] = InstrumentedHTTPAdapter(
+                pool_connections=connection_pool.pool_connections,
+                pool_maxsize=connection_pool.pool_maxsize,
+            )
+
+        return __shared_adapters[key]
+
+
+def mark_connection_used(connection: Any) -> bool:
+    """ mark socket or transport which request is sent with as used,
+        return True if it has been used by previous requests.
+    """
+    with __connections_lock:
+        if connection in __used_connections:
+            return True
+
+        __used_connections.add(connection)
+        return False
+
+
+class TimedConnectionMixin(object):
+    """ record time spent in DNS lookup, TCP connect and TLS handshake of new connection, and
+        time to first byte of each request sent with the connection, in milliseconds.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(TimedConnectionMixin, self).__init__(*args, **kwargs)
+        # timing of establishing connection is only recorded for the first request
+        self.connect_timing: Dict[Text, float] = {}
+        self.request_start_at = 0.0
+        self.ttfb_ms = 0.0
+
+    def _new_conn(self):
+        dns_host = self._dns_host
+        start_at = time.perf_counter()
+        try:
+            addresses = socket.getaddrinfo(
+                dns_host.strip("[]"), self.port, allowed_gai_family(), socket.SOCK_STREAM
+            )
+        except (socket.gaierror, UnicodeError):
+            # let urllib3 raise errors as usual
+            return super(TimedConnectionMixin, self)._new_conn()
+
+        connect_start_at = time.perf_counter()
+        ip_addresses = list(dict.fromkeys(address[4][0] for address in addresses))
+        try:
+            for index, ip_address in enumerate(ip_addresses):
+                # connect to resolved addresses in order, like urllib3 create_connection
+                self._dns_host = ip_address
+                try:
+                    sock = super(TimedConnectionMixin, self)._new_conn()
+                    break
+                except NewConnectionError:
+                    if index == len(ip_addresses) - 1:
+                        raise
+        finally:
+            self._dns_host = dns_host
+
+        self.connect_timing = {
+            "dns_ms": (connect_start_at - start_at) * 1000,
+            "connect_ms": (time.perf_counter() - connect_start_at) * 1000,
+        }
+        return sock
+
+    def request(self, *args, **kwargs):
+        self.request_start_at = time.perf_counter()
+        return super(TimedConnectionMixin, self).request(*args, **kwargs)
+
+    def getresponse(self, *args, **kwargs):
+        response = super(TimedConnectionMixin, self).getresponse(*args, **kwargs)
+        self.ttfb_ms = (time.perf_counter() - self.request_start_at) * 1000
+        return response
+
+
+class TimedHTTPConnection(TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(TimedConnectionMixin, HTTPSConnection):
+    def connect(self):
+        start_at = time.perf_counter()
+        super(TimedHTTPSConnection, self).connect()
+        if self.connect_timing:
+            # time of establishing connection except DNS lookup and TCP connect
+            self.connect_timing["tls_ms"] = (
+                (time.perf_counter() - start_at) * 1000
+                - self.connect_timing["dns_ms"]
+                - self.connect_timing["connect_ms"]
+            )
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class InstrumentedHTTPAdapter(HTTPAdapter):
+    """ http adapter recording client & server address and network timing of connection which
+        response is received with, before connection is released to pool.
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super(InstrumentedHTTPAdapter, self).init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool,
+        }
+
+    def send(self, request: PreparedRequest, stream: bool = False, **kwargs) -> Response:
+        response = super(InstrumentedHTTPAdapter, self).send(request, stream=stream, **kwargs)
+        network_stat = getattr(response, "network_stat", None)
+        if network_stat is not None and not stream:
+            # read body here to record download time, requests reads it after send otherwise
+            start_at = time.perf_counter()
+            response.content
+            network_stat.download_ms = (time.perf_counter() - start_at) * 1000
+            network_stat.body_bytes = response.raw.tell()
+
+        return response
+
+    def build_response(self, req, resp) -> Response:
+        response = super(InstrumentedHTTPAdapter, self).build_response(req, resp)
+        conn = getattr(resp, "connection", None)
+        if isinstance(conn, TimedConnectionMixin):
+            response.network_stat = RequestStat(ttfb_ms=conn.ttfb_ms, **conn.connect_timing)
+            conn.connect_timing = {}
+
+        try:
+            sock = conn.sock
+            client_ip, client_port = sock.getsockname()[:2]
+            server_ip, server_port = sock.getpeername()[:2]
+        except (AttributeError, OSError) as ex:
+            logger.warning(f"failed to get client and server address info: {ex}")
+            return response
+
+        response.address = AddressData(
+            client_ip=client_ip,
+            client_port=client_port,
+            server_ip=server_ip,
+            server_port=server_port,
+        )
+        response.connection_reused = mark_connection_used(sock)
+        return response
+
+
+# attribute of response object which caches decoded json body
+JSON_BODY_ATTR = "hrun_json_body"
+# cached for response body which is not json
+NOT_JSON = object()
+
+
+def __stringify_keys(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {str(k): __stringify_keys(v) for k, v in value.items()}
+    elif isinstance(value, list):
+        return [__stringify_keys(item) for item in value]
+
+    return value
+
+
+def __decode_json_body(resp_obj: Response) -> Any:
+    try:
+        return resp_obj.json()
+    except ValueError:
+        pass
+
+    # lenient fallback, e.g. single quoted strings or trailing commas, only for body which looks
+    # like json object or array, demjson is too slow to try on other text, e.g. html
+    text = resp_obj.text
+    if text and text.lstrip()[:1] in ["{", "["]:
+        try:
+            # keys maybe numbers in non-strict json
+            return __stringify_keys(demjson.decode(text))
+        except demjson.JSONException:
+            pass
+
+    return NOT_JSON
+
+
+# recorded body of streamed response, which is not loaded
+STREAMED_BODY = "streamed response body (OMITTED)"
+
+
+def load_response_json(resp_obj: Response) -> Any:
+    """ decode json body of response, decoded body is cached on response object thus it is
+        shared by session data, ResponseObject and allure report.
+
+    Raises:
+        ValueError: response body is not json
+
+    """
+    if JSON_BODY_ATTR not in resp_obj.__dict__:
+        setattr(resp_obj, JSON_BODY_ATTR, __decode_json_body(resp_obj))
+
+    json_body = getattr(resp_obj, JSON_BODY_ATTR)
+
+    if json_body is NOT_JSON:
+        raise ValueError("response body is not json")
+
+    return json_body
+
+
 def get_req_resp_record(resp_obj: Response) -> ReqRespData:
     """ get request and response info from Response() object.
     """
@@ -81,27 +313,19 @@ def get_req_resp_record(resp_obj: Response) -> ReqRespData:
     lower_resp_headers = lower_dict_keys(resp_headers)
     content_type = lower_resp_headers.get("content-type", "")
 
-    if "image" in content_type:
+    if resp_obj._content is False:
+        # streamed response body is not loaded, it is searched in one pass by ResponseObject
+        response_body = STREAMED_BODY
+    elif "image" in content_type:
         # response is image type, record bytes content only
         response_body = resp_obj.content
     else:
         try:
             # try to record json data
-            response_body = resp_obj.json()
+            response_body = load_response_json(resp_obj)
         except ValueError:
             # only record at most 512 text charactors
-            # resp_text = resp_obj.text
-            response_dict = {}
-            for attr in dir(resp_obj):
-                if attr == "text":
-                    response_dict[attr] = getattr(resp_obj, attr)
-            if "text" in response_dict and response_dict["text"] != "":
-                if is_json(response_dict["text"]):
-                    response_dict['text'] = demjson.decode(response_dict['text'])
-                    response_body = {}
-                    for k, v in response_dict['text'].items():
-                        response_body[k] = v
-            response_body = omit_long_data(response_dict['text'])
+            response_body = omit_long_data(resp_obj.text)
 
     response_data = ResponseData(
         status_code=resp_obj.status_code,
@@ -119,6 +343,65 @@ def get_req_resp_record(resp_obj: Response) -> ReqRespData:
     return req_resp_data
 
 
+def get_req_resp_records(response: Response) -> List[ReqRespData]:
+    """ get request and response records of response, including 30X redirection histories.
+    """
+    return [get_req_resp_record(resp_obj) for resp_obj in response.history + [response]]
+
+
+def get_curl(response: Response) -> Text:
+    """ get curl command of request which response is received for.
+    """
+    return curlify.to_curl(response.request, compressed=True)
+
+
+def record_session_data(
+        session_data: SessionData,
+        response: Response,
+        response_time_ms: float,
+        record_req_resps: bool = True,
+) -> NoReturn:
+    """ record stat and request & response histories of response to session data,
+        histories are recorded later, e.g. on failure, if record_req_resps is False.
+    """
+    # get length of the response content
+    content_size = int(response.headers.get("Content-Length") or 0)
+
+    # record network timing of instrumented transport
+    network_stat = getattr(response, "network_stat", None)
+    if network_stat is not None:
+        stat = session_data.stat
+        stat.dns_ms = network_stat.dns_ms
+        stat.connect_ms = network_stat.connect_ms
+        stat.tls_ms = network_stat.tls_ms
+        stat.ttfb_ms = network_stat.ttfb_ms
+        stat.download_ms = network_stat.download_ms
+        stat.body_bytes = network_stat.body_bytes
+
+    # record the consumed time
+    session_data.stat.response_time_ms = response_time_ms
+    session_data.stat.elapsed_ms = response.elapsed.total_seconds() * 1000
+    session_data.stat.content_size = content_size
+
+    # record request and response histories, include 30X redirection
+    if record_req_resps:
+        session_data.req_resps = get_req_resp_records(response)
+
+    try:
+        response.raise_for_status()
+    except RequestException as ex:
+        logger.error(f"{str(ex)}")
+    else:
+        stat = session_data.stat
+        logger.info(
+            f"status_code: {response.status_code}, "
+            f"response_time(ms): {response_time_ms} ms, "
+            f"response_length: {content_size} bytes, "
+            f"dns/connect/tls/ttfb/download(ms): {stat.dns_ms:.2f}/{stat.connect_ms:.2f}/"
+            f"{stat.tls_ms:.2f}/{stat.ttfb_ms:.2f}/{stat.download_ms:.2f}"
+        )
+
+
 class HttpSession(requests.Session):
     """
     Class for performing HTTP requests and holding (session-) cookies between requests (in order
@@ -129,9 +412,34 @@ class HttpSession(requests.Session):
     :py:class:`requests.Session` class and mostly this class works exactly the same.
     """
 
-    def __init__(self):
+    def __init__(self, adapter: HTTPAdapter = None):
         super(HttpSession, self).__init__()
         self.data = SessionData()
+        # connections are shared with other sessions if specified, while cookies are not
+        adapter = adapter or InstrumentedHTTPAdapter()
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+        # building request & response records is expensive, runner skips it by record policy
+        self.record_req_resps = True
+
+    def fork(self) -> "HttpSession":
+        """ create session sharing cookies and connection pools with current session,
+            thus requests can be sent concurrently with separate session data.
+        """
+        session = HttpSession()
+        session.headers = self.headers
+        session.auth = self.auth
+        session.proxies = self.proxies
+        session.hooks = self.hooks
+        session.params = self.params
+        session.verify = self.verify
+        session.cert = self.cert
+        session.trust_env = self.trust_env
+        session.max_redirects = self.max_redirects
+        session.cookies = self.cookies
+        session.adapters = self.adapters
+        session.record_req_resps = self.record_req_resps
+        return session
 
     def update_last_req_resp_record(self, resp_obj):
         """
@@ -185,8 +493,6 @@ class HttpSession(requests.Session):
         # timeout default to 120 seconds
         kwargs.setdefault("timeout", 120)
 
-        # set stream to True, in order to get client/server IP/Port
-        kwargs["stream"] = True
         # 实现xml传参
         if kwargs["data"] is not None and isinstance(kwargs["data"], str):
             if kwargs["data"].strip().startswith("<xml>") and kwargs["data"].strip().endswith("</xml>"):
@@ -199,47 +505,15 @@ class HttpSession(requests.Session):
         start_timestamp = time.time()
         response = self._send_request_safe_mode(method, url, **kwargs)
         response_time_ms = round((time.time() - start_timestamp) * 1000, 2)
-        try:
-            client_ip, client_port = response.raw.connection.sock.getsockname()
-            self.data.address.client_ip = client_ip
-            self.data.address.client_port = client_port
-            logger.debug(f"client IP: {client_ip}, Port: {client_port}")
-        except AttributeError as ex:
-            logger.warning(f"failed to get client address info: {ex}")
-
-        try:
-            server_ip, server_port = response.raw.connection.sock.getpeername()
-            self.data.address.server_ip = server_ip
-            self.data.address.server_port = server_port
-            logger.debug(f"server IP: {server_ip}, Port: {server_port}")
-        except AttributeError as ex:
-            logger.warning(f"failed to get server address info: {ex}")
-
-        # get length of the response content
-        content_size = int(dict(response.headers).get("content-length") or 0)
-
-        # record the consumed time
-        self.data.stat.response_time_ms = response_time_ms
-        self.data.stat.elapsed_ms = response.elapsed.microseconds / 1000.0
-        self.data.stat.content_size = content_size
-
-        # record request and response histories, include 30X redirection
-        response_list = response.history + [response]
-        self.data.req_resps = [
-            get_req_resp_record(resp_obj) for resp_obj in response_list
-        ]
-
-        try:
-            response.raise_for_status()
-        except RequestException as ex:
-            logger.error(f"{str(ex)}")
-        else:
-            logger.info(
-                f"status_code: {response.status_code}, "
-                f"response_time(ms): {response_time_ms} ms, "
-                f"response_length: {content_size} bytes"
-            )
-
+        # address is recorded by InstrumentedHTTPAdapter when response is received
+        address = getattr(response, "address", None)
+        if address is not None:
+            self.data.address = address
+            self.data.stat.connection_reused = response.connection_reused
+            logger.debug(f"client IP: {address.client_ip}, Port: {address.client_port}")
+            logger.debug(f"server IP: {address.server_ip}, Port: {address.server_port}")
+
+        record_session_data(self.data, response, response_time_ms, self.record_req_resps)
         return response
 
     def _send_request_safe_mode(self, method, url, **kwargs):
@@ -248,11 +522,10 @@ class HttpSession(requests.Session):
         Safe mode has been removed from requests 1.x.
         """
         try:
-            a = kwargs["allure"]
-            kwargs.pop("allure")
+            allure_param = kwargs.pop("allure", None)
             rep = requests.Session.request(self, method, url, **kwargs)
-            a.curl = curlify.to_curl(rep.request, compressed=True)
-            logger.debug(f"curl: {a.curl}")
+            if allure_param is not None:
+                allure_param.curl = get_curl(rep)
             return rep
         except (MissingSchema, InvalidSchema, InvalidURL):
             raise
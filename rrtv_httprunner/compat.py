@@ -293,6 +293,8 @@ import time
 import pytest
 from loguru import logger
 
+from rrtv_httprunner import globalvar
+from rrtv_httprunner.spool import dump_summary_with_spool
 from rrtv_httprunner.utils import get_platform, ExtendJSONEncoder
 
 
@@ -344,8 +346,13 @@ def session_fixture(request):
     summary_dir = os.path.dirname(summary_path)
     os.makedirs(summary_dir, exist_ok=True)
 
-    with open(summary_path, "w", encoding="utf-8") as f:
-        json.dump(summary, f, indent=4, ensure_ascii=False, cls=ExtendJSONEncoder)
+    spool = globalvar.get_value("step_spool")
+    if spool is not None:
+        # records are loaded from spool, one testcase at a time
+        dump_summary_with_spool(summary, "details", "records", spool, summary_path)
+    else:
+        with open(summary_path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=4, ensure_ascii=False, cls=ExtendJSONEncoder)
 
     logger.info(f"generated task summary: {summary_path}")
 
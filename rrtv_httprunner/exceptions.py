@@ -68,6 +68,10 @@ class VariableNotFound(NotFoundError):
     pass
 
 
+class VariableCircularReference(VariableNotFound):
+    pass
+
+
 class EnvNotFound(NotFoundError):
     pass
 
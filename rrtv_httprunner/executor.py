@@ -0,0 +1,331 @@
+import asyncio
+import functools
+import importlib
+import inspect
+import json
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Text, Tuple, Type, Union
+
+from loguru import logger
+
+from rrtv_httprunner.cassette import open_cassette
+from rrtv_httprunner.make import main_make
+from rrtv_httprunner import globalvar
+from rrtv_httprunner.exceptions import ParamsError
+from rrtv_httprunner.models import (
+    ConnectionPool,
+    ConnectionStat,
+    Stat,
+    TestCaseSummary,
+    TestCaseTime,
+    TestSuiteSummary,
+    PlatformInfo,
+    ValidationStat,
+)
+from rrtv_httprunner.response import parse_validation_sampling
+from rrtv_httprunner.runner import HttpRunner
+from rrtv_httprunner.spool import StepSpool, open_spool, dump_summary_with_spool
+from rrtv_httprunner.utils import get_platform, ExtendJSONEncoder
+
+# default number of testcases running concurrently
+DEFAULT_MAX_WORKERS = 10
+
+# testcase class, or testcase class with parameters
+TestCaseItem = Union[Type[HttpRunner], Tuple[Type[HttpRunner], Dict]]
+
+
+def parse_testcase_item(testcase_item: TestCaseItem) -> Tuple[Type[HttpRunner], Dict]:
+    if isinstance(testcase_item, tuple):
+        return testcase_item
+
+    return testcase_item, None
+
+
+def get_testcase_summary(
+        runner: HttpRunner, start_at: float, error: Exception = None
+) -> TestCaseSummary:
+    """ get summary of finished testcase runner, failures are recorded in summary.
+    """
+    if error is not None:
+        logger.error(f"testcase {type(runner).__name__} failed: {type(error).__name__}: {error}")
+        runner.success = False
+
+    try:
+        return runner.get_summary()
+    except Exception:
+        # testcase failed before summary data is ready, e.g. export variables not extracted
+        return TestCaseSummary(
+            name=type(runner).__name__,
+            success=False,
+            case_id="",
+            time=TestCaseTime(start_at=start_at, duration=time.time() - start_at),
+            step_datas=runner.get_step_datas(),
+        )
+
+
+def summarize_testcases(
+        testcase_summaries: List[TestCaseSummary], start_at: float
+) -> TestSuiteSummary:
+    """ aggregate testcase summaries to testsuite summary.
+    """
+    stat = Stat(total=len(testcase_summaries))
+    connection_stat = ConnectionStat()
+    validation_stat = ValidationStat()
+    for testcase_summary in testcase_summaries:
+        if testcase_summary.success:
+            stat.success += 1
+        else:
+            stat.fail += 1
+
+        for field, value in testcase_summary.connection_stat:
+            setattr(connection_stat, field, getattr(connection_stat, field) + value)
+        validation_stat.validated += testcase_summary.validation_stat.validated
+        validation_stat.sampled_out += testcase_summary.validation_stat.sampled_out
+
+    return TestSuiteSummary(
+        success=stat.fail == 0,
+        stat=stat,
+        time=TestCaseTime(start_at=start_at, duration=time.time() - start_at),
+        platform=PlatformInfo(**get_platform()),
+        connection_stat=connection_stat,
+        validation_stat=validation_stat,
+        testcases=testcase_summaries,
+    )
+
+
+def run_testcase_item(testcase_item: TestCaseItem, spool: StepSpool = None) -> TestCaseSummary:
+    """ run one testcase with isolated runner state and HttpSession, failures are recorded in summary.
+    """
+    testcase_cls, param = parse_testcase_item(testcase_item)
+    runner = testcase_cls().with_case_id(str(uuid.uuid4())).with_spool(spool)
+    start_at = time.time()
+    try:
+        runner.test_start(param)
+    except Exception as ex:
+        return get_testcase_summary(runner, start_at, ex)
+
+    return get_testcase_summary(runner, start_at)
+
+
+def run_testcases(
+        testcase_items: List[TestCaseItem],
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        spool: StepSpool = None,
+) -> TestSuiteSummary:
+    """ run testcases concurrently in thread pool, and aggregate testcase summaries.
+
+    Args:
+        testcase_items: testcase classes, or (testcase class, parameters) tuples
+        max_workers: max number of testcases running at the same time
+        spool: append step datas to spool, request & response data are not kept in summary
+
+    Examples:
+        >>> summary = run_testcases([TestCaseLogin, (TestCaseSearch, {"keyword": "abc"})], 20)
+        >>> summary.stat
+            Stat(total=2, success=2, fail=0)
+
+    """
+    start_at = time.time()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        testcase_summaries = list(
+            executor.map(functools.partial(run_testcase_item, spool=spool), testcase_items)
+        )
+
+    return summarize_testcases(testcase_summaries, start_at)
+
+
+def __import_pytest_file(pytest_file: Text):
+    """ import pytest file as module, parent folders with __init__.py are imported as packages
+    """
+    module_dir, file_name = os.path.split(os.path.abspath(pytest_file))
+    module_names = [os.path.splitext(file_name)[0]]
+    while os.path.isfile(os.path.join(module_dir, "__init__.py")):
+        module_dir, package_name = os.path.split(module_dir)
+        module_names.insert(0, package_name)
+
+    if module_dir not in sys.path:
+        sys.path.insert(0, module_dir)
+
+    return importlib.import_module(".".join(module_names))
+
+
+def load_testcase_items(pytest_files: List[Text]) -> List[TestCaseItem]:
+    """ load testcase classes defined in pytest files, parameterized testcase is expanded
+        to one item for each parameters.
+    """
+    testcase_items: List[TestCaseItem] = []
+    for pytest_file in pytest_files:
+        module = __import_pytest_file(pytest_file)
+        for _, item in inspect.getmembers(module, inspect.isclass):
+            if (
+                    not issubclass(item, HttpRunner)
+                    or item.__module__ != module.__name__
+                    or not item.__name__.startswith("Test")
+            ):
+                continue
+
+            parameters = None
+            for mark in getattr(item.test_start, "pytestmark", []):
+                if mark.name == "parametrize":
+                    parameters = mark.args[1]
+
+            if parameters is None:
+                testcase_items.append(item)
+            else:
+                testcase_items.extend((item, param) for param in parameters)
+
+    return testcase_items
+
+
+def init_executor_parser(subparsers):
+    """ run testcases concurrently: parse command line options and run commands.
+    """
+    parser = subparsers.add_parser(
+        "execute",
+        help="Make HttpRunner testcases and run them concurrently in thread pool.",
+    )
+    parser.add_argument(
+        "testcase_path", nargs="*", help="Specify YAML/JSON/pytest testcase file/folder path"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_MAX_WORKERS,
+        help=f"Max number of testcases running concurrently, default: {DEFAULT_MAX_WORKERS}",
+    )
+    parser.add_argument(
+        "--asyncio",
+        action="store_true",
+        default=False,
+        help="Run testcases in one asyncio event loop instead of thread pool, "
+             "--workers limits concurrency. Requires aiohttp",
+    )
+    parser.add_argument(
+        "--pool-connections",
+        type=int,
+        help="Share connections between testcases, number of hosts to keep connection pools for",
+    )
+    parser.add_argument(
+        "--pool-maxsize",
+        type=int,
+        help="Share connections between testcases, max number of connections kept for each host",
+    )
+    parser.add_argument(
+        "--sample-validation",
+        help="Only run validators of sampled responses except status_code checks, "
+             "e.g. 10 for 1 in 10 responses, 5%% for 5 percent of responses",
+    )
+    parser.add_argument(
+        "--record-cassette",
+        dest="record_cassette_path",
+        help="Record requests and responses to cassette file",
+    )
+    parser.add_argument(
+        "--replay-cassette",
+        dest="replay_cassette_path",
+        help="Replay responses recorded in cassette file instead of sending requests",
+    )
+    parser.add_argument(
+        "--save-summary", dest="summary_path", help="Save testsuite summary to json file"
+    )
+    parser.add_argument(
+        "--spool-results",
+        dest="spool_path",
+        help="Append step results to JSON lines file, or SQLite database if ends with .db, "
+             "instead of keeping them in memory",
+    )
+
+    return parser
+
+
+def main_executor(args) -> int:
+    pytest_files = main_make(args.testcase_path)
+    if not pytest_files:
+        logger.error("No valid testcases found, exit 1.")
+        return 1
+
+    testcase_items = load_testcase_items(pytest_files)
+    logger.info(
+        f"start to run {len(testcase_items)} testcases with {args.workers} workers"
+    )
+    if args.pool_connections or args.pool_maxsize:
+        # pool settings in testcase config take precedence
+        globalvar.set_value(
+            "connection_pool",
+            ConnectionPool(
+                pool_connections=args.pool_connections or args.workers,
+                pool_maxsize=args.pool_maxsize or args.workers,
+            ),
+        )
+
+    if args.sample_validation:
+        # sampling settings in testcase config take precedence
+        try:
+            globalvar.set_value(
+                "validation_sampling", parse_validation_sampling(args.sample_validation)
+            )
+        except ParamsError as ex:
+            logger.error(ex)
+            return 1
+
+    cassette_adapter = None
+    if args.record_cassette_path or args.replay_cassette_path:
+        if args.asyncio:
+            logger.error("Cassette is not supported in asyncio mode, exit 1.")
+            return 1
+
+        cassette_adapter = open_cassette(args.record_cassette_path, args.replay_cassette_path)
+        globalvar.set_value("cassette_adapter", cassette_adapter)
+
+    spool = open_spool(args.spool_path) if args.spool_path else None
+    try:
+        if args.asyncio:
+            from rrtv_httprunner.ext.aio import ensure_aio_ready, run_testcases_async
+
+            ensure_aio_ready()
+            summary = asyncio.run(run_testcases_async(testcase_items, args.workers, spool))
+        else:
+            summary = run_testcases(testcase_items, args.workers, spool)
+        logger.info(
+            f"testcases finished in {summary.time.duration:.2f}s, "
+            f"total: {summary.stat.total}, success: {summary.stat.success}, fail: {summary.stat.fail}, "
+            f"connections created: {summary.connection_stat.created}, "
+            f"reused: {summary.connection_stat.reused}"
+        )
+        logger.info(
+            f"network time(ms) dns: {summary.connection_stat.dns_ms:.2f}, "
+            f"connect: {summary.connection_stat.connect_ms:.2f}, "
+            f"tls: {summary.connection_stat.tls_ms:.2f}, "
+            f"ttfb: {summary.connection_stat.ttfb_ms:.2f}, "
+            f"download: {summary.connection_stat.download_ms:.2f}, "
+            f"body: {summary.connection_stat.body_bytes} bytes"
+        )
+        if summary.validation_stat.sampled_out:
+            logger.info(
+                f"validators run: {summary.validation_stat.validated}, "
+                f"sampled out: {summary.validation_stat.sampled_out}"
+            )
+
+        if args.summary_path:
+            if spool is not None:
+                # step datas are loaded from spool, one testcase at a time
+                dump_summary_with_spool(
+                    summary.dict(), "testcases", "step_datas", spool, args.summary_path
+                )
+            else:
+                with open(args.summary_path, "w", encoding="utf-8") as f:
+                    json.dump(
+                        summary.dict(), f, indent=4, ensure_ascii=False, cls=ExtendJSONEncoder
+                    )
+            logger.info(f"generate testsuite summary: {args.summary_path}")
+    finally:
+        if cassette_adapter is not None:
+            cassette_adapter.close_cassette()
+        if spool is not None:
+            spool.close()
+
+    return 0 if summary.success else 1
@@ -0,0 +1,549 @@
+""" asyncio runner extension.
+
+If you want to use this extension, you should install the following dependencies first.
+
+- aiohttp
+
+Then you can run existing testcases in one asyncio event loop, teststeps of each testcase are
+run in order as HttpRunner does, while requests of hundreds of testcases are sent concurrently
+and share one connection pool:
+
+    >>> import asyncio
+    >>> from rrtv_httprunner.ext.aio import AsyncHttpRunner, run_testcases_async
+    >>> runner = asyncio.run(AsyncHttpRunner(TestCaseLogin()).test_start())
+    >>> summary = asyncio.run(run_testcases_async([TestCaseLogin, TestCaseSearch], 100))
+
+or run with command line:
+
+    $ httprunner execute --asyncio --workers 100 testcases/
+
+Notice: functions, hooks and sql/redis/mongo statements referenced in testcases are still called
+synchronously, they block the event loop while running.
+
+"""
+
+import asyncio
+import datetime
+import functools
+import http.client
+import ssl
+import sys
+import time
+import uuid
+from typing import Any, Callable, Dict, List, NoReturn, Text, Tuple, Union
+
+import curlify
+import requests
+from loguru import logger
+from requests import PreparedRequest, Request, Response
+from requests.cookies import MockRequest, MockResponse, RequestsCookieJar
+from requests.exceptions import ConnectionError, InvalidURL, Timeout, TooManyRedirects
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers, select_proxy
+
+from rrtv_httprunner import exceptions, globalvar
+from rrtv_httprunner.client import ApiResponse, mark_connection_used, record_session_data
+from rrtv_httprunner.executor import (
+    DEFAULT_MAX_WORKERS,
+    TestCaseItem,
+    get_testcase_summary,
+    parse_testcase_item,
+    summarize_testcases,
+)
+from rrtv_httprunner.models import RequestStat, SessionData, TestCase, TestSuiteSummary
+from rrtv_httprunner.runner import HttpRunner, RunnerIterator
+from rrtv_httprunner.spool import StepSpool
+from rrtv_httprunner.utils import quote_dict
+
+try:
+    import aiohttp
+    import yarl
+
+    AIO_READY = True
+except ModuleNotFoundError:
+    AIO_READY = False
+
+
+def ensure_aio_ready():
+    if AIO_READY:
+        return
+
+    msg = """
+    asyncio extension dependencies uninstalled, install first and try again.
+    install with pip:
+    $ pip install aiohttp
+
+    or you can install rrtv_httprunner with optional async dependencies:
+    $ pip install "rrtv_httprunner[async]"
+    """
+    logger.error(msg)
+    sys.exit(1)
+
+
+def get_client_timeout(timeout: Union[float, Tuple[float, float]]) -> "aiohttp.ClientTimeout":
+    """ convert requests timeout, i.e. seconds or (connect timeout, read timeout) tuple,
+        to aiohttp client timeout.
+    """
+    if isinstance(timeout, (tuple, list)):
+        connect_timeout, read_timeout = timeout
+    else:
+        connect_timeout = read_timeout = timeout
+
+    return aiohttp.ClientTimeout(
+        total=None, sock_connect=connect_timeout, sock_read=read_timeout
+    )
+
+
+@functools.lru_cache(maxsize=64)
+def get_ssl_param(
+        verify: Union[bool, Text], cert: Union[Text, Tuple[Text, Text]] = None
+) -> Union[bool, "ssl.SSLContext"]:
+    """ convert requests verify, i.e. bool or path to CA bundle, and client cert, i.e. path to
+        cert file or (cert, key) pair, to aiohttp ssl parameter, cached by arguments.
+    """
+    if cert is None:
+        if isinstance(verify, Text):
+            return ssl.create_default_context(cafile=verify)
+        return bool(verify)
+
+    context = ssl.create_default_context(cafile=verify if isinstance(verify, Text) else None)
+    if not verify:
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+    if isinstance(cert, Text):
+        context.load_cert_chain(cert)
+    else:
+        context.load_cert_chain(*cert)
+    return context
+
+
+if AIO_READY:
+
+    class AddressRecordingResponse(aiohttp.ClientResponse):
+        """ keep transport of connection which response is received with, connection is released
+            once small response body has been received, before the response is returned.
+        """
+
+        transport: "asyncio.Transport" = None
+
+        async def start(self, connection, *args, **kwargs):
+            self.transport = connection.transport
+            return await super(AddressRecordingResponse, self).start(connection, *args, **kwargs)
+
+
+def extract_cookies_to_jar(
+        jar: RequestsCookieJar, request: PreparedRequest, resp: "aiohttp.ClientResponse"
+) -> NoReturn:
+    """ extract Set-Cookie headers of aiohttp response to cookie jar.
+    """
+    headers = http.client.HTTPMessage()
+    for key, value in resp.headers.items():
+        headers[key] = value
+
+    jar.extract_cookies(MockResponse(headers), MockRequest(request))
+
+
+def get_trace_config() -> "aiohttp.TraceConfig":
+    """ trace config recording network timing of requests to trace_request_ctx dict.
+
+    DNS lookup and connect time are only recorded for new connection, and TLS handshake time is
+    included in connect time since aiohttp does not trace it separately.
+    """
+
+    def stamp(key: Text):
+        async def on_event(session, trace_config_ctx, params):
+            timing = trace_config_ctx.trace_request_ctx
+            if isinstance(timing, dict):
+                timing[key] = time.perf_counter()
+
+        return on_event
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_dns_resolvehost_start.append(stamp("dns_start_at"))
+    trace_config.on_dns_resolvehost_end.append(stamp("dns_end_at"))
+    trace_config.on_connection_create_start.append(stamp("connect_start_at"))
+    trace_config.on_connection_create_end.append(stamp("connected_at"))
+    trace_config.on_connection_reuseconn.append(stamp("connected_at"))
+    return trace_config
+
+
+def record_network_timing(stat: RequestStat, timing: Dict[Text, float]) -> NoReturn:
+    """ record DNS lookup, connect and TTFB time traced in timing dict to stat.
+    """
+    if "dns_end_at" in timing:
+        stat.dns_ms = (timing["dns_end_at"] - timing["dns_start_at"]) * 1000
+    if "connect_start_at" in timing and "connected_at" in timing:
+        # resolving host is included in creating connection by aiohttp
+        stat.connect_ms = (timing["connected_at"] - timing["connect_start_at"]) * 1000 - stat.dns_ms
+    if "connected_at" in timing and "headers_received_at" in timing:
+        stat.ttfb_ms = (timing["headers_received_at"] - timing["connected_at"]) * 1000
+
+
+class AsyncHttpSession(object):
+    """ asyncio HTTP session based on aiohttp.
+
+    Requests are prepared in the same way as HttpSession, i.e. with requests.Session, and aiohttp
+    responses are converted to requests.Response, thus extraction, validation and recorded
+    SessionData are the same as running with HttpSession. Cookies are held between requests.
+
+    Sessions of concurrent testcases can share one aiohttp connector, i.e. connection pool.
+    """
+
+    def __init__(self, connector: "aiohttp.BaseConnector" = None):
+        ensure_aio_ready()
+        self.data = SessionData()
+        self.__connector = connector
+        self.__session: "aiohttp.ClientSession" = None
+        self.__session_owner = True
+        # prepare requests and hold cookies like HttpSession
+        self.__requests_session = requests.Session()
+        self.record_req_resps = True
+
+    def fork(self) -> "AsyncHttpSession":
+        """ create session sharing cookies and connection pool with current session,
+            thus requests can be sent concurrently with separate session data.
+        """
+        session = AsyncHttpSession(self.__connector)
+        session.__session = self.__get_session()
+        session.__session_owner = False
+        session.__requests_session = self.__requests_session
+        session.record_req_resps = self.record_req_resps
+        return session
+
+    @property
+    def cookies(self) -> RequestsCookieJar:
+        return self.__requests_session.cookies
+
+    async def close(self) -> NoReturn:
+        if self.__session is not None and self.__session_owner:
+            await self.__session.close()
+        self.__session = None
+
+    def __get_session(self) -> "aiohttp.ClientSession":
+        if self.__session is None:
+            # session should be created in running event loop
+            self.__session = aiohttp.ClientSession(
+                connector=self.__connector,
+                connector_owner=self.__connector is None,
+                # cookies are held in requests cookie jar
+                cookie_jar=aiohttp.DummyCookieJar(),
+                trust_env=True,
+                trace_configs=[get_trace_config()],
+                response_class=AddressRecordingResponse,
+            )
+
+        return self.__session
+
+    async def request(self, method: Text, url: Text, name=None, **kwargs) -> Response:
+        """ send request asynchronously, arguments are the same as HttpSession.request
+        """
+        self.data = SessionData()
+
+        # timeout default to 120 seconds
+        timeout = kwargs.pop("timeout", None) or 120
+        allow_redirects = kwargs.pop("allow_redirects", True)
+        verify = kwargs.pop("verify", True)
+        cert = kwargs.pop("cert", None)
+        proxies = kwargs.pop("proxies", None) or {}
+        allure_param = kwargs.pop("allure", None)
+        # response content is always read
+        kwargs.pop("stream", None)
+        unsupported_options = set(kwargs) - {
+            "headers", "files", "data", "json", "params", "auth", "cookies"
+        }
+        if unsupported_options:
+            raise exceptions.ParamsError(
+                f"request options not supported by AsyncHttpSession: "
+                f"{sorted(unsupported_options)}"
+            )
+
+        # 实现xml传参
+        if kwargs.get("data") is not None and isinstance(kwargs["data"], str):
+            if kwargs["data"].strip().startswith("<xml>") and kwargs["data"].strip().endswith("</xml>"):
+                kwargs["data"] = str(kwargs["data"]).encode("utf-8").decode("latin1")
+        # 实现form-data传参
+        if kwargs.get("files") is not None:
+            quote_dict(kwargs["files"])
+        if kwargs.get("headers") is not None:
+            quote_dict(kwargs["headers"])
+
+        req = Request(
+            method=method.upper(),
+            url=url,
+            headers=kwargs.get("headers"),
+            files=kwargs.get("files"),
+            data=kwargs.get("data") or {},
+            json=kwargs.get("json"),
+            params=kwargs.get("params") or {},
+            auth=kwargs.get("auth"),
+            cookies=kwargs.get("cookies"),
+        )
+        prepared = self.__requests_session.prepare_request(req)
+        if allure_param is not None:
+            allure_param.curl = curlify.to_curl(prepared, compressed=True)
+
+        start_timestamp = time.time()
+        response = await self.__send_request_safe_mode(
+            prepared,
+            timeout=get_client_timeout(timeout),
+            allow_redirects=allow_redirects,
+            ssl=get_ssl_param(verify, tuple(cert) if isinstance(cert, list) else cert),
+            # proxies of requests are keyed by scheme or scheme://host, environment proxies are
+            # used by aiohttp session if not specified
+            proxy=select_proxy(prepared.url, proxies),
+        )
+        response_time_ms = round((time.time() - start_timestamp) * 1000, 2)
+
+        record_session_data(self.data, response, response_time_ms, self.record_req_resps)
+        return response
+
+    async def __send_request_safe_mode(self, prepared: PreparedRequest, **kwargs) -> Response:
+        """ send prepared request with aiohttp, and catch any exception that might occur due to
+            connection problems like HttpSession does.
+        """
+        body = prepared.body
+        if hasattr(body, "read"):
+            # file-like body, e.g. MultipartEncoder of upload test
+            body = body.read()
+        if isinstance(body, Text):
+            # http.client encodes str body in latin-1
+            body = body.encode("latin-1")
+
+        skip_auto_headers = [
+            header
+            for header in ("Content-Type", "Accept-Encoding", "User-Agent")
+            if header not in prepared.headers
+        ]
+        timing = {}
+        start_at = time.perf_counter()
+        try:
+            async with self.__get_session().request(
+                    prepared.method,
+                    yarl.URL(prepared.url, encoded=True),
+                    data=body,
+                    headers=prepared.headers,
+                    skip_auto_headers=skip_auto_headers,
+                    trace_request_ctx=timing,
+                    **kwargs,
+            ) as resp:
+                # time elapsed between sending request and response headers arrived, like requests
+                timing["headers_received_at"] = time.perf_counter()
+                elapsed = datetime.timedelta(seconds=timing["headers_received_at"] - start_at)
+                self.__record_address(resp)
+                response = await self.__build_response(prepared, resp, elapsed)
+                record_network_timing(response.network_stat, timing)
+                return response
+
+        except aiohttp.InvalidURL as ex:
+            raise InvalidURL(ex, request=prepared)
+        except asyncio.TimeoutError as ex:
+            error = Timeout(ex, request=prepared)
+        except aiohttp.TooManyRedirects as ex:
+            error = TooManyRedirects(ex, request=prepared)
+        except aiohttp.ClientError as ex:
+            error = ConnectionError(ex, request=prepared)
+
+        resp = ApiResponse()
+        resp.error = error
+        resp.status_code = 0  # with this status_code, content returns None
+        resp.request = prepared
+        return resp
+
+    def __record_address(self, resp: "AddressRecordingResponse") -> NoReturn:
+        transport = resp.transport
+        if transport is None:
+            logger.warning("failed to get client and server address info: connection closed")
+            return
+
+        client_ip, client_port = transport.get_extra_info("sockname")[:2]
+        self.data.stat.connection_reused = mark_connection_used(transport)
+        self.data.address.client_ip = client_ip
+        self.data.address.client_port = client_port
+        logger.debug(f"client IP: {client_ip}, Port: {client_port}")
+
+        server_ip, server_port = transport.get_extra_info("peername")[:2]
+        self.data.address.server_ip = server_ip
+        self.data.address.server_port = server_port
+        logger.debug(f"server IP: {server_ip}, Port: {server_port}")
+
+    async def __build_response(
+            self,
+            prepared: PreparedRequest,
+            resp: "aiohttp.ClientResponse",
+            elapsed: datetime.timedelta,
+    ) -> Response:
+        """ convert aiohttp response, include 30X redirection history, to requests.Response
+        """
+        history = []
+        for redirect_resp in resp.history:
+            redirect_response = self.__convert_response(prepared, redirect_resp)
+            redirect_response._content = b""
+            redirect_response.elapsed = elapsed
+            history.append(redirect_response)
+
+        response = self.__convert_response(prepared, resp)
+        start_at = time.perf_counter()
+        response._content = await resp.read()
+        response.network_stat = RequestStat(
+            download_ms=(time.perf_counter() - start_at) * 1000,
+            body_bytes=resp.content.total_bytes,
+        )
+        response.elapsed = elapsed
+        response.history = history
+        return response
+
+    def __convert_response(
+            self, prepared: PreparedRequest, resp: "aiohttp.ClientResponse"
+    ) -> Response:
+        request = prepared
+        request_url = str(resp.request_info.url)
+        if request_url != prepared.url:
+            # redirected request
+            request = prepared.copy()
+            request.prepare_url(request_url, None)
+            if resp.request_info.method != prepared.method:
+                request.method = resp.request_info.method
+                request.body = None
+
+        response = Response()
+        response.status_code = resp.status
+        response.reason = resp.reason
+        response.url = str(resp.url)
+        response.request = request
+        response.connection = None
+
+        # multiple headers with the same name are joined like requests
+        headers = CaseInsensitiveDict()
+        for key, value in resp.headers.items():
+            headers[key] = f"{headers[key]}, {value}" if key in headers else value
+        response.headers = headers
+        response.encoding = get_encoding_from_headers(headers)
+
+        extract_cookies_to_jar(response.cookies, request, resp)
+        extract_cookies_to_jar(self.cookies, request, resp)
+        return response
+
+
+class AsyncHttpRunner(object):
+    """ run HttpRunner testcase with AsyncHttpSession in asyncio event loop.
+
+    Examples:
+        >>> runner = await AsyncHttpRunner(TestCaseLogin()).test_start()
+        >>> runner.get_summary()
+
+    """
+
+    def __init__(
+            self, runner: HttpRunner = None, connector: "aiohttp.BaseConnector" = None
+    ):
+        self.runner = runner or HttpRunner()
+        self.session = AsyncHttpSession(connector)
+        self.runner.with_session(self.session)
+
+    async def __run_requests(
+            self, runner_iterator: RunnerIterator, session: AsyncHttpSession
+    ) -> Any:
+        """ send requests yielded by runner iterator with asyncio session, until it is exhausted,
+            exception raised while sending request is thrown into the iterator.
+        """
+        try:
+            item = next(runner_iterator)
+            while True:
+                if isinstance(item, list):
+                    # teststeps run concurrently
+                    item = runner_iterator.send(await self.__run_parallel_steps(item, session))
+                    continue
+
+                method, url, kwargs = item
+                resp, error = None, None
+                try:
+                    resp = await session.request(method, url, **kwargs)
+                except Exception as ex:
+                    error = ex
+
+                if error is not None:
+                    item = runner_iterator.throw(error)
+                else:
+                    item = runner_iterator.send(resp)
+        except StopIteration as ex:
+            return ex.value
+        finally:
+            await session.close()
+
+    async def __run_parallel_steps(
+            self, step_runners: List[Callable], session: AsyncHttpSession
+    ) -> List[Any]:
+        """ run teststeps concurrently, each with forked session which shares cookies and
+            connection pool, return step data or exception of each teststep.
+        """
+        forked_sessions = [session.fork() for _ in step_runners]
+        return await asyncio.gather(
+            *[
+                self.__run_requests(step_runner(forked_session), forked_session)
+                for step_runner, forked_session in zip(step_runners, forked_sessions)
+            ],
+            return_exceptions=True,
+        )
+
+    async def run_testcase(self, testcase: TestCase) -> HttpRunner:
+        """ run specified testcase
+
+        Examples:
+            >>> testcase_obj = TestCase(config=TConfig(...), teststeps=[TStep(...)])
+            >>> await AsyncHttpRunner().run_testcase(testcase_obj)
+
+        """
+        return await self.__run_requests(self.runner.iter_testcase(testcase), self.session)
+
+    async def test_start(self, param: Dict = None) -> HttpRunner:
+        return await self.__run_requests(self.runner.iter_start(param), self.session)
+
+
+async def run_testcases_async(
+        testcase_items: List[TestCaseItem],
+        max_concurrency: int = DEFAULT_MAX_WORKERS,
+        spool: StepSpool = None,
+) -> TestSuiteSummary:
+    """ run testcases concurrently in current event loop, and aggregate testcase summaries.
+
+    Args:
+        testcase_items: testcase classes, or (testcase class, parameters) tuples
+        max_concurrency: max number of testcases running at the same time
+        spool: append step datas to spool, request & response data are not kept in summary
+
+    Examples:
+        >>> summary = await run_testcases_async([TestCaseLogin, TestCaseSearch], 100)
+        >>> summary.stat
+            Stat(total=2, success=2, fail=0)
+
+    """
+    ensure_aio_ready()
+    start_at = time.time()
+    semaphore = asyncio.Semaphore(max_concurrency)
+    # connections are reused between testcases
+    connection_pool = globalvar.get_value("connection_pool")
+    connector = aiohttp.TCPConnector(
+        limit=max_concurrency,
+        limit_per_host=connection_pool.pool_maxsize if connection_pool else 0,
+    )
+
+    async def run_testcase_item(testcase_item: TestCaseItem):
+        testcase_cls, param = parse_testcase_item(testcase_item)
+        async with semaphore:
+            runner = testcase_cls().with_case_id(str(uuid.uuid4())).with_spool(spool)
+            testcase_start_at = time.time()
+            try:
+                await AsyncHttpRunner(runner, connector).test_start(param)
+            except Exception as ex:
+                return get_testcase_summary(runner, testcase_start_at, ex)
+
+            return get_testcase_summary(runner, testcase_start_at)
+
+    try:
+        testcase_summaries = await asyncio.gather(
+            *[run_testcase_item(testcase_item) for testcase_item in testcase_items]
+        )
+    finally:
+        await connector.close()
+
+    return summarize_testcases(list(testcase_summaries), start_at)
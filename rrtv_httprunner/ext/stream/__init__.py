@@ -0,0 +1,173 @@
+""" streaming JSON extraction extension.
+
+If you want to use this extension, you should install the following dependencies first.
+
+- ijson
+
+Then you can extract and validate fields of very large JSON response body without loading it,
+body paths referenced by extractors and validators of the teststep are searched in one pass over
+the response stream, and only the matched values are kept in memory:
+
+    >>> Step(
+    ...     RunRequest("export users")
+    ...         .get("/users/export")
+    ...         .set_stream()
+    ...         .extract()
+    ...         .with_jmespath("body.meta.total", "total")
+    ...         .validate()
+    ...         .assert_equal("status_code", 200)
+    ...         .assert_equal("body.data[0].id", 1)
+    ... )
+
+Notice: only plain dotted paths of body with non-negative indexes are supported, e.g.
+body.data[0].id, and response body is not recorded in session data.
+
+"""
+
+import sys
+from typing import IO, Any, Dict, Iterable, Iterator, List, Tuple, Union
+
+from loguru import logger
+
+try:
+    import ijson
+
+    STREAM_READY = True
+except ModuleNotFoundError:
+    STREAM_READY = False
+
+
+def ensure_stream_ready():
+    if STREAM_READY:
+        return
+
+    msg = """
+    stream extension dependencies uninstalled, install first and try again.
+    install with pip:
+    $ pip install ijson
+
+    or you can install rrtv_httprunner with optional stream dependencies:
+    $ pip install "rrtv_httprunner[stream]"
+    """
+    logger.error(msg)
+    sys.exit(1)
+
+
+def iter_json_events(stream: IO[bytes]) -> Iterator[Tuple]:
+    """ iterate (event, value) of JSON stream, numbers are parsed as int or float like json.
+
+    Raises:
+        ValueError: stream is not valid JSON
+
+    """
+    try:
+        yield from ijson.basic_parse(stream, use_float=True)
+    except ijson.JSONError as ex:
+        raise ValueError(f"invalid JSON stream: {ex}")
+
+
+def search_json_stream(
+        stream: IO[bytes], paths: Iterable[Tuple[Union[str, int], ...]]
+) -> Dict[Tuple, Any]:
+    """ search paths in JSON stream in one pass, stream is read until all paths are found.
+
+    Args:
+        stream: file-like object of JSON bytes
+        paths: paths of keys and non-negative indexes, e.g. ("data", 0, "id"), () for the whole JSON
+
+    Returns:
+        dict: values of found paths, paths not found are missing.
+
+    Raises:
+        ValueError: stream is not valid JSON
+
+    Examples:
+        >>> search_json_stream(io.BytesIO(b'{"data": [{"id": 1}], "total": 1}'), [("data", 0, "id")])
+        {('data', 0, 'id'): 1}
+
+    """
+    paths = set(paths)
+    # prefixes of searched paths, events outside them are skipped
+    prefixes = {path[:index] for path in paths for index in range(len(path) + 1)}
+    values = {}
+
+    # key of object or index of array in each container, and whether container is on searched paths
+    containers: List[List] = []
+    path = []
+    builder = None
+    building_depth = 0
+
+    for event, value in iter_json_events(stream):
+        if builder is not None:
+            # build matched object or array
+            builder.event(event, value)
+            if event == "start_map" or event == "start_array":
+                building_depth += 1
+            elif event == "end_map" or event == "end_array":
+                building_depth -= 1
+
+            if building_depth == 0:
+                values[tuple(path)] = builder.value
+                builder = None
+                if len(values) == len(paths):
+                    break
+            continue
+
+        if event == "map_key":
+            containers[-1][0] = value
+            path[-1] = value
+            continue
+        elif event == "end_map" or event == "end_array":
+            containers.pop()
+            path.pop()
+            continue
+
+        # start of value
+        if containers:
+            container = containers[-1]
+            if isinstance(container[0], int):
+                container[0] += 1
+                path[-1] = container[0]
+
+            if not container[1]:
+                # value of skipped container
+                if event == "start_map" or event == "start_array":
+                    containers.append([None if event == "start_map" else -1, False])
+                    path.append(None)
+                continue
+
+        current_path = tuple(path)
+        if current_path in paths:
+            if event == "start_map" or event == "start_array":
+                builder = ijson.ObjectBuilder()
+                builder.event(event, value)
+                building_depth = 1
+            else:
+                values[current_path] = value
+                if len(values) == len(paths):
+                    break
+            continue
+
+        if event == "start_map" or event == "start_array":
+            containers.append([None if event == "start_map" else -1, current_path in prefixes])
+            path.append(None)
+
+    # paths inside matched objects or arrays, e.g. ("data", 0) when ("data",) is also searched
+    for searched_path in paths - values.keys():
+        for index in range(len(searched_path) - 1, -1, -1):
+            if searched_path[:index] not in values:
+                continue
+
+            value = values[searched_path[:index]]
+            for key in searched_path[index:]:
+                if isinstance(key, int) and isinstance(value, list) and key < len(value):
+                    value = value[key]
+                elif not isinstance(key, int) and isinstance(value, dict) and key in value:
+                    value = value[key]
+                else:
+                    break
+            else:
+                values[searched_path] = value
+            break
+
+    return values
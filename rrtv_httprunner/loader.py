@@ -1,10 +1,12 @@
+import builtins
 import csv
+import functools
 import importlib
 import json
 import os
 import sys
 import types
-from typing import Tuple, Dict, Union, Text, List, Callable
+from typing import Tuple, Dict, Union, Text, List, Callable, Iterator
 
 import yaml
 from loguru import logger
@@ -12,7 +14,8 @@ from pydantic import ValidationError
 
 from rrtv_httprunner import builtin, utils
 from rrtv_httprunner import exceptions
-from rrtv_httprunner.models import TestCase, ProjectMeta, TestSuite
+from rrtv_httprunner.cache import FunctionCache
+from rrtv_httprunner.models import TestCase, ProjectMeta, TestSuite, FunctionsMapping
 
 try:
     # PyYAML version >= 5.1
@@ -144,6 +147,44 @@ def load_dot_env_file(dot_env_path: Text) -> Dict:
     return env_variables_mapping
 
 
+class LazyCSVFile(object):
+    """ csv file content streamed lazily, rows are read from file each time it is iterated,
+        thus huge csv file can be used as parameters without loading it into memory.
+
+    Examples:
+        >>> csv_content = LazyCSVFile("account.csv")
+        >>> for row in csv_content:
+        ...     print(row)
+        {'username': 'test1', 'password': '111111'}
+        {'username': 'test2', 'password': '222222'}
+
+    """
+
+    def __init__(self, csv_file: Text):
+        if not os.path.isabs(csv_file):
+            global project_meta
+            if project_meta is None:
+                raise exceptions.MyBaseFailure("load_project_meta() has not been called!")
+
+            # make compatible with Windows/Linux
+            csv_file = os.path.join(project_meta.RootDir, *csv_file.split("/"))
+
+        if not os.path.isfile(csv_file):
+            # file path not exist
+            raise exceptions.CSVNotFound(csv_file)
+
+        self.csv_file = csv_file
+
+    def __iter__(self) -> Iterator[Dict]:
+        with open(self.csv_file, encoding="utf-8") as csvfile:
+            reader = csv.DictReader(csvfile)
+            for row in reader:
+                yield row
+
+    def __repr__(self):
+        return f"LazyCSVFile({self.csv_file!r})"
+
+
 def load_csv_file(csv_file: Text) -> List[Dict]:
     """ load csv file and check file content format
 
@@ -168,26 +209,7 @@ def load_csv_file(csv_file: Text) -> List[Dict]:
         ]
 
     """
-    if not os.path.isabs(csv_file):
-        global project_meta
-        if project_meta is None:
-            raise exceptions.MyBaseFailure("load_project_meta() has not been called!")
-
-        # make compatible with Windows/Linux
-        csv_file = os.path.join(project_meta.RootDir, *csv_file.split("/"))
-
-    if not os.path.isfile(csv_file):
-        # file path not exist
-        raise exceptions.CSVNotFound(csv_file)
-
-    csv_content_list = []
-
-    with open(csv_file, encoding="utf-8") as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            csv_content_list.append(row)
-
-    return csv_content_list
+    return list(LazyCSVFile(csv_file))
 
 
 def load_folder_files(folder_path: Text, recursive: bool = True) -> List:
@@ -255,12 +277,76 @@ def load_module_functions(module) -> Dict[Text, Callable]:
     return module_functions
 
 
+def load_function_caches(functions: FunctionsMapping) -> Dict[Text, FunctionCache]:
+    """ load function caches of functions decorated with memoize
+
+    Args:
+        functions (dict): functions mapping, e.g. loaded from debugtalk.py
+
+    Returns:
+        dict: function caches mapping
+
+            {
+                "func1_name": FunctionCache(func1),
+            }
+
+    """
+    return {
+        name: func.function_cache
+        for name, func in functions.items()
+        if isinstance(getattr(func, "function_cache", None), FunctionCache)
+    }
+
+
 def load_builtin_functions() -> Dict[Text, Callable]:
     """ load builtin module functions
     """
     return load_module_functions(builtin)
 
 
+@functools.lru_cache(maxsize=None)
+def load_builtin_functions_resolver() -> Dict[Text, Callable]:
+    """ load functions which are available without debugtalk.py, loaded only once.
+        priority: extension functions > HttpRunner builtin functions > Python builtin functions
+
+    Returns:
+        dict: functions mapping, should not be modified
+
+    """
+    # extension for upload test
+    from rrtv_httprunner.ext import uploader
+
+    functions_resolver = dict(vars(builtins))
+    functions_resolver.update(load_builtin_functions())
+    functions_resolver.update(
+        {
+            "parameterize": load_csv_file,
+            "P": load_csv_file,
+            "environ": utils.get_os_environ,
+            "ENV": utils.get_os_environ,
+            "multipart_encoder": uploader.multipart_encoder,
+            "multipart_content_type": uploader.multipart_content_type,
+        }
+    )
+    return functions_resolver
+
+
+def load_functions_resolver(functions: Dict[Text, Callable]) -> Dict[Text, Callable]:
+    """ merge project functions with builtin functions, thus each function can be got
+        with one lookup, project functions (debugtalk.py, service modules) take precedence.
+
+    Args:
+        functions: project functions mapping
+
+    Returns:
+        dict: merged functions mapping
+
+    """
+    functions_resolver = dict(load_builtin_functions_resolver())
+    functions_resolver.update(functions)
+    return functions_resolver
+
+
 def locate_file(start_path: Text, file_name: Text) -> Text:
     """ locate filename and return absolute file path.
         searching will be recursive upward until system root dir.
@@ -502,8 +588,9 @@ def load_project_meta(test_path: Text, reload: bool = False) -> ProjectMeta:
 
     # locate project RootDir and load debugtalk.py functions
     project_meta.RootDir = project_root_directory
-    project_meta.functions = debugtalk_functions
-    project_meta.functions.update(custom_functions)
+    debugtalk_functions.update(custom_functions)
+    project_meta.functions = load_functions_resolver(debugtalk_functions)
+    project_meta.function_caches = load_function_caches(debugtalk_functions)
     project_meta.debugtalk_path = debugtalk_path
     project_meta.custom_path = debugtalk_path
     return project_meta
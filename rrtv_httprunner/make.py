@@ -23,7 +23,7 @@ from rrtv_httprunner.loader import (
     load_project_meta,
     convert_relative_project_root_dir,
 )
-from rrtv_httprunner.response import uniform_validator
+from rrtv_httprunner.response import normalize_validator
 from rrtv_httprunner.utils import merge_variables, is_support_multiprocessing
 
 """ cache converted pytest files, avoid duplicate making
@@ -209,6 +209,21 @@ def make_config_chain_style(config: Dict) -> Text:
     if "weight" in config:
         config_chain_style += f'.locust_weight({config["weight"]})'
 
+    if config.get("lazy_variables"):
+        config_chain_style += ".lazy_variables()"
+
+    if config.get("parallel_steps"):
+        config_chain_style += ".parallel_steps()"
+
+    if "record" in config:
+        config_chain_style += f'.record("{config["record"]}")'
+
+    if config.get("connection_pool"):
+        config_chain_style += f'.connection_pool(**{config["connection_pool"]})'
+
+    if config.get("validation_sampling"):
+        config_chain_style += f'.sample_validation(**{config["validation_sampling"]})'
+
     return config_chain_style
 
 
@@ -253,6 +268,9 @@ def make_request_chain_style(request: Dict) -> Text:
         allow_redirects = request["allow_redirects"]
         request_chain_style += f".set_allow_redirects({allow_redirects})"
 
+    if request.get("stream"):
+        request_chain_style += ".set_stream()"
+
     if "upload" in request:
         upload = request["upload"]
         request_chain_style += f".upload(**{upload})"
@@ -316,7 +334,7 @@ def make_teststep_chain_style(teststep: Dict) -> Text:
         step_info += ".validate()"
 
         for v in teststep["validate"]:
-            validator = uniform_validator(v)
+            validator = normalize_validator(v)
             assert_method = validator["assert"]
             check = validator["check"]
             if '"' in check:
@@ -329,7 +347,18 @@ def make_teststep_chain_style(teststep: Dict) -> Text:
                 expect = f'"{expect}"'
 
             message = validator["message"]
-            if message:
+            if validator["condition"] is not None:
+                # conditional validator is evaluated while running, e.g. assert_if_equal
+                if assert_method != "equal":
+                    raise exceptions.TestCaseFormatError(f"Invalid conditional validator: {v}")
+                condition = validator["condition"]
+                else_expect = validator["else_expect"]
+                if isinstance(else_expect, Text):
+                    else_expect = f'"{else_expect}"'
+                step_info += (
+                    f".assert_if_equal('{condition}', {check}, {expect}, {else_expect}, '{message}')"
+                )
+            elif message:
                 step_info += f".assert_{assert_method}({check}, {expect}, '{message}')"
             else:
                 step_info += f".assert_{assert_method}({check}, {expect})"
@@ -35,6 +35,32 @@ class MethodEnum(Text, Enum):
     PATCH = "PATCH"
 
 
+class RecordPolicy(Text, Enum):
+    """when to record request & response details of teststeps"""
+
+    ALWAYS = "always"
+    ON_FAILURE = "on_failure"
+    OFF = "off"
+
+
+class ConnectionPool(BaseModel):
+    """connection pool shared by sessions of testcases"""
+
+    # number of hosts which connection pools are kept for
+    pool_connections: int = 10
+    # max number of connections kept for each host
+    pool_maxsize: int = 10
+
+
+class ValidationSampling(BaseModel):
+    """validators except status_code checks only run for sampled responses"""
+
+    # validate 1 in every responses
+    every: int = Field(1, ge=1)
+    # validate percent of responses randomly, used if every is 1
+    percent: float = Field(100, ge=0, le=100)
+
+
 class TConfig(BaseModel):
     name: Name
     verify: Verify = False
@@ -48,6 +74,15 @@ class TConfig(BaseModel):
     path: Text = None
     weight: int = 1
     datasource: Union[VariablesMapping, Text] = {}
+    # evaluate variables on first reference instead of parsing all of them upfront
+    lazy_variables: bool = False
+    # run teststeps which are independent of each other concurrently
+    parallel_steps: bool = False
+    record: RecordPolicy = RecordPolicy.ALWAYS
+    # share connections with other testcases if specified
+    connection_pool: Union[ConnectionPool, None] = None
+    # validate every response if not specified
+    validation_sampling: Union[ValidationSampling, None] = None
 
 
 class TRequest(BaseModel):
@@ -64,6 +99,8 @@ class TRequest(BaseModel):
     timeout: float = 120
     allow_redirects: bool = True
     verify: Verify = False
+    # response body is not loaded, body paths are searched in one pass over response stream
+    stream: bool = False
     upload: Dict = {}  # used for upload files
 
 
@@ -95,7 +132,10 @@ class ProjectMeta(BaseModel):
     debugtalk_path: Text = ""  # debugtalk.py file path
     custom_path: Text = ""  # custom.py file path
     dot_env_path: Text = ""  # .env file path
-    functions: FunctionsMapping = {}  # functions defined in debugtalk.py
+    # functions defined in debugtalk.py and service modules, merged with builtin functions
+    functions: FunctionsMapping = {}
+    # function caches of memoized functions in debugtalk.py and service modules
+    function_caches: Dict[Text, Any] = {}
     env: Env = {}
     RootDir: Text = os.getcwd()  # project root directory (ensure absolute), the path debugtalk.py located
 
@@ -120,6 +160,17 @@ class RequestStat(BaseModel):
     content_size: float = 0
     response_time_ms: float = 0
     elapsed_ms: float = 0
+    # request is sent with connection used by previous requests
+    connection_reused: bool = False
+    # network timing in milliseconds, connection timing is only recorded for new connection
+    dns_ms: float = 0
+    connect_ms: float = 0
+    tls_ms: float = 0
+    # time between starting to send request and receiving response headers
+    ttfb_ms: float = 0
+    download_ms: float = 0
+    # bytes of response body received, before decompression
+    body_bytes: int = 0
 
 
 class AddressData(BaseModel):
@@ -163,6 +214,23 @@ class SessionData(BaseModel):
     validators: Dict = {}
 
 
+class StepTime(BaseModel):
+    """time spent in each phase of teststep, in milliseconds"""
+
+    parse_ms: float = 0
+    setup_hooks_ms: float = 0
+    setup_ms: float = 0
+    # sending request and receiving response, including recording session data
+    request_ms: float = 0
+    decode_ms: float = 0
+    # excluding decoding response body
+    extract_ms: float = 0
+    validate_ms: float = 0
+    teardown_hooks_ms: float = 0
+    teardown_ms: float = 0
+    total_ms: float = 0
+
+
 class StepData(BaseModel):
     """teststep data, each step maybe corresponding to one request or one testcase"""
 
@@ -170,6 +238,30 @@ class StepData(BaseModel):
     name: Text = ""  # teststep name
     data: Union[SessionData, List[SessionData]] = None
     export_vars: VariablesMapping = {}
+    time: StepTime = StepTime()
+
+
+class ConnectionStat(BaseModel):
+    created: int = 0
+    reused: int = 0
+    # sum of network timing of requests, in milliseconds
+    dns_ms: float = 0
+    connect_ms: float = 0
+    tls_ms: float = 0
+    ttfb_ms: float = 0
+    download_ms: float = 0
+    body_bytes: int = 0
+
+
+class ValidationStat(BaseModel):
+    # validators run, and validators skipped by validation sampling
+    validated: int = 0
+    sampled_out: int = 0
+
+
+class FunctionCacheStat(BaseModel):
+    hits: int = 0
+    misses: int = 0
 
 
 class TestCaseSummary(BaseModel):
@@ -180,6 +272,13 @@ class TestCaseSummary(BaseModel):
     in_out: TestCaseInOut = {}
     log: Text = ""
     step_datas: List[StepData] = []
+    # sum of time spent in each phase of teststeps, concurrent steps overlap in time
+    step_time: StepTime = StepTime()
+    # connections created and reused by requests of teststeps
+    connection_stat: ConnectionStat = ConnectionStat()
+    validation_stat: ValidationStat = ValidationStat()
+    # hits and misses of memoized functions during testcase run
+    function_cache_stats: Dict[Text, FunctionCacheStat] = {}
 
 
 class PlatformInfo(BaseModel):
@@ -211,6 +310,8 @@ class TestSuiteSummary(BaseModel):
     stat: Stat = Stat()
     time: TestCaseTime = TestCaseTime()
     platform: PlatformInfo
+    connection_stat: ConnectionStat = ConnectionStat()
+    validation_stat: ValidationStat = ValidationStat()
     testcases: List[TestCaseSummary]
 
 
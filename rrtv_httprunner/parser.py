@@ -1,14 +1,19 @@
 import ast
-import builtins
+import collections
+import copy
+import functools
+import itertools
 import os
 import re
-from typing import Any, Set, Text, Callable, List, Dict
+import threading
+from collections.abc import ItemsView, ValuesView
+from typing import Any, Set, Text, Callable, List, Dict, NamedTuple, Tuple, Union, Iterable, Iterator
 
 from loguru import logger
 from sentry_sdk import capture_exception
 
 from rrtv_httprunner import loader, utils, exceptions
-from rrtv_httprunner.models import VariablesMapping, FunctionsMapping, data_enum
+from rrtv_httprunner.models import VariablesMapping, FunctionsMapping, TStep, data_enum
 from rrtv_httprunner.utils import execute_sql, execute_cmd, get_statement_type, execute_redis, execute_mongo, \
     remove_bracket_first, legitimate_method_call
 
@@ -25,8 +30,14 @@ function_regex_compile2 = re.compile(r"\$\{(\w+)\(([\$\S\w\s=,]*?)\)\}")
 
 suffix_regex_compile1 = r'\[\'(.*?)\'\]'
 suffix_regex_compile2 = r"\[(.*?)\]"
-suffix = []
-suffix2 = []
+
+# max number of compiled raw strings kept in cache
+TEMPLATE_CACHE_SIZE = 4096
+# max number of compiled list/dict raw data passed to parse_data kept in cache
+DATA_TEMPLATE_CACHE_SIZE = 256
+
+# "=" in arguments of functions whose name contains these keywords is part of the statement
+STATEMENT_FUNCTION_KEYWORDS = ("sql", "redis", "mongo", "cmd")
 
 
 def parse_string_value(str_value: Text) -> Any:
@@ -168,11 +179,71 @@ def extract_variables(content: Any) -> Set:
     return set()
 
 
-def parse_function_params(params: Text, func_name: Text) -> Dict:
+@functools.lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def tokenize_function_params(params: Text) -> Tuple[Tuple[Text, int], ...]:
+    """ split function params string by top-level commas, commas in quoted strings,
+        brackets and nested ${...} calls are kept. tokenized result is cached by params string.
+
+    Returns:
+        tuple: (param, position of top-level "=" in param or -1) pairs
+
+    Examples:
+        >>> tokenize_function_params("${gen(1, 2)}, 'a,b', [1, 2], a=3")
+        (('${gen(1, 2)}', -1), (" 'a,b'", -1), (' [1, 2]', -1), (' a=3', 2))
+
+    """
+    tokens: List[Tuple[Text, int]] = []
+    start_position = 0
+    equal_position = -1
+    depth = 0
+    quote = None
+    # quote only starts a string at the beginning of a literal, e.g. 'a,b' or a='b', not in don't
+    quotable = True
+
+    index = 0
+    while index < len(params):
+        char = params[index]
+        if quote:
+            if char == "\\":
+                index += 1
+            elif char == quote:
+                quote = None
+        elif char in "'\"" and quotable:
+            quote = char
+        elif char in "([{":
+            depth += 1
+        elif char in ")]}":
+            depth -= 1
+            if depth < 0:
+                break
+        elif depth == 0 and char == ",":
+            tokens.append((params[start_position:index], equal_position))
+            start_position = index + 1
+            equal_position = -1
+        elif depth == 0 and char == "=" and equal_position == -1:
+            equal_position = index - start_position
+
+        if not char.isspace():
+            quotable = char in "([{,:="
+        index += 1
+
+    if quote or depth != 0:
+        # unbalanced quotes or brackets, e.g. "hi :)", split by all commas
+        return tuple(
+            (param, param.find("=")) for param in params.split(",")
+        )
+
+    tokens.append((params[start_position:], equal_position))
+    return tuple(tokens)
+
+
+def parse_function_params(params: Text, func_name: Text = "") -> Dict:
     """ parse function params to args and kwargs.
 
     Args:
         params (str): function param in string
+        func_name (str): function name, "=" in params of sql/redis/mongo/cmd functions
+            is treated as part of the statement instead of kwargs
 
     Returns:
         dict: function meta dict
@@ -198,30 +269,26 @@ def parse_function_params(params: Text, func_name: Text) -> Dict:
         >>> parse_function_params("1, 2, a=3, b=4")
         {'args': [1, 2], 'kwargs': {'a':3, 'b':4}}
 
+        >>> parse_function_params("${gen(1, 2)}, 'a,b', [1, 2]")
+        {'args': ['${gen(1, 2)}', 'a,b', [1, 2]], 'kwargs': {}}
+
     """
     function_meta = {"args": [], "kwargs": {}}
 
-    params_str = params.strip()
-    if params_str == "":
+    if params.strip() == "":
         return function_meta
-    args_list: List = []
-    # todo bug kv形式传参时会报错
-    if "${" in params_str and ")}" in params_str:
-        args_list.append(params_str)
-        args_list = params_str.split(",")
-    else:
-        func_match = function_regex_compile.match(params_str, 0)
-        if func_match:
-            params_str = func_match.group(2)
-        args_list = params_str.split(",")
-    for arg in args_list:
-        arg = arg.strip()
-
-        if "=" in arg and "sql" not in func_name and "redis" not in func_name and "mongo" not in func_name and "cmd" not in func_name:
-            key, value = arg.split("=", 1)
-            function_meta["kwargs"][key.strip()] = parse_string_value(value.strip())
-        else:
-            function_meta["args"].append(parse_string_value(arg))
+
+    statement_function = any(
+        statement_type in func_name for statement_type in STATEMENT_FUNCTION_KEYWORDS
+    )
+    for arg, equal_position in tokenize_function_params(params):
+        if equal_position != -1 and not statement_function:
+            key, value = arg[:equal_position].strip(), arg[equal_position + 1:]
+            if key.isidentifier() and not value.startswith("="):
+                function_meta["kwargs"][key] = parse_string_value(value.strip())
+                continue
+
+        function_meta["args"].append(parse_string_value(arg.strip()))
 
     return function_meta
 
@@ -269,66 +336,65 @@ def get_mapping_function(
 
     """
     if function_name in functions_mapping:
+        # functions mapping loaded by load_project_meta contains builtin functions already
         return functions_mapping[function_name]
 
-    elif function_name in ["parameterize", "P"]:
-        return loader.load_csv_file
+    try:
+        # check if HttpRunner extension/builtin functions or Python builtin functions
+        return loader.load_builtin_functions_resolver()[function_name]
+    except KeyError:
+        pass
 
-    elif function_name in ["environ", "ENV"]:
-        return utils.get_os_environ
+    raise exceptions.FunctionNotFound(f"{function_name} is not found.")
 
-    elif function_name in ["multipart_encoder", "multipart_content_type"]:
-        # extension for upload test
-        from rrtv_httprunner.ext import uploader
 
-        return getattr(uploader, function_name)
+class VariableToken(NamedTuple):
+    """ compiled variable reference, e.g. $var, ${var} or $var['key']
+    """
 
-    try:
-        # check if HttpRunner builtin functions
-        built_in_functions = loader.load_builtin_functions()
-        return built_in_functions[function_name]
-    except KeyError:
-        pass
+    name: Text
+    suffix: Union[Text, None] = None  # key in $var['key'], None if not specified
+    whole: bool = False  # raw string is the variable itself, return its value directly
 
-    try:
-        # check if Python builtin functions
-        return getattr(builtins, function_name)
-    except AttributeError:
-        pass
 
-    raise exceptions.FunctionNotFound(f"{function_name} is not found.")
+class FunctionToken(NamedTuple):
+    """ compiled function call, e.g. ${func($a, b=1)}
+    """
 
+    name: Text
+    params: Text  # raw function params string
+    args: Tuple
+    kwargs: Dict
+    whole: bool = False  # raw string is the function itself, return its value directly
+    # args contain literal list/dict, which should be copied before being passed to function
+    mutable_args: bool = False
 
-def parse_string(
-        raw_string: Text,
-        variables_mapping: VariablesMapping,
-        functions_mapping: FunctionsMapping,
-) -> Any:
-    """ parse string content with variables and functions mapping.
+
+@functools.lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def compile_string(raw_string: Text) -> Tuple:
+    """ compile raw string content to tokens, compiled result is cached by raw string.
 
     Args:
-        raw_string: raw string content to be parsed.
-        variables_mapping: variables mapping.
-        functions_mapping: functions mapping.
+        raw_string: raw string content to be compiled.
 
     Returns:
-        str: parsed string content.
+        tuple: tokens of literal text, VariableToken and FunctionToken,
+            most recently compiled raw strings are kept in cache.
 
     Examples:
-        >>> raw_string = "abc${add_one($num)}def"
-        >>> variables_mapping = {"num": 3}
-        >>> functions_mapping = {"add_one": lambda x: x + 1}
-        >>> parse_string(raw_string, variables_mapping, functions_mapping)
-            "abc4def"
+        >>> compile_string("abc${add_one($num)}def$var")
+        ('abc', FunctionToken(name='add_one', params='$num', args=('$num',), kwargs={}, whole=False,
+                              mutable_args=False),
+         'def', VariableToken(name='var', suffix=None, whole=False))
 
     """
     try:
         match_start_position = raw_string.index("$", 0)
-        parsed_string = raw_string[0:match_start_position]
+        literal = raw_string[0:match_start_position]
     except ValueError:
-        parsed_string = raw_string
-        return parsed_string
+        return (raw_string,)
 
+    tokens: List = []
     while match_start_position < len(raw_string):
 
         # Notice: notation priority
@@ -338,96 +404,187 @@ def parse_string(
         dollar_match = dolloar_regex_compile.match(raw_string, match_start_position)
         if dollar_match:
             match_start_position = dollar_match.end()
-            parsed_string += "$"
+            literal += "$"
             continue
 
         # search function like ${func($a, $b)}
-        func_match1 = function_regex_compile.match(raw_string, match_start_position)
-        if func_match1 is not None:
-            if legitimate_method_call(func_match1.group(2)) is True:
-                func_match = function_regex_compile.match(raw_string, match_start_position)
-            else:
-                func_match = function_regex_compile2.match(raw_string, match_start_position)
-        else:
-            func_match = None
+        func_match = function_regex_compile.match(raw_string, match_start_position)
+        if func_match is not None and not legitimate_method_call(func_match.group(2)):
+            func_match = function_regex_compile2.match(raw_string, match_start_position)
         if func_match:
             func_name = func_match.group(1)
-            func = get_mapping_function(func_name, functions_mapping)
             func_params_str = func_match.group(2)
             function_meta = parse_function_params(func_params_str, func_name)
-            args = function_meta["args"]
-            kwargs = function_meta["kwargs"]
-            parsed_args = parse_data(args, variables_mapping, functions_mapping)
-            parsed_kwargs = parse_data(kwargs, variables_mapping, functions_mapping)
+            func_raw_str = "${" + func_name + f"({func_params_str})" + "}"
+            mutable_args = any(
+                isinstance(arg, (list, dict))
+                for arg in function_meta["args"] + list(function_meta["kwargs"].values())
+            )
+
+            if literal:
+                tokens.append(literal)
+                literal = ""
+            tokens.append(
+                FunctionToken(
+                    name=func_name,
+                    params=func_params_str,
+                    args=tuple(function_meta["args"]),
+                    kwargs=function_meta["kwargs"],
+                    # raw_string is a function, e.g. "${add_one(3)}"
+                    whole=func_raw_str == raw_string,
+                    mutable_args=mutable_args,
+                )
+            )
+            match_start_position = func_match.end()
+            continue
+
+        # search variable like ${var} or $var
+        var_match = variable_regex_compile.match(raw_string, match_start_position)
+        if var_match:
+            var_name = var_match.group(1) or var_match.group(2)
+            var_suffix = None
+            suffix_re = re.findall(var_name + suffix_regex_compile1, raw_string)
+            if not suffix_re:
+                suffix_re = re.findall(var_name + suffix_regex_compile2, raw_string)
+            if suffix_re:
+                # e.g. $var['key'] => $var
+                var_suffix = suffix_re[0]
+                stripped_string = remove_bracket_first(raw_string)
+                if len(stripped_string) < len(raw_string):
+                    # ignore malformed brackets, e.g. "]$var['key']", which will never stop growing
+                    raw_string = stripped_string
+
+            if literal:
+                tokens.append(literal)
+                literal = ""
+            tokens.append(
+                VariableToken(
+                    name=var_name,
+                    suffix=var_suffix,
+                    # raw_string is a variable, $var or ${var}
+                    whole=f"${var_name}" == raw_string
+                    or "${" + var_name + "}" == raw_string,
+                )
+            )
+            match_start_position = var_match.end()
+            continue
+
+        curr_position = match_start_position
+        try:
+            # find next $ location
+            match_start_position = raw_string.index("$", curr_position + 1)
+            literal += raw_string[curr_position:match_start_position]
+        except ValueError:
+            literal += raw_string[curr_position:]
+            # break while loop
+            match_start_position = len(raw_string)
+
+    if literal:
+        tokens.append(literal)
+
+    return tuple(tokens)
+
+
+class ParseContext(object):
+    """ evaluation context of one parse call, passed down explicitly while parsing nested data.
+        parser keeps no module-global state, thus it is re-entrant and testcases of the same
+        project can be rendered concurrently in a thread pool.
+    """
+
+    __slots__ = ("variables_mapping", "functions_mapping")
+
+    def __init__(
+            self,
+            variables_mapping: VariablesMapping = None,
+            functions_mapping: FunctionsMapping = None,
+    ):
+        self.variables_mapping = variables_mapping or {}
+        self.functions_mapping = functions_mapping or {}
+
+
+def parse_string(
+        raw_string: Text,
+        variables_mapping: VariablesMapping,
+        functions_mapping: FunctionsMapping,
+) -> Any:
+    """ parse string content with variables and functions mapping.
+
+    Args:
+        raw_string: raw string content to be parsed.
+        variables_mapping: variables mapping.
+        functions_mapping: functions mapping.
+
+    Returns:
+        str: parsed string content.
+
+    Examples:
+        >>> raw_string = "abc${add_one($num)}def"
+        >>> variables_mapping = {"num": 3}
+        >>> functions_mapping = {"add_one": lambda x: x + 1}
+        >>> parse_string(raw_string, variables_mapping, functions_mapping)
+            "abc4def"
+
+    """
+    return _parse_string(raw_string, ParseContext(variables_mapping, functions_mapping))
+
+
+def _parse_string(raw_string: Text, context: ParseContext) -> Any:
+    if "$" not in raw_string:
+        return raw_string
+
+    parsed_string = []
+    for token in compile_string(raw_string):
+
+        if isinstance(token, Text):
+            parsed_string.append(token)
+
+        elif isinstance(token, FunctionToken):
+            func = get_mapping_function(token.name, context.functions_mapping)
+            args, kwargs = token.args, token.kwargs
+            if token.mutable_args:
+                # compiled literals are shared between renders, function may modify its arguments
+                args, kwargs = copy.deepcopy((args, kwargs))
+            parsed_args = _parse_data(args, context)
+            parsed_kwargs = _parse_data(kwargs, context)
 
             try:
                 func_eval_value = func(*parsed_args, **parsed_kwargs)
             except Exception as ex:
                 logger.error(
                     f"call function error:\n"
-                    f"func_name: {func_name}\n"
+                    f"func_name: {token.name}\n"
                     f"args: {parsed_args}\n"
                     f"kwargs: {parsed_kwargs}\n"
                     f"{type(ex).__name__}: {ex}"
                 )
                 raise
 
-            func_raw_str = "${" + func_name + f"({func_params_str})" + "}"
-            if func_raw_str == raw_string:
+            if token.whole:
                 # raw_string is a function, e.g. "${add_one(3)}", return its eval value directly
                 return func_eval_value
 
             # raw_string contains one or many functions, e.g. "abc${add_one(3)}def"
-            parsed_string += str(func_eval_value)
-            match_start_position = func_match.end()
-            continue
+            parsed_string.append(str(func_eval_value))
 
-        # search variable like ${var} or $var
-        var_match = variable_regex_compile.match(raw_string, match_start_position)
-        if var_match:
-            var_name = var_match.group(1) or var_match.group(2)
-            var_value = get_mapping_variable(var_name, variables_mapping)
-            global suffix
-            global suffix2
-            suffix_re = re.findall(var_name + suffix_regex_compile1, raw_string)
-            if not suffix_re:
-                suffix_re = re.findall(var_name + suffix_regex_compile2, str(raw_string))
-            if suffix_re:
-                if suffix_re[-1] == "]":
-                    suffix2 = suffix_re[0]
-                else:
-                    suffix = suffix_re[0]
+        else:
+            var_value = get_mapping_variable(token.name, context.variables_mapping)
+            if token.suffix is not None:
+                # e.g. $var['key']
                 if isinstance(var_value, Text) or isinstance(var_value, int):
                     var_value = var_value
+                elif var_value is not None:
+                    var_value = var_value[token.suffix]
                 else:
-                    if var_value is not None:
-                        var_value = var_value[suffix]
-                    else:
-                        return var_value
-                full_string = remove_bracket_first(raw_string)
-                raw_string = full_string
-
-            if f"${var_name}" == raw_string or "${" + var_name + "}" == raw_string:
+                    return var_value
+
+            if token.whole:
                 # raw_string is a variable, $var or ${var}, return its value directly
                 return var_value
 
             # raw_string contains one or many variables, e.g. "abc${var}def"
-            parsed_string += str(var_value)
-            match_start_position = var_match.end()
-            continue
-
-        curr_position = match_start_position
-        try:
-            # find next $ location
-            match_start_position = raw_string.index("$", curr_position + 1)
-            remain_string = raw_string[curr_position:match_start_position]
-        except ValueError:
-            remain_string = raw_string[curr_position:]
-            # break while loop
-            match_start_position = len(raw_string)
+            parsed_string.append(str(var_value))
 
-        parsed_string += remain_string
-    return parsed_string
+    return "".join(parsed_string)
 
 
 def parse_data(
@@ -437,19 +594,28 @@ def parse_data(
 ) -> Any:
     """ parse raw data with evaluated variables mapping.
         Notice: variables_mapping should not contain any variable or function.
+
+        list/dict raw data is compiled once and cached by identity, see get_data_template,
+        thus it should not be changed in place after parsed. template-free subtrees of parsed
+        data are shared with raw data, see DataTemplate.
     """
+    if type(raw_data) in (dict, list, set, tuple):
+        # subclasses are excluded, e.g. LazyVariablesMapping which is changed while running
+        raw_data = get_data_template(raw_data)
+
+    return _parse_data(raw_data, ParseContext(variables_mapping, functions_mapping))
+
+
+def _parse_data(raw_data: Any, context: ParseContext) -> Any:
     if isinstance(raw_data, str):
-        global suffix
-        global suffix2
-        # suffix = []
         # content in string format may contains variables and functions
-        variables_mapping = variables_mapping or {}
-        functions_mapping = functions_mapping or {}
+        variables_mapping = context.variables_mapping
         # only strip whitespaces and tabs, \n\r is left because they maybe used in changeset
         raw_data = raw_data.strip(" \t")
-        var_value = parse_string(raw_data, variables_mapping, functions_mapping)
+        var_value = _parse_string(raw_data, context)
+        statement_type = get_statement_type(var_value)
 
-        if get_statement_type(var_value) == data_enum.MYSQL:
+        if statement_type == data_enum.MYSQL:
             try:
                 if data_enum.DB_CONFIG_SYMBOL in var_value:  # 指定环境执行sql
                     value = execute_sql(var_value.split(data_enum.DB_CONFIG_SYMBOL)[1],
@@ -458,18 +624,11 @@ def parse_data(
                     value = execute_sql(variables_mapping[data_enum.MYSQL], var_value)
             except KeyError:  # 没配置数据源
                 raise exceptions.DBError("mysql datasource not configured")
-            if value is None:  # 如果为None说明非select方法
-                return None  # 直接返回原字符串
-            elif suffix2 == [] or suffix2 == "":  # 没有suffix后缀
-                return value
-            else:
-                try:
-                    return value[suffix2[0]]
-                except KeyError:
-                    raise exceptions.SuffixError("suffix name error")
-        elif get_statement_type(var_value) == data_enum.CMD:
+            # 如果为None说明非select方法
+            return value
+        elif statement_type == data_enum.CMD:
             return execute_cmd(var_value)
-        elif get_statement_type(var_value) == data_enum.REDIS:
+        elif statement_type == data_enum.REDIS:
             try:
                 if data_enum.DB_CONFIG_SYMBOL in var_value:  # 指定环境执行redis
                     return execute_redis(var_value.split(data_enum.DB_CONFIG_SYMBOL)[1],
@@ -478,7 +637,7 @@ def parse_data(
                     return execute_redis(variables_mapping[data_enum.REDIS], var_value)
             except KeyError:  # 没配置数据源
                 raise exceptions.DBError("redis datasource not configured")
-        elif get_statement_type(var_value) == data_enum.MONGO:
+        elif statement_type == data_enum.MONGO:
             try:
                 if data_enum.DB_CONFIG_SYMBOL in var_value:  # 指定环境执行mongo
                     return execute_mongo(var_value.split(data_enum.DB_CONFIG_SYMBOL)[1],
@@ -488,100 +647,521 @@ def parse_data(
             except KeyError:  # 没配置数据源
                 raise exceptions.DBError("mongo datasource not configured")
         else:
-
-            if isinstance(var_value, dict):
-                if suffix2:
-                    match_start_position = raw_data.index("]", 0)
-                    parsed_string = raw_data[match_start_position + 1:]
-                    if parsed_string != "" or parsed_string is not None:
-                        p = parse_string(parsed_string, variables_mapping, functions_mapping)
-                        if suffix2:
-                            val = var_value[suffix2]
-                            return parse_string_value(str(val) + str(p))
-                        else:
-                            return parse_string_value(str(var_value) + str(p))
-                    else:
-                        return var_value[suffix2] if suffix2 != [] else var_value
-                else:
-                    return var_value
-
-            else:
-                if suffix2:
-                    raw_string = str(var_value).replace(' ', '')
-                    if suffix2[0] in raw_string and ":" in raw_string:
-                        match_start_position = raw_string.index(":", 0)
-                        parsed_string = raw_string[match_start_position + 1]
-                        match_content_start_position = raw_string.index("{", 0)
-                        match_content_end_position = raw_string.index("}", 0)
-                        parsed_content_string = raw_string[match_content_start_position:match_content_end_position + 1]
-                        var_value = raw_string.replace(parsed_content_string, parsed_string)
-                        return var_value
-                return var_value
+            return var_value
 
     elif isinstance(raw_data, (list, set, tuple)):
-        return [
-            parse_data(item, variables_mapping, functions_mapping) for item in raw_data
-        ]
+        return [_parse_data(item, context) for item in raw_data]
 
     elif isinstance(raw_data, dict):
         parsed_data = {}
         for key, value in raw_data.items():
-            parsed_key = parse_data(key, variables_mapping, functions_mapping)
-            parsed_value = parse_data(value, variables_mapping, functions_mapping)
+            parsed_key = _parse_data(key, context)
+            parsed_value = _parse_data(value, context)
             parsed_data[parsed_key] = parsed_value
 
         return parsed_data
 
+    elif isinstance(raw_data, DataTemplate):
+        # precompiled list/dict, only templated items are parsed
+        return _render_data(raw_data, context)
+
+    elif isinstance(raw_data, LazyVariable):
+        # variable with lazy evaluation, e.g. passed to referenced testcase
+        return raw_data.evaluate()
+
     else:
         # other types, e.g. None, int, float, bool
         return raw_data
 
 
+def is_template_string(raw_string: Text) -> bool:
+    """ check if string content would be changed by parse_data, i.e. it contains variables,
+        functions or $$ escape, is a sql/redis/mongo/cmd statement, or has spaces to be stripped.
+    """
+    if "$" in raw_string:
+        return True
+
+    stripped_string = raw_string.strip(" \t")
+    return stripped_string != raw_string or get_statement_type(stripped_string) is not None
+
+
+class DataTemplate(object):
+    """ precompiled list/dict raw data, only keeps the templated items,
+        i.e. {key: (compiled_key, compiled_value)} for dict and ((index, compiled_item), ...) for list,
+        compiled key/value is None if it contains no template.
+        containers with templated items are rebuilt when rendering, template-free subtrees are
+        shared by reference with raw data without walking them, thus rendered data must not be
+        changed in place below its top level, copy the subtree before changing it.
+    """
+
+    __slots__ = ("raw_data", "items", "templated_keys")
+
+    def __init__(self, raw_data: Any, items: Any, templated_keys: bool = False):
+        self.raw_data = raw_data
+        self.items = items
+        self.templated_keys = templated_keys
+
+    def __repr__(self):
+        return f"DataTemplate({self.raw_data!r})"
+
+
+def compile_data(raw_data: Any) -> Any:
+    """ precompile raw data, mark subtrees which contain variables, functions or statements.
+
+    Returns:
+        compiled data, None if raw data contains no template, which needs no parsing;
+        raw string or LazyVariable if it should be parsed, DataTemplate for list/dict.
+        the result can be passed to parse_data repeatedly instead of raw data.
+
+    Examples:
+        >>> compile_data({"a": "$var", "b": {"c": [1, 2]}})
+            DataTemplate({"a": "$var", "b": {"c": [1, 2]}})  # items: {"a": (None, "$var")}
+        >>> compile_data({"b": {"c": [1, 2]}})
+            None
+
+    """
+    if isinstance(raw_data, str):
+        return raw_data if is_template_string(raw_data) else None
+
+    elif isinstance(raw_data, dict):
+        items = {}
+        templated_keys = False
+        for key, value in raw_data.items():
+            compiled_key = compile_data(key) if isinstance(key, str) else None
+            compiled_value = compile_data(value)
+            if compiled_key is not None or compiled_value is not None:
+                items[key] = (compiled_key, compiled_value)
+                templated_keys = templated_keys or compiled_key is not None
+
+        if not items:
+            return None
+
+        return DataTemplate(raw_data, items, templated_keys)
+
+    elif isinstance(raw_data, (list, set, tuple)):
+        items = []
+        for index, item in enumerate(raw_data):
+            compiled_item = compile_data(item)
+            if compiled_item is not None:
+                items.append((index, compiled_item))
+
+        if not items and isinstance(raw_data, list):
+            return None
+
+        # set and tuple are always converted to list
+        return DataTemplate(raw_data, tuple(items))
+
+    elif isinstance(raw_data, (LazyVariable, DataTemplate)):
+        return raw_data
+
+    else:
+        # other types, e.g. None, int, float, bool
+        return None
+
+
+def _render_data(data_template: DataTemplate, context: ParseContext) -> Any:
+    """ render precompiled data, only templated items are parsed,
+        template-free subtrees are shared with raw data without parsing.
+    """
+    raw_data = data_template.raw_data
+
+    if not isinstance(raw_data, dict):
+        parsed_data = list(raw_data)
+        for index, compiled_item in data_template.items:
+            parsed_data[index] = _parse_data(compiled_item, context)
+
+        return parsed_data
+
+    if not data_template.templated_keys:
+        parsed_data = dict(raw_data)
+        for key, (_, compiled_value) in data_template.items.items():
+            parsed_data[key] = _parse_data(compiled_value, context)
+
+        return parsed_data
+
+    parsed_data = {}
+    for key, value in raw_data.items():
+        compiled_key, compiled_value = data_template.items.get(key, (None, None))
+        if compiled_key is not None:
+            key = _parse_data(compiled_key, context)
+        if compiled_value is not None:
+            value = _parse_data(compiled_value, context)
+        parsed_data[key] = value
+
+    return parsed_data
+
+
+# compiled list/dict raw data keyed by id, raw data is kept in entry thus its id is not reused
+__data_templates: collections.OrderedDict = collections.OrderedDict()
+__data_templates_lock = threading.Lock()
+
+
+def get_data_template(raw_data: Any) -> DataTemplate:
+    """ get compiled list/dict raw data from cache, compile it on the first call,
+        least recently used ones are evicted first.
+    """
+    key = id(raw_data)
+    with __data_templates_lock:
+        entry = __data_templates.get(key)
+        if entry is not None and entry[0] is raw_data:
+            __data_templates.move_to_end(key)
+            return entry[1]
+
+    # template-free data is rendered to a shallow copy
+    data_template = compile_data(raw_data) or DataTemplate(
+        raw_data, {} if isinstance(raw_data, dict) else ()
+    )
+
+    with __data_templates_lock:
+        __data_templates[key] = (raw_data, data_template)
+        __data_templates.move_to_end(key)
+        while len(__data_templates) > DATA_TEMPLATE_CACHE_SIZE:
+            __data_templates.popitem(last=False)
+
+    return data_template
+
+
+def resolve_variables_order(references: Dict[Text, List[Text]]) -> List[Text]:
+    """ sort variables topologically, each variable comes after the variables it references.
+
+    Args:
+        references: variable name and its referenced variable names mapping
+
+    Returns:
+        list: variable names in resolving order
+
+    Raises:
+        exceptions.VariableCircularReference: variables reference each other circularly.
+
+    Examples:
+        >>> resolve_variables_order({"varA": ["varB"], "varB": ["varC"], "varC": []})
+        ["varC", "varB", "varA"]
+
+        >>> resolve_variables_order({"varA": ["varB"], "varB": ["varA"]})
+        VariableCircularReference: varA -> varB -> varA
+
+    """
+    resolved_variables: List[Text] = []
+    visited: Set[Text] = set()
+
+    for var_name in references:
+        if var_name in visited:
+            continue
+
+        # depth-first search without recursion, in case of long reference chains
+        path: List[Text] = [var_name]
+        path_set: Set[Text] = {var_name}
+        stack = [iter(references[var_name])]
+        while stack:
+            ref_var_name = next(stack[-1], None)
+            if ref_var_name is None:
+                stack.pop()
+                resolved_var_name = path.pop()
+                path_set.remove(resolved_var_name)
+                visited.add(resolved_var_name)
+                resolved_variables.append(resolved_var_name)
+                continue
+
+            if ref_var_name in path_set:
+                # e.g. {"varA": "$varB", "varB": "${func($varA)}"}
+                circular_path = path[path.index(ref_var_name):] + [ref_var_name]
+                raise exceptions.VariableCircularReference(" -> ".join(circular_path))
+
+            if ref_var_name in visited:
+                continue
+
+            path.append(ref_var_name)
+            path_set.add(ref_var_name)
+            stack.append(iter(references[ref_var_name]))
+
+    return resolved_variables
+
+
+def resolve_steps_levels(teststeps: List[TStep]) -> List[List[int]]:
+    """ group teststeps into levels by variables dependency, steps of the same level are
+        independent of each other and can run concurrently, levels run in order.
+
+        a step depends on the latest previous step extracting the variables it references in its
+        request, variables, hooks, validators or extractors, and should not run before previous
+        steps referencing or extracting the variables it extracts.
+        referenced testcase step exports unknown variables, it runs alone after all previous steps.
+        notice: dependencies by cookies or other side effects can not be detected.
+
+    Args:
+        teststeps: teststeps of testcase
+
+    Returns:
+        list: levels of teststeps indexes
+
+    Examples:
+        >>> teststeps = [
+        ...     TStep(name="login", request=..., extract={"token": "body.token"}),
+        ...     TStep(name="get user", request=..., variables={"auth": "$token"}),
+        ...     TStep(name="get orders", request=..., params={"token": "$token"}),
+        ... ]
+        >>> resolve_steps_levels(teststeps)
+        [[0], [1, 2]]
+
+    """
+    levels: List[List[int]] = []
+    steps_levels: List[int] = []
+    # index of the latest step extracting variable
+    latest_writers: Dict[Text, int] = {}
+    # indexes of steps referencing variable since it is extracted last time
+    latest_readers: Dict[Text, List[int]] = collections.defaultdict(list)
+    min_level = 0
+
+    for index, step in enumerate(teststeps):
+        if step.request is None:
+            level = max(steps_levels, default=-1) + 1
+            min_level = level + 1
+        else:
+            # variables referenced by request, variables, hooks and validators of step,
+            # and by expressions of its extractors, e.g. body.items[$index].id
+            reads = extract_variables(
+                step.dict(exclude={"name", "extract", "export", "testcase"})
+            ) | extract_variables(list(step.extract.values()))
+            writes = set(step.extract.keys())
+            level = min_level
+            for var_name in reads:
+                if var_name in latest_writers:
+                    level = max(level, steps_levels[latest_writers[var_name]] + 1)
+
+            for var_name in writes:
+                # extracted variables are merged in steps order after each level
+                for reader_index in latest_readers[var_name]:
+                    level = max(level, steps_levels[reader_index])
+                if var_name in latest_writers:
+                    level = max(level, steps_levels[latest_writers[var_name]])
+
+            for var_name in reads:
+                latest_readers[var_name].append(index)
+            for var_name in writes:
+                latest_writers[var_name] = index
+                latest_readers[var_name] = []
+
+        steps_levels.append(level)
+        if level == len(levels):
+            levels.append([])
+        levels[level].append(index)
+
+    return levels
+
+
 def parse_variables_mapping(
         variables_mapping: VariablesMapping, functions_mapping: FunctionsMapping = None
 ) -> VariablesMapping:
+    """ parse variables mapping, each variable is evaluated exactly once,
+        after all the variables it references have been evaluated.
+    """
+    var_names_index = {var_name: index for index, var_name in enumerate(variables_mapping)}
+    references: Dict[Text, List[Text]] = {}
+
+    for var_name, var_value in variables_mapping.items():
+        variables = extract_variables(var_value)
+
+        # check if reference variable itself
+        if var_name in variables:
+            # e.g               # variables_mapping = {"token": "abc$token"}
+            # variables_mapping = {"key": ["$key", 2]}
+            raise exceptions.VariableCircularReference(f"{var_name} -> {var_name}")
+
+        # check if reference variable not in variables_mapping
+        not_defined_variables = [
+            v_name for v_name in variables if v_name not in variables_mapping
+        ]
+        if not_defined_variables:
+            # e.g. {"varA": "123$varB", "varB": "456$varC"}
+            # e.g. {"varC": "${sum_two($a, $b)}"}
+            raise exceptions.VariableNotFound(not_defined_variables)
+
+        # keep definition order, make evaluation order deterministic
+        references[var_name] = sorted(variables, key=var_names_index.__getitem__)
+
     parsed_variables: VariablesMapping = {}
+    # referenced variables are parsed before, others (e.g. datasource) fall back to raw value
+    lookup_variables = collections.ChainMap(parsed_variables, variables_mapping)
 
-    while len(parsed_variables) != len(variables_mapping):
-        for var_name in variables_mapping:
+    for var_name in resolve_variables_order(references):
+        parsed_variables[var_name] = parse_data(
+            variables_mapping[var_name], lookup_variables, functions_mapping
+        )
 
-            if var_name in parsed_variables:
-                continue
+    return {var_name: parsed_variables[var_name] for var_name in variables_mapping}
 
-            var_value = variables_mapping[var_name]
-            variables = extract_variables(var_value)
 
-            # check if reference variable itself
-            if var_name in variables:
-                # e.g               # variables_mapping = {"token": "abc$token"}
-                # variables_mapping = {"key": ["$key", 2]}
-                raise exceptions.VariableNotFound(var_name)
+class LazyVariable(object):
+    """ variable thunk, raw value is parsed on first evaluation and memoized.
+    """
 
-            # check if reference variable not in variables_mapping
-            not_defined_variables = [
-                v_name for v_name in variables if v_name not in variables_mapping
-            ]
-            if not_defined_variables:
-                # e.g. {"varA": "123$varB", "varB": "456$varC"}
-                # e.g. {"varC": "${sum_two($a, $b)}"}
-                raise exceptions.VariableNotFound(not_defined_variables)
+    __slots__ = (
+        "raw_value", "variables_mapping", "functions_mapping", "evaluated", "value", "lock"
+    )
+
+    def __init__(
+            self,
+            raw_value: Any,
+            variables_mapping: VariablesMapping,
+            functions_mapping: FunctionsMapping = None,
+    ):
+        self.raw_value = raw_value
+        self.variables_mapping = variables_mapping
+        self.functions_mapping = functions_mapping
+        self.evaluated = False
+        self.value = None
+        # variable may be shared by teststeps running in different threads
+        self.lock = threading.RLock()
+
+    def evaluate(self) -> Any:
+        if self.evaluated:
+            return self.value
+
+        with self.lock:
+            if not self.evaluated:
+                self.value = parse_data(
+                    self.raw_value, self.variables_mapping, self.functions_mapping
+                )
+                self.evaluated = True
 
-            try:
-                parsed_value = parse_data(
-                    var_value, variables_mapping, functions_mapping
+        return self.value
+
+    def __repr__(self):
+        if self.evaluated:
+            return repr(self.value)
+
+        return f"LazyVariable({self.raw_value!r})"
+
+
+class LazyVariablesMapping(dict):
+    """ variables mapping with lazy evaluation, each variable is parsed the first time
+        it is referenced, and the evaluated value is memoized in the mapping.
+
+        Values assigned after initialization, e.g. request/response and extracted variables,
+        are treated as evaluated values.
+
+    Examples:
+        >>> variables_mapping = LazyVariablesMapping(
+            {"token": "${gen_token($user_id)}", "user_id": 1000, "unused": "${sleep(10)}"},
+            functions_mapping
+        )
+        >>> parse_data("/api/$user_id?token=$token", variables_mapping, functions_mapping)
+            "/api/1000?token=xxx"  # gen_token is called once, sleep is never called
+
+    """
+
+    def __init__(
+            self,
+            variables_mapping: VariablesMapping = None,
+            functions_mapping: FunctionsMapping = None,
+    ):
+        super(LazyVariablesMapping, self).__init__()
+        self.functions_mapping = functions_mapping or {}
+        # variables being evaluated in current thread, used to detect circular reference
+        self.__local = threading.local()
+
+        if isinstance(variables_mapping, LazyVariablesMapping):
+            variables_items = variables_mapping.lazy_items()
+        else:
+            variables_items = (variables_mapping or {}).items()
+
+        for var_name, var_value in variables_items:
+            if isinstance(var_value, (str, list, set, tuple, dict)):
+                # content may contain variables, functions or statements
+                var_value = LazyVariable(var_value, self, self.functions_mapping)
+
+            # LazyVariable from outer scope, e.g. config variables, is kept as is
+            # thus its evaluated value is shared between teststeps
+            dict.__setitem__(self, var_name, var_value)
+
+    def __getitem__(self, var_name: Text) -> Any:
+        var_value = dict.__getitem__(self, var_name)
+        if not isinstance(var_value, LazyVariable):
+            return var_value
+
+        if not var_value.evaluated:
+            resolving = self.__get_resolving()
+            if var_name in resolving:
+                circular_path = resolving[resolving.index(var_name):]
+                raise exceptions.VariableCircularReference(
+                    " -> ".join(circular_path + [var_name])
                 )
-                # parsed_value = parse_data(
-                #     var_value, parsed_variables, functions_mapping
-                # )
-            except exceptions.VariableNotFound:
-                continue
 
-            parsed_variables[var_name] = parsed_value
+            resolving.append(var_name)
+            try:
+                var_value.evaluate()
+            finally:
+                resolving.pop()
+
+        dict.__setitem__(self, var_name, var_value.value)
+        return var_value.value
 
-    return parsed_variables
+    def __get_resolving(self) -> List[Text]:
+        try:
+            return self.__local.resolving
+        except AttributeError:
+            self.__local.resolving = []
+            return self.__local.resolving
 
+    def __iter__(self) -> Iterator[Text]:
+        # dict subclass overriding __iter__ is copied with keys and __getitem__,
+        # thus dict(variables_mapping) and {**variables_mapping} get evaluated values
+        return dict.__iter__(self)
 
-def parse_parameters(parameters: Dict, ) -> List[Dict]:
+    def get(self, var_name: Text, default: Any = None) -> Any:
+        try:
+            return self[var_name]
+        except KeyError:
+            return default
+
+    def pop(self, var_name: Text, *default: Any) -> Any:
+        if var_name not in self:
+            return dict.pop(self, var_name, *default)
+
+        var_value = self[var_name]
+        dict.__delitem__(self, var_name)
+        return var_value
+
+    def items(self) -> ItemsView:
+        return ItemsView(self)
+
+    def values(self) -> ValuesView:
+        return ValuesView(self)
+
+    def copy(self) -> "LazyVariablesMapping":
+        """ copy variables mapping without evaluation, variables not evaluated yet are shared
+            with the copy and evaluated once.
+        """
+        variables_mapping = LazyVariablesMapping(functions_mapping=self.functions_mapping)
+        dict.update(variables_mapping, self.lazy_items())
+        return variables_mapping
+
+    __copy__ = copy
+
+    def lazy_items(self) -> ItemsView:
+        """ items without evaluation, variables not evaluated yet are LazyVariable.
+        """
+        return dict.items(self)
+
+    def get_evaluated_variables(self) -> VariablesMapping:
+        """ get variables which have been evaluated, unreferenced variables are omitted.
+        """
+        evaluated_variables = {}
+        for var_name, var_value in self.lazy_items():
+            if not isinstance(var_value, LazyVariable):
+                evaluated_variables[var_name] = var_value
+            elif var_value.evaluated:
+                evaluated_variables[var_name] = var_value.value
+
+        return evaluated_variables
+
+
+def parse_parameters(
+        parameters: Dict,
+        offset: int = 0,
+        limit: int = None,
+        shard_index: int = 0,
+        shard_count: int = 1,
+) -> List[Dict]:
     """ parse parameters and generate cartesian product.
 
     Args:
@@ -590,9 +1170,14 @@ def parse_parameters(parameters: Dict, ) -> List[Dict]:
                 (1) data list, e.g. ["iOS/10.1", "iOS/10.2", "iOS/10.3"]
                 (2) call built-in parameterize function, "${parameterize(account.csv)}"
                 (3) call custom function in debugtalk.py, "${gen_app_version()}"
+        offset (int): skip the first offset items of cartesian product
+        limit (int): max number of items after offset, None for no limit
+        shard_index (int): index of current shard, starts from 0
+        shard_count (int): split the window into shard_count shards round-robin,
+            e.g. each of 4 CI workers runs its own quarter with shard_count=4
 
     Returns:
-        list: cartesian product list
+        list: cartesian product list, only the selected window is loaded into memory
 
     Examples:
         >>> parameters = {
@@ -601,14 +1186,41 @@ def parse_parameters(parameters: Dict, ) -> List[Dict]:
             "app_version": "${gen_app_version()}",
         }
         >>> parse_parameters(parameters)
+        >>> parse_parameters(parameters, shard_index=1, shard_count=4)
 
     """
-    parsed_parameters_list: List[List[Dict]] = []
+    return list(iter_parameters(parameters, offset, limit, shard_index, shard_count))
+
+
+def iter_parameters(
+        parameters: Dict,
+        offset: int = 0,
+        limit: int = None,
+        shard_index: int = 0,
+        shard_count: int = 1,
+) -> Iterator[Dict]:
+    """ lazy version of parse_parameters, cartesian product items are generated one by one,
+        csv files loaded by parameterize are streamed instead of being loaded into memory.
+    """
+    if offset < 0 or (limit is not None and limit < 0):
+        raise exceptions.ParamsError(
+            f"parameters offset and limit should not be negative, got offset={offset}, limit={limit}"
+        )
+    if shard_count < 1 or not 0 <= shard_index < shard_count:
+        raise exceptions.ParamsError(
+            f"invalid parameters shard, got shard_index={shard_index}, shard_count={shard_count}"
+        )
+
+    parsed_parameters_list: List[Iterable[Dict]] = []
 
     # load project_meta functions
     # globalvar._init()
     project_meta = loader.load_project_meta(os.getcwd())
-    functions_mapping = project_meta.functions
+    # stream csv file rows for parameters
+    functions_mapping = collections.ChainMap(
+        {"parameterize": loader.LazyCSVFile, "P": loader.LazyCSVFile},
+        project_meta.functions,
+    )
 
     for parameter_name, parameter_content in parameters.items():
         parameter_name_list = parameter_name.split("-")
@@ -630,60 +1242,92 @@ def parse_parameters(parameters: Dict, ) -> List[Dict]:
                 parameter_content_dict = dict(zip(parameter_name_list, parameter_item))
                 parameter_content_list.append(parameter_content_dict)
 
+            parsed_parameters_list.append(parameter_content_list)
+
         elif isinstance(parameter_content, Text):
             # (2) & (3)
-            parsed_parameter_content: List = parse_data(
+            parsed_parameter_content = parse_data(
                 parameter_content, {}, functions_mapping
             )
-            if not isinstance(parsed_parameter_content, List):
+            if isinstance(parsed_parameter_content, (Text, bytes, Dict)) or not isinstance(
+                    parsed_parameter_content, Iterable
+            ):
                 raise exceptions.ParamsError(
                     f"parameters content should be in List type, got {parsed_parameter_content} for {parameter_content}"
                 )
 
-            parameter_content_list: List[Dict] = []
-            for parameter_item in parsed_parameter_content:
-                if isinstance(parameter_item, Dict):
-                    # get subset by parameter name
-                    # {"app_version": "${gen_app_version()}"}
-                    # gen_app_version() => [{'app_version': '2.8.5'}, {'app_version': '2.8.6'}]
-                    # {"username-password": "${get_account()}"}
-                    # get_account() => [
-                    #       {"username": "user1", "password": "111111"},
-                    #       {"username": "user2", "password": "222222"}
-                    # ]
-                    parameter_dict: Dict = {
-                        key: parameter_item[key] for key in parameter_name_list
-                    }
-                elif isinstance(parameter_item, (List, tuple)):
-                    if len(parameter_name_list) == len(parameter_item):
-                        # {"username-password": "${get_account()}"}
-                        # get_account() => [("user1", "111111"), ("user2", "222222")]
-                        parameter_dict = dict(zip(parameter_name_list, parameter_item))
-                    else:
-                        raise exceptions.ParamsError(
-                            f"parameter names length are not equal to value length.\n"
-                            f"parameter names: {parameter_name_list}\n"
-                            f"parameter values: {parameter_item}"
-                        )
-                elif len(parameter_name_list) == 1:
-                    # {"user_agent": "${get_user_agent()}"}
-                    # get_user_agent() => ["iOS/10.1", "iOS/10.2"]
-                    # parameter_dict will get: {"user_agent": "iOS/10.1", "user_agent": "iOS/10.2"}
-                    parameter_dict = {parameter_name_list[0]: parameter_item}
-                else:
-                    raise exceptions.ParamsError(
-                        f"Invalid parameter names and values:\n"
-                        f"parameter names: {parameter_name_list}\n"
-                        f"parameter values: {parameter_item}"
+            if iter(parsed_parameter_content) is parsed_parameter_content:
+                # one-shot iterator, e.g. generator function in debugtalk.py
+                parsed_parameters_list.append(
+                    map(
+                        functools.partial(_parse_parameter_item, parameter_name_list),
+                        parsed_parameter_content,
                     )
-
-                parameter_content_list.append(parameter_dict)
+                )
+            else:
+                parsed_parameters_list.append(
+                    _ParameterContent(parameter_name_list, parsed_parameter_content)
+                )
 
         else:
             raise exceptions.ParamsError(
                 f"parameter content should be List or Text(variables or functions call), got {parameter_content}"
             )
 
-        parsed_parameters_list.append(parameter_content_list)
+    product_iterator = utils.iter_cartesian_product(*parsed_parameters_list)
+    stop = None if limit is None else offset + limit
+    window_iterator = itertools.islice(product_iterator, offset, stop)
+    return itertools.islice(window_iterator, shard_index, None, shard_count)
+
+
+def _parse_parameter_item(parameter_name_list: List[Text], parameter_item: Any) -> Dict:
+    """ convert parameter item returned by function to parameter dict
+    """
+    if isinstance(parameter_item, Dict):
+        # get subset by parameter name
+        # {"app_version": "${gen_app_version()}"}
+        # gen_app_version() => [{'app_version': '2.8.5'}, {'app_version': '2.8.6'}]
+        # {"username-password": "${get_account()}"}
+        # get_account() => [
+        #       {"username": "user1", "password": "111111"},
+        #       {"username": "user2", "password": "222222"}
+        # ]
+        return {key: parameter_item[key] for key in parameter_name_list}
+
+    elif isinstance(parameter_item, (List, tuple)):
+        if len(parameter_name_list) == len(parameter_item):
+            # {"username-password": "${get_account()}"}
+            # get_account() => [("user1", "111111"), ("user2", "222222")]
+            return dict(zip(parameter_name_list, parameter_item))
+        else:
+            raise exceptions.ParamsError(
+                f"parameter names length are not equal to value length.\n"
+                f"parameter names: {parameter_name_list}\n"
+                f"parameter values: {parameter_item}"
+            )
+
+    elif len(parameter_name_list) == 1:
+        # {"user_agent": "${get_user_agent()}"}
+        # get_user_agent() => ["iOS/10.1", "iOS/10.2"]
+        # parameter_dict will get: {"user_agent": "iOS/10.1", "user_agent": "iOS/10.2"}
+        return {parameter_name_list[0]: parameter_item}
+
+    else:
+        raise exceptions.ParamsError(
+            f"Invalid parameter names and values:\n"
+            f"parameter names: {parameter_name_list}\n"
+            f"parameter values: {parameter_item}"
+        )
+
+
+class _ParameterContent(object):
+    """ re-iterable parameter content, items are converted to parameter dict lazily
+    """
+
+    def __init__(self, parameter_name_list: List[Text], parameter_content: Iterable):
+        self.parameter_name_list = parameter_name_list
+        self.parameter_content = parameter_content
 
-    return utils.gen_cartesian_product(*parsed_parameters_list)
+    def __iter__(self) -> Iterator[Dict]:
+        for parameter_item in self.parameter_content:
+            yield _parse_parameter_item(self.parameter_name_list, parameter_item)
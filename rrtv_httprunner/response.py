@@ -1,16 +1,99 @@
-from typing import Dict, Text, Any, NoReturn
+import functools
+import io
+import itertools
+import random
+import re
+import time
+from typing import Callable, Dict, List, NamedTuple, Text, Any, NoReturn, Tuple, Union
 
-import demjson
 import jmespath
 import requests
 from jmespath.exceptions import JMESPathError
+from jmespath.parser import ParsedResult
 from loguru import logger
 
 from rrtv_httprunner import exceptions
+from rrtv_httprunner.client import load_response_json
 from rrtv_httprunner.exceptions import ValidationFailure, ParamsError
-from rrtv_httprunner.models import VariablesMapping, Validators, FunctionsMapping
-from rrtv_httprunner.parser import parse_data, parse_string_value, get_mapping_function
-from rrtv_httprunner.utils import is_json
+from rrtv_httprunner.ext.stream import ensure_stream_ready, search_json_stream
+from rrtv_httprunner.models import (
+    FunctionsMapping,
+    ValidationSampling,
+    Validators,
+    VariablesMapping,
+)
+from rrtv_httprunner.parser import (
+    compile_data,
+    extract_variables,
+    get_mapping_function,
+    parse_data,
+    parse_string_value,
+)
+
+
+# fields of response which can be searched with jmespath
+RESPONSE_FIELDS = ("status_code", "headers", "cookies", "body")
+
+# plain dotted path, e.g. body.data.items[0].id
+simple_path_regex = re.compile(r"^[A-Za-z_]\w*(?:\.[A-Za-z_]\w*|\[-?\d+\])*$", re.ASCII)
+simple_path_token_regex = re.compile(r"([A-Za-z_]\w*)|\[(-?\d+)\]", re.ASCII)
+
+# compiled check item of status_code, which is always validated with validation sampling
+STATUS_CODE_PATH = ("status_code",)
+
+# max number of compiled jmespath expressions kept in cache
+JMESPATH_CACHE_SIZE = 4096
+
+
+@functools.lru_cache(maxsize=JMESPATH_CACHE_SIZE)
+def compile_jmespath(expr: Text) -> Union[None, Tuple, ParsedResult, JMESPathError]:
+    """ compile jmespath expression once, compiled result is cached by expression.
+
+    Returns:
+        None if expression does not reference any response field, i.e. it is not jmespath.
+        tuple of keys and indexes if expression is plain dotted path, which is searched directly.
+        jmespath ParsedResult otherwise, or JMESPathError if expression is invalid.
+
+    Examples:
+        >>> compile_jmespath("body.data.items[0].id")
+        ('body', 'data', 'items', 0, 'id')
+
+    """
+    if not any(field in expr for field in RESPONSE_FIELDS):
+        return None
+
+    if simple_path_regex.match(expr):
+        return tuple(
+            key if key else int(index)
+            for key, index in simple_path_token_regex.findall(expr)
+        )
+
+    try:
+        return jmespath.compile(expr)
+    except JMESPathError as ex:
+        return ex
+
+
+def search_simple_path(path: Tuple, data: Any) -> Any:
+    """ search plain dotted path in data, the same as jmespath does
+    """
+    for key in path:
+        if isinstance(key, int):
+            # index of non-list or out of range is None in jmespath
+            if not isinstance(data, list):
+                return None
+            try:
+                data = data[key]
+            except IndexError:
+                return None
+        else:
+            # field of non-object is None in jmespath
+            try:
+                data = data.get(key)
+            except AttributeError:
+                return None
+
+    return data
 
 
 def get_uniform_comparator(comparator: Text):
@@ -53,21 +136,20 @@ def get_uniform_comparator(comparator: Text):
         return comparator
 
 
-def uniform_validator(validator, variables_mapping: VariablesMapping = None,
-                      functions_mapping: FunctionsMapping = None, ):
-    """ unify validator
+def normalize_validator(validator) -> Dict:
+    """ normalize validator in supported formats, comparator is uniformed but not resolved
 
     Args:
-        functions_mapping:
-        variables_mapping:
         validator (dict): validator maybe in two formats:
 
             format1: this is kept for compatibility with the previous versions.
                 {"check": "status_code", "comparator": "eq", "expect": 201}
                 {"check": "$resp_body_success", "comparator": "eq", "expect": True}
+                {"t1": "body", "t2": {...}, "kwargs": {...}} for diff comparator
             format2: recommended new version, {assert: [check_item, expected_value]}
                 {'eq': ['status_code', 201]}
-                {'eq': ['$resp_body_success', True]}
+                {'eq': ['$resp_body_success', True, "message"]}
+                {'eq': ['$is_new == 1', 'status_code', 201, 200, "message"]}
 
     Returns
         dict: validator info
@@ -75,36 +157,35 @@ def uniform_validator(validator, variables_mapping: VariablesMapping = None,
             {
                 "check": "status_code",
                 "expect": 201,
-                "assert": "equals"
+                "assert": "equals",
+                "message": "",
+                "kwargs": None,
+                "condition": None,
+                "else_expect": None
             }
 
+    Raises:
+        exceptions.ParamsError: invalid validator
+
     """
-    check_item = ""
-    expect_value = ""
-    message = ""
-    comparator = ""
     if not isinstance(validator, dict):
         raise ParamsError(f"invalid validator: {validator}")
 
+    kwargs = None
+    condition = None
+    else_expect = None
     if "check" in validator and "expect" in validator:
         # format1
         check_item = validator["check"]
-        expect_value = validator["expect"]
+        expect_item = validator["expect"]
         message = validator.get("message", "")
         comparator = validator.get("comparator", "eq")
     elif "t1" in validator and "t2" in validator:
         check_item = validator["t1"]
-        expect_value = validator["t2"]
+        expect_item = validator["t2"]
         message = validator.get("message", "")
         comparator = "diff"
         kwargs = validator.get("kwargs", "")
-        return {
-            "check": check_item,
-            "expect": expect_value,
-            "assert": comparator,
-            "kwargs": kwargs,
-            "message": message,
-        }
     elif len(validator) == 1:
         # format2
         comparator = list(validator.keys())[0]
@@ -112,39 +193,205 @@ def uniform_validator(validator, variables_mapping: VariablesMapping = None,
 
         if not isinstance(compare_values, list) or len(compare_values) not in [2, 3, 4, 5]:
             raise ParamsError(f"invalid validator: {validator}")
-        if len(compare_values) == 2 or len(compare_values) == 3:
-            check_item = compare_values[0]
-            expect_value = compare_values[1]
-        if len(compare_values) == 4 or len(compare_values) == 5:
-            condition = parse_data(
-                compare_values[0], variables_mapping, functions_mapping
-            )
-            check_item = compare_values[1]
-            if eval(condition) is True:
-                expect_value = compare_values[2]
-            else:
-                if compare_values[3] is None:
-                    return
-                expect_value = compare_values[3]
-        if len(compare_values) != 3 and len(compare_values) != 5:
-            message = ""
-        elif len(compare_values) == 3:
-            message = compare_values[2]
-        elif len(compare_values) == 5:
-            message = compare_values[4]
-
+        if len(compare_values) in [2, 3]:
+            check_item, expect_item = compare_values[:2]
+        else:
+            condition, check_item, expect_item, else_expect = compare_values[:4]
+        message = compare_values[-1] if len(compare_values) in [3, 5] else ""
     else:
         raise ParamsError(f"invalid validator: {validator}")
 
-    # uniform comparator, e.g. lt => less_than, eq => equals
-    assert_method = get_uniform_comparator(comparator)
-
     return {
         "check": check_item,
-        "expect": expect_value,
-        "assert": assert_method,
+        "expect": expect_item,
+        # uniform comparator, e.g. lt => less_than, eq => equals
+        "assert": get_uniform_comparator(comparator),
         "message": message,
+        "kwargs": kwargs,
+        "condition": condition,
+        "else_expect": else_expect,
+    }
+
+
+def uniform_validator(validator, variables_mapping: VariablesMapping = None,
+                      functions_mapping: FunctionsMapping = None, ):
+    """ unify validator, condition of conditional validator is evaluated with variables,
+        see normalize_validator for supported formats.
+
+    Returns
+        dict: validator info, None if condition is False and else expect value is None
+
+            {
+                "check": "status_code",
+                "expect": 201,
+                "assert": "equals",
+                "message": ""
+            }
+
+    """
+    normalized = normalize_validator(validator)
+    uniformed = {
+        "check": normalized["check"],
+        "expect": normalized["expect"],
+        "assert": normalized["assert"],
+        "message": normalized["message"],
     }
+    if normalized["assert"] == "diff":
+        uniformed["kwargs"] = normalized["kwargs"]
+    elif normalized["condition"] is not None:
+        condition = parse_data(normalized["condition"], variables_mapping, functions_mapping)
+        if eval(condition) is not True:
+            if normalized["else_expect"] is None:
+                return
+            uniformed["expect"] = normalized["else_expect"]
+
+    return uniformed
+
+
+class CompiledValidator(NamedTuple):
+    """ validator compiled once for each teststep, only templated parts are parsed while validating
+    """
+
+    comparator: Text  # uniform comparator name, e.g. equal
+    assert_func: Callable
+    check: Any
+    check_templated: bool = False  # check item contains variables or functions
+    check_path: Any = None  # compiled jmespath of check item which is not templated
+    expect: Any = None
+    expect_template: Any = None  # compiled expect value, None if it contains no template
+    message: Any = ""
+    message_template: Any = None
+    kwargs: Any = None  # kwargs of diff comparator
+    # conditional validator, expect is used if condition is evaluated to True, otherwise
+    # else_expect is used, validator is skipped if else_expect is None
+    condition: Any = None
+    else_expect: Any = None
+    else_expect_template: Any = None
+
+
+@functools.lru_cache(maxsize=JMESPATH_CACHE_SIZE)
+def compile_condition(condition: Text):
+    """ compile condition of conditional validator to code object, cached by condition string
+    """
+    return compile(condition, "<validator condition>", "eval")
+
+
+def compile_validator(validator: Dict, functions_mapping: FunctionsMapping = None) -> CompiledValidator:
+    """ compile validator in formats supported by normalize_validator, comparator function is
+        resolved and check item is compiled to jmespath once.
+
+    Raises:
+        exceptions.ParamsError: invalid validator
+        exceptions.FunctionNotFound: comparator function is not found
+
+    """
+    normalized = normalize_validator(validator)
+    comparator = normalized["assert"]
+    check_item = normalized["check"]
+    check_templated = isinstance(check_item, str) and "$" in check_item
+    check_path = None
+    if isinstance(check_item, Text) and check_item and not check_templated:
+        check_path = compile_jmespath(check_item)
+
+    return CompiledValidator(
+        comparator=comparator,
+        assert_func=get_mapping_function(comparator, functions_mapping or {}),
+        check=check_item,
+        check_templated=check_templated,
+        check_path=check_path,
+        expect=normalized["expect"],
+        expect_template=compile_data(normalized["expect"]),
+        message=normalized["message"],
+        message_template=compile_data(normalized["message"]),
+        kwargs=normalized["kwargs"],
+        condition=normalized["condition"],
+        else_expect=normalized["else_expect"],
+        else_expect_template=compile_data(normalized["else_expect"]),
+    )
+
+
+class ValidationSampler(object):
+    """ decide whether validators of response should be run, 1 in every responses is sampled
+        in order, or percent of responses are sampled randomly.
+    """
+
+    def __init__(self, sampling: ValidationSampling):
+        self.every = sampling.every
+        self.percent = sampling.percent
+        # next() of itertools.count is atomic, thus sampler can be shared between threads
+        self.__counter = itertools.count()
+
+    def sample(self) -> bool:
+        if self.every > 1:
+            return next(self.__counter) % self.every == 0
+        if self.percent < 100:
+            return random.random() * 100 < self.percent
+        return True
+
+
+# samplers shared by testcases with the same sampling settings, keyed by (every, percent)
+__validation_samplers: Dict[Tuple, ValidationSampler] = {}
+
+
+def get_validation_sampler(sampling: ValidationSampling) -> ValidationSampler:
+    key = (sampling.every, sampling.percent)
+    sampler = __validation_samplers.get(key)
+    if sampler is None:
+        sampler = __validation_samplers.setdefault(key, ValidationSampler(sampling))
+    return sampler
+
+
+def parse_validation_sampling(spec: Text) -> ValidationSampling:
+    """ parse validation sampling of command line, e.g. 10 for 1 in 10 responses, 5% for 5 percent
+
+    Raises:
+        exceptions.ParamsError: invalid sampling
+
+    """
+    try:
+        if spec.endswith("%"):
+            sampling = ValidationSampling(percent=float(spec[:-1]))
+        else:
+            sampling = ValidationSampling(every=int(spec))
+    except ValueError:
+        # not a number, or out of range which is rejected by ValidationSampling
+        raise ParamsError(f"invalid validation sampling: {spec}, e.g. 10 or 5%")
+
+    return sampling
+
+
+def get_check_items(
+        extractors: Dict[Text, Text],
+        validators: List[CompiledValidator],
+        variables_mapping: VariablesMapping = None,
+        functions_mapping: FunctionsMapping = None,
+) -> List[Any]:
+    """ get expressions searched by extractors and check items of compiled validators,
+        check items are parsed before extraction, thus they can not reference variables
+        extracted in the same step.
+
+    Raises:
+        exceptions.ParamsError: check item references variable extracted in the same step
+
+    """
+    check_items = [
+        parse_data(field, variables_mapping, functions_mapping) for field in extractors.values()
+    ]
+    for validator in validators:
+        check_item = validator.check
+        if validator.check_templated:
+            extracted_variables = extract_variables(check_item) & set(extractors.keys())
+            if extracted_variables:
+                raise ParamsError(
+                    f"check item {check_item} references variables extracted in the same step: "
+                    f"{sorted(extracted_variables)}, they are not available before extraction"
+                )
+            check_item = parse_string_value(
+                parse_data(check_item, variables_mapping, functions_mapping)
+            )
+        check_items.append(check_item)
+
+    return check_items
 
 
 class ResponseObject(object):
@@ -157,29 +404,24 @@ class ResponseObject(object):
         """
         self.resp_obj = resp_obj
         self.validation_results: Dict = {}
+        # time spent in decoding response body, in milliseconds
+        self.decode_time_ms: float = 0
+        # values of body paths searched in streamed response body
+        self.streamed_values: Dict[Tuple, Any] = None
 
     def __getattr__(self, key):
         if key in ["json", "content", "body"]:
+            if self.streamed_values is not None:
+                raise exceptions.ParamsError(
+                    "response body is streamed, only plain dotted paths of body can be searched"
+                )
+            decode_start_at = time.perf_counter()
             try:
-                value = self.resp_obj.json()
+                value = load_response_json(self.resp_obj)
             except ValueError:
-                response_dict = {}
-                for attr in dir(self.resp_obj):
-                    if attr == "text":
-                        response_dict[attr] = getattr(self.resp_obj, attr)
-                response_body = {}
-                if "text" in response_dict and response_dict["text"] != "":
-                    if is_json(response_dict["text"]):
-                        response_dict['text'] = demjson.decode(response_dict['text'])
-                        for k, v in response_dict['text'].items():
-                            response_body[k] = v
-                        for k, v in response_body["data"].items():
-                            if isinstance(k, int):
-                                response_body["data"][str(k)] = response_body["data"].pop(k)
-                    else:
-                        response_body["data"] = response_dict['text']
-                value = response_body
-                # value = self.resp_obj.content
+                text = self.resp_obj.text
+                value = {"data": text} if text else {}
+            self.decode_time_ms += (time.perf_counter() - decode_start_at) * 1000
         elif key == "cookies":
             value = self.resp_obj.cookies.get_dict()
         else:
@@ -194,29 +436,80 @@ class ResponseObject(object):
         return value
 
     def _search_jmespath(self, expr: Text) -> Any:
-        resp_obj_meta = {
-            "status_code": self.status_code,
-            "headers": self.headers,
-            "cookies": self.cookies,
-            "body": self.body,
-        }
         if expr is None:
             return None
+        if not isinstance(expr, Text):
+            return expr
+
+        return self._search_compiled_jmespath(expr, compile_jmespath(expr))
+
+    def _search_compiled_jmespath(self, expr: Text, compiled: Any) -> Any:
+        if compiled is None:
+            # not jmespath syntax
+            return expr
+        elif isinstance(compiled, tuple):
+            # only the referenced field is loaded, e.g. body is not decoded for status_code
+            field = compiled[0]
+            if field not in RESPONSE_FIELDS:
+                return None
+            if field == "body" and self.streamed_values is not None:
+                try:
+                    return self.streamed_values[compiled[1:]]
+                except KeyError:
+                    raise exceptions.ParamsError(
+                        f"body path is not searched in streamed response body: {expr}"
+                    )
+            return search_simple_path(compiled[1:], getattr(self, field))
+        elif isinstance(compiled, JMESPathError):
+            return parse_string_value(expr)
+
+        # fields not referenced by expression are not loaded
+        resp_obj_meta = {field: getattr(self, field) for field in RESPONSE_FIELDS if field in expr}
+        return compiled.search(resp_obj_meta)
+
+    def search_streamed_body(self, exprs: List[Any]) -> NoReturn:
+        """ search body paths of expressions in one pass over response stream, without loading
+            response body, thus they can be extracted and validated later.
+
+        Raises:
+            exceptions.ParamsError: negative index in body path
+            exceptions.ValidationFailure: response body is not valid JSON
+
+        """
+        ensure_stream_ready()
+        paths = set()
+        for expr in exprs:
+            compiled = compile_jmespath(expr) if isinstance(expr, Text) else None
+            if not isinstance(compiled, tuple) or compiled[0] != "body":
+                continue
+            if any(isinstance(key, int) and key < 0 for key in compiled):
+                raise exceptions.ParamsError(
+                    f"negative index is not supported in streamed response body: {expr}"
+                )
+            paths.add(compiled[1:])
+
+        resp = self.resp_obj
+        if resp._content is False and resp.raw is not None:
+            stream = resp.raw
+            # decompress gzip/deflate body as requests does
+            stream.decode_content = True
+        else:
+            # response body has been loaded, e.g. by AsyncHttpSession
+            stream = io.BytesIO(resp.content or b"")
+
+        decode_start_at = time.perf_counter()
         try:
-            key_list = [key for key in resp_obj_meta.keys()]
-            flag = any(k in expr for k in key_list if not isinstance(expr, int))
-            check_value = jmespath.search(expr, resp_obj_meta) if flag is True else expr
-        except JMESPathError as ex:
-            check_value = parse_string_value(expr)
-            # logger.error(
-            #     f"failed to search with jmespath\n"
-            #     f"expression: {expr}\n"
-            #     f"data: {resp_obj_meta}\n"
-            #     f"exception: {ex}"
-            # )
-            # raise
-
-        return check_value
+            streamed_values = search_json_stream(stream, paths)
+        except ValueError as ex:
+            raise ValidationFailure(f"streamed response body is not valid JSON: {ex}")
+        finally:
+            # release connection, which is closed if response body is not read to the end
+            resp._content_consumed = True
+            resp.close()
+        self.decode_time_ms += (time.perf_counter() - decode_start_at) * 1000
+
+        # paths not found in response body are None as jmespath
+        self.streamed_values = {path: streamed_values.get(path) for path in paths}
 
     def extract(self, extractors: Dict[Text, Text], variables_mapping: VariablesMapping = None,
                 functions_mapping: FunctionsMapping = None) -> Dict[Text, Any]:
@@ -238,11 +531,14 @@ class ResponseObject(object):
 
     def validate(
             self,
-            validators: Validators,
+            validators: Union[Validators, List[CompiledValidator]],
             variables_mapping: VariablesMapping = None,
             functions_mapping: FunctionsMapping = None,
+            sampled: bool = True,
     ) -> NoReturn:
-
+        """ validate response, only status_code checks are run if response is not sampled,
+            number of skipped validators is saved in validation_results["sampled_out"].
+        """
         variables_mapping = variables_mapping or {}
         functions_mapping = functions_mapping or {}
 
@@ -253,82 +549,101 @@ class ResponseObject(object):
         validate_pass = True
         failures = []
 
-        for v in validators:
+        for validator in validators:
 
             if "validate_extractor" not in self.validation_results:
                 self.validation_results["validate_extractor"] = []
 
-            u_validator = uniform_validator(v, variables_mapping, functions_mapping)
+            if not isinstance(validator, CompiledValidator):
+                validator = compile_validator(validator, functions_mapping)
+
+            if not sampled and validator.check_path != STATUS_CODE_PATH:
+                self.validation_results["sampled_out"] = (
+                    self.validation_results.get("sampled_out", 0) + 1
+                )
+                continue
+
+            expect_item = validator.expect
+            expect_template = validator.expect_template
+            if validator.condition is not None:
+                condition = parse_data(validator.condition, variables_mapping, functions_mapping)
+                if isinstance(condition, str):
+                    condition = compile_condition(condition)
+                if eval(condition) is not True:
+                    if validator.else_expect is None:
+                        continue
+                    expect_item = validator.else_expect
+                    expect_template = validator.else_expect_template
 
             # check item
-            if u_validator is not None:
-                check_item = u_validator["check"]
-                if isinstance(check_item, str):
-                    if "$" in check_item:
-                        # check_item is variable or function
-                        check_item = parse_data(
-                            check_item, variables_mapping, functions_mapping
-                        )
-                        check_item = parse_string_value(check_item)
-
+            check_item = validator.check
+            if validator.check_templated:
+                # check_item is variable or function
+                check_item = parse_data(check_item, variables_mapping, functions_mapping)
+                check_item = parse_string_value(check_item)
                 if check_item and isinstance(check_item, Text):
                     check_value = self._search_jmespath(check_item)
                 else:
                     # variable or function evaluation result is "" or not text
                     check_value = check_item
+            elif check_item and isinstance(check_item, Text):
+                check_value = self._search_compiled_jmespath(check_item, validator.check_path)
+            else:
+                check_value = check_item
 
-                # comparator
-                assert_method = u_validator["assert"]
-                assert_func = get_mapping_function(assert_method, functions_mapping)
-
-                # expect item
-                expect_item = u_validator["expect"]
-                # parse expected value with config/teststep/extracted variables
-                expect_value = parse_data(expect_item, variables_mapping, functions_mapping)
-
-                # message
-                message = u_validator["message"]
-                # parse message with config/teststep/extracted variables
-                message = parse_data(message, variables_mapping, functions_mapping)
+            # comparator
+            assert_method = validator.comparator
 
-                validate_msg = f"assert {check_item} {assert_method} {expect_value}({type(expect_value).__name__})"
+            # parse expected value with config/teststep/extracted variables
+            expect_value = (
+                expect_item if expect_template is None
+                else parse_data(expect_template, variables_mapping, functions_mapping)
+            )
 
-                validator_dict = {
-                    "comparator": assert_method,
-                    "check": check_item,
-                    "check_value": check_value,
-                    "expect": expect_item,
-                    "expect_value": expect_value,
-                    "message": message,
-                }
+            # parse message with config/teststep/extracted variables
+            message = (
+                validator.message if validator.message_template is None
+                else parse_data(validator.message_template, variables_mapping, functions_mapping)
+            )
 
-                try:
-                    if assert_method == "diff":
-                        assert_func(check_value, expect_value, u_validator["kwargs"])
-                    else:
-                        assert_func(check_value, expect_value, )
-                    validate_msg += "\t==> pass"
-                    logger.info(validate_msg)
-                    validator_dict["check_result"] = "pass"
-                except AssertionError as ex:
-                    validate_pass = False
-                    validator_dict["check_result"] = "fail"
-                    validate_msg += "\t==> fail"
-                    validate_msg += (
-                        f"\n"
-                        f"check_item: {check_item}\n"
-                        f"check_value: {check_value}({type(check_value).__name__})\n"
-                        f"assert_method: {assert_method}\n"
-                        f"expect_value: {expect_value}({type(expect_value).__name__})"
-                    )
-                    message = str(ex)
-                    if message:
-                        validate_msg += f"\nmessage: {message}"
+            validate_msg = f"assert {check_item} {assert_method} {expect_value}({type(expect_value).__name__})"
 
-                    logger.error(validate_msg)
-                    failures.append(validate_msg)
+            validator_dict = {
+                "comparator": assert_method,
+                "check": check_item,
+                "check_value": check_value,
+                "expect": expect_item,
+                "expect_value": expect_value,
+                "message": message,
+            }
 
-                self.validation_results["validate_extractor"].append(validator_dict)
+            try:
+                if assert_method == "diff":
+                    validator.assert_func(check_value, expect_value, validator.kwargs)
+                else:
+                    validator.assert_func(check_value, expect_value)
+                validate_msg += "\t==> pass"
+                logger.info(validate_msg)
+                validator_dict["check_result"] = "pass"
+            except AssertionError as ex:
+                validate_pass = False
+                validator_dict["check_result"] = "fail"
+                validate_msg += "\t==> fail"
+                validate_msg += (
+                    f"\n"
+                    f"check_item: {check_item}\n"
+                    f"check_value: {check_value}({type(check_value).__name__})\n"
+                    f"assert_method: {assert_method}\n"
+                    f"expect_value: {expect_value}({type(expect_value).__name__})"
+                )
+                message = str(ex)
+                if message:
+                    validate_msg += f"\nmessage: {message}"
+
+                logger.error(validate_msg)
+                failures.append(validate_msg)
+
+            self.validation_results["validate_extractor"].append(validator_dict)
 
             if not validate_pass:
                 failures_string = "\n".join([failure for failure in failures])
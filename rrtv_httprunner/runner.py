@@ -1,11 +1,15 @@
+import contextvars
 import datetime
+import functools
 import os
+import threading
 import time
 import uuid
-from typing import List, Dict, Text, NoReturn
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Generator, IO, Iterable, List, Dict, Text, NoReturn, Tuple
 from urllib.parse import unquote
 
-import demjson
+from requests import Response
 
 try:
     import allure
@@ -16,8 +20,16 @@ except ModuleNotFoundError:
 # import allure
 from loguru import logger
 
-from rrtv_httprunner import utils, exceptions
-from rrtv_httprunner.client import HttpSession
+from rrtv_httprunner import utils, exceptions, globalvar
+from rrtv_httprunner.cache import FunctionCacheScope, current_scope
+from rrtv_httprunner.client import (
+    STREAMED_BODY,
+    HttpSession,
+    get_curl,
+    get_req_resp_records,
+    get_shared_adapter,
+    load_response_json,
+)
 from rrtv_httprunner.exceptions import ValidationFailure, ParamsError
 from rrtv_httprunner.ext.uploader import prepare_upload_step
 from rrtv_httprunner.loader import load_project_meta, load_testcase_file
@@ -26,18 +38,208 @@ from rrtv_httprunner.models import (
     TStep,
     VariablesMapping,
     StepData,
+    StepTime,
     TestCaseSummary,
     TestCaseTime,
     TestCaseInOut,
+    FunctionCacheStat,
     ProjectMeta,
     TestCase,
-    Hooks, data_enum, AllureParameter,
+    Hooks, data_enum,
+    RecordPolicy,
+    ConnectionStat,
+    SessionData,
+    ValidationStat,
+)
+from rrtv_httprunner.parser import (
+    build_url,
+    compile_data,
+    DataTemplate,
+    parse_data,
+    parse_variables_mapping,
+    resolve_steps_levels,
+    LazyVariablesMapping,
+)
+from rrtv_httprunner.response import (
+    CompiledValidator,
+    ResponseObject,
+    compile_validator,
+    get_check_items,
+    get_validation_sampler,
 )
-from rrtv_httprunner.parser import build_url, parse_data, parse_variables_mapping
-from rrtv_httprunner.response import ResponseObject
+from rrtv_httprunner.spool import StepSpool
 from rrtv_httprunner.testcase import Config, Step
 from rrtv_httprunner.utils import merge_variables
 
+# runner iterator yields (method, url, request kwargs) of each request to be sent, and receives
+# its response, thus the same testcase run can be driven by blocking or asyncio session.
+# it yields list of step runners for independent teststeps, each step runner is called with
+# forked session and returns runner iterator, it receives step data or exception of each teststep
+RunnerIterator = Generator[Tuple[Text, Text, Dict], Response, Any]
+
+
+def get_phase_time(phase_start_at: float) -> Tuple[float, float]:
+    """ get elapsed milliseconds of phase started at phase_start_at, and start time of next phase
+    """
+    now = time.perf_counter()
+    return (now - phase_start_at) * 1000, now
+
+
+def sum_steps_time(step_datas: List[StepData]) -> StepTime:
+    """ sum time spent in each phase of teststeps
+    """
+    steps_time = StepTime()
+    for step_data in step_datas or []:
+        for field, value in step_data.time:
+            setattr(steps_time, field, getattr(steps_time, field) + value)
+
+    return steps_time
+
+
+def count_connections(step_data: StepData, connection_stat: ConnectionStat) -> NoReturn:
+    """ count connections created and reused by requests of teststep, and sum network timing
+    """
+    if isinstance(step_data.data, List):
+        # referenced testcase
+        for sub_step_data in step_data.data:
+            count_connections(sub_step_data, connection_stat)
+    elif isinstance(step_data.data, SessionData) and step_data.data.address.client_port:
+        stat = step_data.data.stat
+        if stat.connection_reused:
+            connection_stat.reused += 1
+        else:
+            connection_stat.created += 1
+
+        connection_stat.dns_ms += stat.dns_ms
+        connection_stat.connect_ms += stat.connect_ms
+        connection_stat.tls_ms += stat.tls_ms
+        connection_stat.ttfb_ms += stat.ttfb_ms
+        connection_stat.download_ms += stat.download_ms
+        connection_stat.body_bytes += stat.body_bytes
+
+
+def count_validations(step_data: StepData, validation_stat: ValidationStat) -> NoReturn:
+    """ count validators run and sampled out by validation sampling of teststep
+    """
+    if isinstance(step_data.data, List):
+        # referenced testcase
+        for sub_step_data in step_data.data:
+            count_validations(sub_step_data, validation_stat)
+    elif isinstance(step_data.data, SessionData):
+        validators = step_data.data.validators
+        validation_stat.validated += len(validators.get("validate_extractor", []))
+        validation_stat.sampled_out += validators.get("sampled_out", 0)
+
+
+class ExecutionPlan(object):
+    """ testcase compiled once for each HttpRunner class and shared by all its runs, e.g. rows of
+        parametrized testcase, each run only copies the fields it modifies.
+
+        requests of teststeps are precompiled, template-free parts of request are shared between
+        runs, thus they should not be modified in place, e.g. in hook functions.
+    """
+
+    __slots__ = (
+        "config_builder",
+        "steps_builders",
+        "config",
+        "teststeps",
+        "request_templates",
+        "compiled_validators",
+    )
+
+    def __init__(self, config: Config, teststeps: List[Step]):
+        self.config_builder = config
+        self.steps_builders = teststeps
+        self.config = config.perform()
+        # copy teststeps, thus they are not affected by step builders modified later
+        self.teststeps = [step.perform().copy(deep=True) for step in teststeps]
+        # precompiled request of teststeps, keyed by id of TRequest,
+        # upload request is excluded because it is modified before each run
+        self.request_templates: Dict[int, DataTemplate] = {}
+        for step in self.teststeps:
+            if step.request is None or step.request.upload:
+                continue
+
+            request_dict = step.request.dict()
+            request_dict.pop("upload", None)
+            self.request_templates[id(step.request)] = (
+                compile_data(request_dict) or DataTemplate(request_dict, {})
+            )
+
+        # validators of teststeps compiled with project functions, keyed by id of validators list,
+        # they are compiled by the first run which validates the teststep
+        self.compiled_validators: Dict[int, Tuple] = {}
+
+    def is_compiled_from(self, config: Config, teststeps: List[Step]) -> bool:
+        return self.config_builder is config and self.steps_builders is teststeps
+
+    def new_config(self) -> TConfig:
+        config = self.config.copy()
+        if isinstance(config.variables, Dict):
+            config.variables = dict(config.variables)
+        return config
+
+    def new_teststeps(self) -> List[TStep]:
+        # variables of teststeps are replaced before running, upload step modifies its request
+        return [
+            step.copy(deep=bool(step.request and step.request.upload))
+            for step in self.teststeps
+        ]
+
+
+class CaseLogSink(object):
+    """ dispatch log records to log file of each running testcase by case_id bound with
+        logger.contextualize, adding a loguru handler for each testcase run is expensive.
+    """
+
+    def __init__(self):
+        self.__log_files: Dict[Text, Tuple[IO, int]] = {}
+        self.__lock = threading.Lock()
+        self.__handler_id = None
+
+    def add(self, case_id: Text, log_path: Text) -> NoReturn:
+        with self.__lock:
+            if self.__handler_id is None:
+                self.__handler_id = logger.add(
+                    self.write,
+                    level="DEBUG",
+                    filter=self.__filter,
+                )
+
+            if case_id in self.__log_files:
+                # e.g. testcase run with the same case_id
+                log_file, ref_count = self.__log_files[case_id]
+                self.__log_files[case_id] = (log_file, ref_count + 1)
+                return
+
+            os.makedirs(os.path.dirname(log_path) or ".", exist_ok=True)
+            self.__log_files[case_id] = (open(log_path, "a", encoding="utf-8"), 1)
+
+    def remove(self, case_id: Text) -> NoReturn:
+        with self.__lock:
+            log_file, ref_count = self.__log_files.pop(case_id)
+            if ref_count > 1:
+                self.__log_files[case_id] = (log_file, ref_count - 1)
+            else:
+                log_file.close()
+
+    def __filter(self, record: Dict) -> bool:
+        with self.__lock:
+            return record["extra"].get("case_id") in self.__log_files
+
+    def write(self, message) -> NoReturn:
+        # log file is looked up and written with lock held, thus it is never closed by remove
+        # while being written, e.g. a thread logs as its testcase ends
+        with self.__lock:
+            log_file, _ = self.__log_files.get(message.record["extra"].get("case_id"), (None, 0))
+            if log_file is not None:
+                log_file.write(message)
+                log_file.flush()
+
+
+case_log_sink = CaseLogSink()
+
 
 class HttpRunner(object):
     config: Config
@@ -48,21 +250,41 @@ class HttpRunner(object):
     __teststeps: List[TStep]
     __project_meta: ProjectMeta = None
     __case_id: Text = ""
-    __export: List[Text] = []
-    __step_datas: List[StepData] = []
+    # mutable state is initialized per instance, class attributes are shared between instances
+    __export: List[Text] = None
+    __step_datas: List[StepData] = None
     __session: HttpSession = None
-    __session_variables: VariablesMapping = {}
+    __session_variables: VariablesMapping = None
+    # step datas are appended to spool instead of staying in memory if specified
+    __spool: StepSpool = None
+    # results and hits/misses of memoized functions in current testcase run
+    __function_cache_scope: FunctionCacheScope = None
+    __connection_stat: ConnectionStat = None
+    __validation_stat: ValidationStat = None
     # time
     __start_at: float = 0
     __duration: float = 0
     # log
     __log_path: Text = ""
+    # compiled testcase of HttpRunner class, and precompiled requests of current run
+    __execution_plan: ExecutionPlan = None
+    __request_templates: Dict[int, DataTemplate] = {}
+    __compiled_validators: Dict[int, Tuple] = None
 
     def __init_tests__(self) -> NoReturn:
-        self.__config = self.config.perform()
-        self.__teststeps = []
-        for step in self.teststeps:
-            self.__teststeps.append(step.perform())
+        cls = type(self)
+        # get plan from class __dict__, plan of parent class is compiled from other teststeps
+        plan = cls.__dict__.get("_HttpRunner__execution_plan")
+        if plan is None or not plan.is_compiled_from(self.config, self.teststeps):
+            plan = ExecutionPlan(self.config, self.teststeps)
+            cls.__execution_plan = plan
+
+        # teststeps are modified while running, copy them thus testcases of the same class
+        # can run concurrently
+        self.__config = plan.new_config()
+        self.__teststeps = plan.new_teststeps()
+        self.__request_templates = plan.request_templates
+        self.__compiled_validators = plan.compiled_validators
 
     @property
     def raw_testcase(self) -> TestCase:
@@ -91,6 +313,10 @@ class HttpRunner(object):
         self.__export = export
         return self
 
+    def with_spool(self, spool: StepSpool) -> "HttpRunner":
+        self.__spool = spool
+        return self
+
     def __call_hooks(
             self, hooks: Hooks, step_variables: VariablesMapping, hook_msg: Text,
     ) -> NoReturn:
@@ -185,26 +411,54 @@ class HttpRunner(object):
                 logger.info("teardown begin execute >>>>>>")
                 execute(step.teardown)
 
-    def __run_step_request(self, step: TStep) -> StepData:
+    def __compile_validators(self, step: TStep) -> List[CompiledValidator]:
+        """ get validators of teststep compiled with project functions, validators of teststep
+            in execution plan are compiled once and shared by all runs.
+        """
+        functions = self.__project_meta.functions
+        if self.__compiled_validators is None:
+            # testcase is not compiled to execution plan, e.g. run with run_testcase
+            self.__compiled_validators = {}
+
+        compiled = self.__compiled_validators.get(id(step.validators))
+        if compiled is not None and compiled[0] is step.validators and compiled[1] is functions:
+            return compiled[2]
+
+        validators = [compile_validator(validator, functions) for validator in step.validators]
+        self.__compiled_validators[id(step.validators)] = (step.validators, functions, validators)
+        return validators
+
+    def __run_step_request(
+            self, step: TStep, session: HttpSession
+    ) -> Generator[Tuple, Response, StepData]:
         """run teststep: request"""
         step_data = StepData(name=step.name)
+        step_time = step_data.time
+        phase_start_at = time.perf_counter()
 
         # parse
         prepare_upload_step(step, self.__project_meta.functions)
-        request_dict = step.request.dict()
-        request_dict.pop("upload", None)
+        request_dict = self.__request_templates.get(id(step.request))
+        if request_dict is None:
+            request_dict = step.request.dict()
+            request_dict.pop("upload", None)
+        step_time.parse_ms, phase_start_at = get_phase_time(phase_start_at)
 
         # setup hooks
         if step.setup_hooks:
             self.__call_hooks(step.setup_hooks, step.variables, "setup request")
+            step_time.setup_hooks_ms, phase_start_at = get_phase_time(phase_start_at)
 
         # execute setup
         if step.setup:
             self.__execute("setup", step, step.variables, self.__project_meta.functions)
+            step_time.setup_ms, phase_start_at = get_phase_time(phase_start_at)
 
         parsed_request_dict = parse_data(
             request_dict, step.variables, self.__project_meta.functions
         )
+        # headers are modified while sending request, they maybe shared with precompiled request
+        parsed_request_dict["headers"] = dict(parsed_request_dict["headers"])
         parsed_request_dict["headers"].setdefault(
             "HRUN-Request-ID",
             f"HRUN-{self.__case_id}-{str(int(time.time() * 1000))[-6:]}",
@@ -218,25 +472,33 @@ class HttpRunner(object):
         parsed_request_dict["verify"] = self.__config.verify
         parsed_request_dict["json"] = parsed_request_dict.pop("req_json", {})
 
-        a = AllureParameter()
-        parsed_request_dict["allure"] = a
+        # building request & response records for each request is expensive, they are built on
+        # validation failure with on_failure record policy
+        record_policy = self.__config.record
+        session.record_req_resps = record_policy == RecordPolicy.ALWAYS
+        parse_ms, phase_start_at = get_phase_time(phase_start_at)
+        step_time.parse_ms += parse_ms
+
         # request
-        resp = self.__session.request(method, url, **parsed_request_dict)
+        resp = yield method, url, parsed_request_dict
+        step_time.request_ms, phase_start_at = get_phase_time(phase_start_at)
         resp_obj = ResponseObject(resp)
         step.variables["response"] = resp_obj
+        if record_policy == RecordPolicy.ALWAYS:
+            logger.debug(f"curl: {get_curl(resp)}")
         if USE_ALLURE:
             # update allure report meta
             allure.attach(str(resp_obj.resp_obj.status_code), "状态码:", allure.attachment_type.TEXT)
             try:
-                if resp_obj.resp_obj.text is not None and resp_obj.resp_obj.text != "":
-                    value = demjson.decode(resp_obj.resp_obj.text)
-                    if "code" in value:
-                        allure.attach(str(value["code"]), "code:", allure.attachment_type.TEXT)
-                    if "msg" in value:
-                        allure.attach(str(value["msg"]), "msg:", allure.attachment_type.TEXT)
-            except:
+                # streamed response body is not loaded
+                value = load_response_json(resp) if resp._content is not False else {}
+                if "code" in value:
+                    allure.attach(str(value["code"]), "code:", allure.attachment_type.TEXT)
+                if "msg" in value:
+                    allure.attach(str(value["msg"]), "msg:", allure.attachment_type.TEXT)
+            except (ValueError, TypeError):
                 pass
-            allure.attach(a.curl, "curl:", allure.attachment_type.TEXT)
+            allure.attach(get_curl(resp), "curl:", allure.attachment_type.TEXT)
 
         def log_req_resp_details():
             err_msg = "\n{} DETAILED REQUEST & RESPONSE {}\n".format("*" * 32, "*" * 32)
@@ -261,73 +523,109 @@ class HttpRunner(object):
             err_msg += "====== response details ======\n"
             err_msg += f"status_code: {resp.status_code}\n"
             err_msg += f"headers: {resp.headers}\n"
-            err_msg += f"body: {repr(resp.text)}\n"
+            body = STREAMED_BODY if resp._content is False else resp.text
+            err_msg += f"body: {repr(body)}\n"
             logger.error(err_msg)
 
         # extract
+        phase_start_at = time.perf_counter()
         extractors = step.extract
+        if step.request.stream:
+            # search body paths of extractors and validators in one pass over response stream
+            check_items = get_check_items(
+                extractors,
+                self.__compile_validators(step),
+                step.variables,
+                self.__project_meta.functions,
+            )
+            try:
+                resp_obj.search_streamed_body(check_items)
+            except ValidationFailure:
+                # response body is not valid JSON
+                log_req_resp_details()
+                raise
         extract_mapping = resp_obj.extract(extractors, step.variables, self.__project_meta.functions)
         step_data.export_vars = extract_mapping
+        # response body is decoded the first time it is referenced, by extractors or validators
+        step_time.extract_ms, phase_start_at = get_phase_time(phase_start_at)
+        step_time.extract_ms -= resp_obj.decode_time_ms
+        extract_decode_ms = resp_obj.decode_time_ms
 
         variables_mapping = step.variables
         variables_mapping.update(extract_mapping)
 
         # validate
-        validators = step.validators
+        # only status_code checks are run for responses not sampled
+        sampling = self.__config.validation_sampling or globalvar.get_value("validation_sampling")
+        sampled = sampling is None or get_validation_sampler(sampling).sample()
         session_success = False
         try:
             resp_obj.validate(
-                validators, variables_mapping, self.__project_meta.functions
+                self.__compile_validators(step),
+                variables_mapping,
+                self.__project_meta.functions,
+                sampled,
             )
             session_success = True
         except ValidationFailure:
             session_success = False
+            if record_policy == RecordPolicy.ON_FAILURE and hasattr(session, "data"):
+                session.data.req_resps = get_req_resp_records(resp)
+                logger.debug(f"curl: {get_curl(resp)}")
             log_req_resp_details()
             # log testcase duration before raise ValidationFailure
             self.__duration = time.time() - self.__start_at
             raise
         finally:
-            self.success = session_success
+            step_time.validate_ms, phase_start_at = get_phase_time(phase_start_at)
+            step_time.validate_ms -= resp_obj.decode_time_ms - extract_decode_ms
+            step_time.decode_ms = resp_obj.decode_time_ms
             step_data.success = session_success
 
-            if hasattr(self.__session, "data"):
+            if hasattr(session, "data"):
                 # rrtv_httprunner.client.HttpSession, not locust.clients.HttpSession
                 # save request & response meta data
-                self.__session.data.success = session_success
-                self.__session.data.validators = resp_obj.validation_results
+                session.data.success = session_success
+                session.data.validators = resp_obj.validation_results
 
                 # save step data
-                step_data.data = self.__session.data
+                step_data.data = session.data
 
                 # teardown hooks
                 if step.teardown_hooks:
                     self.__call_hooks(step.teardown_hooks, step.variables, "teardown request")
+                    step_time.teardown_hooks_ms, phase_start_at = get_phase_time(phase_start_at)
 
                 # 执行teardown
                 if step.teardown:
                     self.__execute("teardown", step, variables_mapping, self.__project_meta.functions)
+                    step_time.teardown_ms, phase_start_at = get_phase_time(phase_start_at)
 
         return step_data
 
-    def __run_step_testcase(self, step: TStep) -> StepData:
+    def __run_step_testcase(
+            self, step: TStep, session: HttpSession
+    ) -> Generator[Tuple, Response, StepData]:
         """run teststep: referenced testcase"""
         step_data = StepData(name=step.name)
         step_variables = step.variables
         step_export = step.export
+        phase_start_at = time.perf_counter()
 
         # setup hooks
         if step.setup_hooks:
             self.__call_hooks(step.setup_hooks, step_variables, "setup testcase")
+            setup_hooks_ms, _ = get_phase_time(phase_start_at)
 
         if hasattr(step.testcase, "config") and hasattr(step.testcase, "teststeps"):
             testcase_cls = step.testcase
-            case_result = (
+            case_result = yield from (
                 testcase_cls()
-                    .with_session(self.__session)
+                    .with_session(session)
                     .with_case_id(self.__case_id)
                     .with_variables(step_variables)
                     .with_export(step_export)
-                    .run()
+                    .__iter_run()
             )
 
         elif isinstance(step.testcase, Text):
@@ -338,13 +636,13 @@ class HttpRunner(object):
                     self.__project_meta.RootDir, step.testcase
                 )
 
-            case_result = (
+            case_result = yield from (
                 HttpRunner()
-                    .with_session(self.__session)
+                    .with_session(session)
                     .with_case_id(self.__case_id)
                     .with_variables(step_variables)
                     .with_export(step_export)
-                    .run_path(ref_testcase_path)
+                    .__iter_path(ref_testcase_path)
             )
 
         else:
@@ -353,42 +651,65 @@ class HttpRunner(object):
             )
 
         # teardown hooks
+        phase_start_at = time.perf_counter()
         if step.teardown_hooks:
             self.__call_hooks(step.teardown_hooks, step.variables, "teardown testcase")
 
         step_data.data = case_result.get_step_datas()  # list of step data
+        # time of referenced testcase is sum of its teststeps
+        step_data.time = sum_steps_time(step_data.data)
+        if step.setup_hooks:
+            step_data.time.setup_hooks_ms += setup_hooks_ms
+        if step.teardown_hooks:
+            step_data.time.teardown_hooks_ms += get_phase_time(phase_start_at)[0]
         step_data.export_vars = case_result.get_export_variables()
         step_data.success = case_result.success
-        self.success = case_result.success
 
         if step_data.export_vars:
             logger.info(f"export variables: {step_data.export_vars}")
 
         return step_data
 
-    def __run_step(self, step: TStep) -> Dict:
+    def __run_step(
+            self, step: TStep, session: HttpSession = None
+    ) -> Generator[Tuple, Response, StepData]:
         """run teststep, teststep maybe a request or referenced testcase"""
         logger.info(f"run step begin: {step.name} >>>>>>")
+        session = session or self.__session
+        start_at = time.perf_counter()
 
         if step.request:
-            step_data = self.__run_step_request(step)
+            step_data = yield from self.__run_step_request(step, session)
         elif step.testcase:
-            step_data = self.__run_step_testcase(step)
+            step_data = yield from self.__run_step_testcase(step, session)
         else:
             raise ParamsError(
                 f"teststep is neither a request nor a referenced testcase: {step.dict()}"
             )
 
-        self.__step_datas.append(step_data)
+        step_data.time.total_ms = get_phase_time(start_at)[0]
         logger.info(f"run step end: {step.name} <<<<<<\n")
-        return step_data.export_vars
+        return step_data
+
+    def __parse_variables(self, variables_mapping: VariablesMapping) -> VariablesMapping:
+        if self.__config.lazy_variables:
+            # variables will be evaluated the first time they are referenced
+            return LazyVariablesMapping(variables_mapping, self.__project_meta.functions)
+
+        return parse_variables_mapping(variables_mapping, self.__project_meta.functions)
+
+    def __get_session_variables_items(self) -> Iterable[Tuple[Text, Any]]:
+        session_variables = self.__session_variables or {}
+        if isinstance(session_variables, LazyVariablesMapping):
+            # lazy variables of referenced testcase step are passed without evaluation
+            return session_variables.lazy_items()
+
+        return session_variables.items()
 
     def __parse_config(self, config: TConfig) -> NoReturn:
-        config.variables.update(self.__session_variables)
+        config.variables.update(self.__get_session_variables_items())
         config.variables.update(config.datasource)
-        config.variables = parse_variables_mapping(
-            config.variables, self.__project_meta.functions
-        )
+        config.variables = self.__parse_variables(config.variables)
         config.name = parse_data(
             config.name, config.variables, self.__project_meta.functions
         )
@@ -396,6 +717,77 @@ class HttpRunner(object):
             config.base_url, config.variables, self.__project_meta.functions
         )
 
+    def __run_requests(
+            self, runner_iterator: RunnerIterator, session: HttpSession = None
+    ) -> Any:
+        """ send requests yielded by runner iterator with blocking session, until it is exhausted,
+            exception raised while sending request is thrown into the iterator.
+        """
+        try:
+            item = next(runner_iterator)
+            # session is initialized when testcase starts
+            session = session or self.__session
+            while True:
+                if isinstance(item, list):
+                    # teststeps run concurrently
+                    item = runner_iterator.send(self.__run_parallel_steps(item, session))
+                    continue
+
+                method, url, kwargs = item
+                resp, error = None, None
+                try:
+                    resp = session.request(method, url, **kwargs)
+                except Exception as ex:
+                    error = ex
+
+                if error is not None:
+                    item = runner_iterator.throw(error)
+                else:
+                    item = runner_iterator.send(resp)
+        except StopIteration as ex:
+            return ex.value
+
+    def __run_parallel_steps(
+            self, step_runners: List[Callable], session: HttpSession
+    ) -> List[Any]:
+        """ run teststeps concurrently in thread pool, each with forked session which shares
+            cookies and connection pool, return step data or exception of each teststep.
+        """
+
+        can_fork = hasattr(session, "fork")
+
+        def run_step(step_runner: Callable) -> Any:
+            step_session = session.fork() if can_fork else session
+            try:
+                return self.__run_requests(step_runner(step_session), step_session)
+            except Exception as ex:
+                return ex
+
+        if not can_fork:
+            # e.g. locust.clients.HttpSession, teststeps run one by one with the same session
+            return [run_step(step_runner) for step_runner in step_runners]
+
+        with ThreadPoolExecutor(max_workers=len(step_runners)) as executor:
+            futures = [
+                # run in copied context, thus logs of teststeps are bound to current testcase
+                executor.submit(contextvars.copy_context().run, run_step, step_runner)
+                for step_runner in step_runners
+            ]
+            return [future.result() for future in futures]
+
+    def __prepare_step_variables(
+            self, step: TStep, extracted_variables: VariablesMapping
+    ) -> NoReturn:
+        # override variables
+        # step variables > extracted variables from previous steps
+        step.variables = merge_variables(step.variables, extracted_variables)
+        # step variables > testcase config variables
+        step.variables = merge_variables(step.variables, self.__config.variables)
+        step.variables = merge_variables(step.variables, self.__config.datasource)
+
+        # parse variables
+        step.variables = self.__parse_variables(step.variables)
+
     def run_testcase(self, testcase: TestCase) -> "HttpRunner":
         """run specified testcase
 
@@ -403,6 +795,18 @@ class HttpRunner(object):
             >>> testcase_obj = TestCase(config=TConfig(...), teststeps=[TStep(...)])
             >>> HttpRunner().with_project_meta(project_meta).run_testcase(testcase_obj)
 
+        """
+        return self.__run_requests(self.iter_testcase(testcase))
+
+    def iter_testcase(self, testcase: TestCase) -> RunnerIterator:
+        """ run specified testcase step by step, yield each request to be sent and receive its
+            response, return runner itself when all teststeps finished.
+
+        Examples:
+            >>> runner_iterator = HttpRunner().iter_testcase(testcase_obj)
+            >>> method, url, kwargs = next(runner_iterator)
+            >>> method, url, kwargs = runner_iterator.send(session.request(method, url, **kwargs))
+
         """
         self.__config = testcase.config
         self.__teststeps = testcase.teststeps
@@ -411,47 +815,102 @@ class HttpRunner(object):
         self.__project_meta = self.__project_meta or load_project_meta(
             self.__config.path
         )
+        self.__session_variables = self.__session_variables or {}
+        # memoized functions without ttl are cached per testcase run,
+        # referenced testcase shares results and hits/misses with its parent testcase
+        self.__function_cache_scope = current_scope.get() or FunctionCacheScope()
+        with self.__function_cache_scope:
+            return (yield from self.__iter_teststeps())
+
+    def __iter_teststeps(self) -> RunnerIterator:
         self.__parse_config(self.__config)
         self.__start_at = time.time()
         self.__step_datas: List[StepData] = []
-        self.__session = self.__session or HttpSession()
+        self.__connection_stat = ConnectionStat()
+        self.__validation_stat = ValidationStat()
+        if self.__session is None:
+            # connections are shared with other testcases if connection pool is specified
+            connection_pool = (
+                self.__config.connection_pool or globalvar.get_value("connection_pool")
+            )
+            adapter = get_shared_adapter(connection_pool) if connection_pool else None
+            # requests are recorded to or replayed from cassette if specified
+            cassette_adapter = globalvar.get_value("cassette_adapter")
+            if cassette_adapter is not None:
+                adapter = (
+                    cassette_adapter.with_adapter(adapter) if adapter else cassette_adapter
+                )
+            self.__session = HttpSession(adapter)
         # save extracted variables of teststeps
         extracted_variables: VariablesMapping = {}
 
         # run teststeps
-        for step in self.__teststeps:
-            # override variables
-            # step variables > extracted variables from previous steps
-            step.variables = merge_variables(step.variables, extracted_variables)
-            # step variables > testcase config variables
-            step.variables = merge_variables(step.variables, self.__config.variables)
-            step.variables = merge_variables(step.variables, self.__config.datasource)
-
-            # parse variables
-            step.variables = parse_variables_mapping(
-                step.variables, self.__project_meta.functions
-            )
-
-            # run step
-            if USE_ALLURE:
-                with allure.step(f"step: {step.name}"):
-                    extract_mapping = self.__run_step(step)
+        if self.__config.parallel_steps:
+            steps_levels = resolve_steps_levels(self.__teststeps)
+        else:
+            steps_levels = [[index] for index in range(len(self.__teststeps))]
+
+        for level in steps_levels:
+            steps = [self.__teststeps[index] for index in level]
+            for step in steps:
+                self.__prepare_step_variables(step, extracted_variables)
+
+            if len(steps) == 1:
+                # run step
+                step = steps[0]
+                try:
+                    if USE_ALLURE:
+                        with allure.step(f"step: {step.name}"):
+                            step_data = yield from self.__run_step(step)
+                    else:
+                        step_data = yield from self.__run_step(step)
+                except Exception:
+                    self.success = False
+                    raise
+                steps_data = [step_data]
             else:
-                extract_mapping = self.__run_step(step)
-
-            # save extracted variables to session variables
-            extracted_variables.update(extract_mapping)
+                # independent steps run concurrently, yield step runners to be run with forked
+                # sessions, and receive step data or exception of each step
+                steps_data = yield [
+                    functools.partial(self.__run_step, step) for step in steps
+                ]
+
+            # save step data and extracted variables in steps order,
+            # result of testcase is set here as teststeps of a level may run in threads
+            for step, step_data in zip(steps, steps_data):
+                if isinstance(step_data, Exception):
+                    self.success = False
+                    self.__duration = time.time() - self.__start_at
+                    raise step_data
+
+                self.success = step_data.success
+                count_connections(step_data, self.__connection_stat)
+                count_validations(step_data, self.__validation_stat)
+                if self.__spool is not None:
+                    # only keep step data without request & response data in memory
+                    self.__spool.append(self.__case_id, step_data)
+                    step_data = step_data.copy(update={"data": None})
+                    step.variables.pop("request", None)
+                    step.variables.pop("response", None)
+                    self.__session.data = SessionData()
+
+                self.__step_datas.append(step_data)
+                # save extracted variables to session variables
+                extracted_variables.update(step_data.export_vars)
 
         self.__session_variables.update(extracted_variables)
         self.__duration = time.time() - self.__start_at
         return self
 
     def run_path(self, path: Text) -> "HttpRunner":
+        return self.__run_requests(self.__iter_path(path))
+
+    def __iter_path(self, path: Text) -> RunnerIterator:
         if not os.path.isfile(path):
             raise exceptions.ParamsError(f"Invalid testcase path: {path}")
 
         testcase_obj = load_testcase_file(path)
-        return self.run_testcase(testcase_obj)
+        return (yield from self.iter_testcase(testcase_obj))
 
     def run(self) -> "HttpRunner":
         """ run current testcase
@@ -460,31 +919,40 @@ class HttpRunner(object):
             >>> TestCaseRequestWithFunctions().run()
 
         """
+        return self.__run_requests(self.__iter_run())
+
+    def __iter_run(self) -> RunnerIterator:
         self.__init_tests__()
         testcase_obj = TestCase(config=self.__config, teststeps=self.__teststeps)
-        return self.run_testcase(testcase_obj)
+        return (yield from self.iter_testcase(testcase_obj))
 
     def get_step_datas(self) -> List[StepData]:
-        return self.__step_datas
+        return self.__step_datas or []
 
     def get_export_variables(self) -> Dict:
         # override testcase export vars with step export
         export_var_names = self.__export or self.__config.export
+        session_variables = self.__session_variables or {}
         export_vars_mapping = {}
         for var_name in export_var_names:
-            if var_name not in self.__session_variables:
+            if var_name not in session_variables:
                 raise ParamsError(
-                    f"failed to export variable {var_name} from session variables {self.__session_variables}"
+                    f"failed to export variable {var_name} from session variables {session_variables}"
                 )
 
-            export_vars_mapping[var_name] = self.__session_variables[var_name]
+            export_vars_mapping[var_name] = session_variables[var_name]
 
         return export_vars_mapping
 
     def get_summary(self) -> TestCaseSummary:
         """get testcase result summary"""
         start_at_timestamp = self.__start_at
-        start_at_iso_format = datetime.utcfromtimestamp(start_at_timestamp).isoformat()
+        start_at_iso_format = datetime.datetime.utcfromtimestamp(start_at_timestamp).isoformat()
+        config_vars = self.__config.variables
+        if isinstance(config_vars, LazyVariablesMapping):
+            # unreferenced variables have never been evaluated
+            config_vars = config_vars.get_evaluated_variables()
+
         return TestCaseSummary(
             name=self.__config.name,
             success=self.success,
@@ -495,30 +963,56 @@ class HttpRunner(object):
                 duration=self.__duration,
             ),
             in_out=TestCaseInOut(
-                config_vars=self.__config.variables,
+                config_vars=config_vars,
                 export_vars=self.get_export_variables(),
             ),
             log=self.__log_path,
             step_datas=self.__step_datas,
+            step_time=sum_steps_time(self.__step_datas),
+            connection_stat=self.__connection_stat or ConnectionStat(),
+            validation_stat=self.__validation_stat or ValidationStat(),
+            function_cache_stats=self.__get_function_cache_stats(),
         )
 
+    def __get_function_cache_stats(self) -> Dict[Text, FunctionCacheStat]:
+        function_cache_stats = {}
+        if self.__function_cache_scope is None:
+            # testcase has not been run
+            return function_cache_stats
+
+        for name, cache in self.__project_meta.function_caches.items():
+            hits, misses = self.__function_cache_scope.get_stat(cache)
+            function_cache_stats[name] = FunctionCacheStat(hits=hits, misses=misses)
+
+        return function_cache_stats
+
     def test_start(self, param: Dict = None) -> "HttpRunner":
         """main entrance, discovered by pytest"""
+        return self.__run_requests(self.iter_start(param))
+
+    def iter_start(self, param: Dict = None) -> RunnerIterator:
+        """ iterator version of test_start, yield each request to be sent and receive its response
+        """
         self.__init_tests__()
         self.__project_meta = self.__project_meta or load_project_meta(
             self.__config.path
         )
         self.__case_id = self.__case_id or str(uuid.uuid4())
+        # spool specified with hrun --spool-results
+        self.__spool = self.__spool or globalvar.get_value("step_spool")
         self.__log_path = self.__log_path or os.path.join(
             self.__project_meta.RootDir, "logs", f"{self.__case_id}.run.log"
         )
-        log_handler = logger.add(self.__log_path, level="DEBUG")
+        # only log current testcase, testcases may run concurrently in thread pool or event loop
+        case_id = self.__case_id
+        case_log_sink.add(case_id, self.__log_path)
 
         # parse config name
         config_variables = self.__config.variables
         if param:
             config_variables.update(param)
-        config_variables.update(self.__session_variables)
+        self.__session_variables = self.__session_variables or {}
+        config_variables.update(self.__get_session_variables_items())
         self.__config.name = parse_data(
             self.__config.name, config_variables, self.__project_meta.functions
         )
@@ -532,14 +1026,16 @@ class HttpRunner(object):
                     requestUrl)
                 allure.dynamic.description(f"URL:{url}")
 
-        logger.info(
-            f"Start to run testcase: {self.__config.name}, TestCase ID: {self.__case_id}"
-        )
-
         try:
-            return self.run_testcase(
-                TestCase(config=self.__config, teststeps=self.__teststeps)
-            )
+            with logger.contextualize(case_id=case_id):
+                logger.info(
+                    f"Start to run testcase: {self.__config.name}, TestCase ID: {case_id}"
+                )
+                return (
+                    yield from self.iter_testcase(
+                        TestCase(config=self.__config, teststeps=self.__teststeps)
+                    )
+                )
         finally:
-            logger.remove(log_handler)
+            case_log_sink.remove(case_id)
             logger.info(f"generate testcase log: {self.__log_path}")
@@ -0,0 +1,159 @@
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterator, List, NoReturn, Text
+
+from rrtv_httprunner.models import StepData
+from rrtv_httprunner.utils import ExtendJSONEncoder
+
+
+class StepSpool(object):
+    """ spool of step records, each step data is appended once the teststep is finished,
+        thus request & response data do not stay in memory while running long testsuites.
+    """
+
+    def __init__(self, path: Text):
+        self.path = path
+        self._lock = threading.Lock()
+        spool_dir = os.path.dirname(path)
+        if spool_dir:
+            os.makedirs(spool_dir, exist_ok=True)
+
+    def append(self, case_id: Text, step_data: StepData) -> NoReturn:
+        record = json.dumps(step_data.dict(), ensure_ascii=False, cls=ExtendJSONEncoder)
+        with self._lock:
+            self._append(case_id, record)
+
+    def _append(self, case_id: Text, record: Text) -> NoReturn:
+        raise NotImplementedError
+
+    def iter_step_datas(self, case_id: Text) -> Iterator[Dict]:
+        """ iterate step data dicts of testcase, in the order they are appended
+        """
+        raise NotImplementedError
+
+    def close(self) -> NoReturn:
+        raise NotImplementedError
+
+
+class JSONLinesSpool(StepSpool):
+    """ append step records to JSON lines file, offsets of records are indexed by case_id.
+    """
+
+    def __init__(self, path: Text):
+        super(JSONLinesSpool, self).__init__(path)
+        self.__file = open(path, "wb")
+        self.__offsets: Dict[Text, List[int]] = {}
+
+    def _append(self, case_id: Text, record: Text) -> NoReturn:
+        self.__offsets.setdefault(case_id, []).append(self.__file.tell())
+        line = f'{{"case_id": {json.dumps(case_id)}, "step_data": {record}}}\n'
+        self.__file.write(line.encode("utf-8"))
+
+    def iter_step_datas(self, case_id: Text) -> Iterator[Dict]:
+        with self._lock:
+            self.__file.flush()
+            offsets = list(self.__offsets.get(case_id, []))
+
+        with open(self.path, "rb") as f:
+            for offset in offsets:
+                f.seek(offset)
+                yield json.loads(f.readline().decode("utf-8"))["step_data"]
+
+    def close(self) -> NoReturn:
+        with self._lock:
+            self.__file.close()
+
+
+class SQLiteSpool(StepSpool):
+    """ insert step records to SQLite database, records are committed in batches.
+    """
+
+    commit_interval = 100
+
+    def __init__(self, path: Text):
+        super(SQLiteSpool, self).__init__(path)
+        self.__conn = sqlite3.connect(path, check_same_thread=False)
+        self.__conn.execute("DROP TABLE IF EXISTS step_records")
+        self.__conn.execute(
+            "CREATE TABLE step_records ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, case_id TEXT NOT NULL, step_data TEXT NOT NULL)"
+        )
+        self.__conn.execute("CREATE INDEX step_records_case_id ON step_records (case_id)")
+        self.__uncommitted = 0
+
+    def _append(self, case_id: Text, record: Text) -> NoReturn:
+        self.__conn.execute(
+            "INSERT INTO step_records (case_id, step_data) VALUES (?, ?)", (case_id, record)
+        )
+        self.__uncommitted += 1
+        if self.__uncommitted >= self.commit_interval:
+            self.__conn.commit()
+            self.__uncommitted = 0
+
+    def iter_step_datas(self, case_id: Text) -> Iterator[Dict]:
+        with self._lock:
+            self.__conn.commit()
+            self.__uncommitted = 0
+            rows = self.__conn.execute(
+                "SELECT step_data FROM step_records WHERE case_id = ? ORDER BY id", (case_id,)
+            ).fetchall()
+
+        for (record,) in rows:
+            yield json.loads(record)
+
+    def close(self) -> NoReturn:
+        with self._lock:
+            self.__conn.commit()
+            self.__conn.close()
+
+
+def open_spool(path: Text) -> StepSpool:
+    """ open step spool, SQLite database if path ends with .db/.sqlite, otherwise JSON lines file.
+    """
+    if os.path.splitext(path)[1].lower() in [".db", ".sqlite", ".sqlite3"]:
+        return SQLiteSpool(path)
+
+    return JSONLinesSpool(path)
+
+
+def dump_summary_with_spool(
+        summary: Dict,
+        testcases_key: Text,
+        step_datas_key: Text,
+        spool: StepSpool,
+        summary_path: Text,
+) -> NoReturn:
+    """ dump summary to json file, step datas of each testcase are loaded from spool and written
+        one testcase at a time.
+
+    Args:
+        summary: summary dict, summary[testcases_key] is list of testcase summary dicts
+        testcases_key: key of testcase summaries in summary, e.g. testcases
+        step_datas_key: key of step datas in testcase summary, e.g. step_datas
+        spool: spool which step datas of testcases were appended to
+        summary_path: json file path
+
+    """
+    summary = dict(summary)
+    testcase_summaries = summary.pop(testcases_key)
+
+    with open(summary_path, "w", encoding="utf-8") as f:
+        for key, value in summary.items():
+            f.write("{" if f.tell() == 0 else ", ")
+            f.write(f"{json.dumps(key)}: ")
+            json.dump(value, f, ensure_ascii=False, cls=ExtendJSONEncoder)
+
+        f.write("{" if f.tell() == 0 else ", ")
+        f.write(f"{json.dumps(testcases_key)}: [")
+        for index, testcase_summary in enumerate(testcase_summaries):
+            testcase_summary = dict(testcase_summary)
+            testcase_summary[step_datas_key] = list(
+                spool.iter_step_datas(testcase_summary["case_id"])
+            )
+            if index:
+                f.write(", ")
+            json.dump(testcase_summary, f, ensure_ascii=False, cls=ExtendJSONEncoder)
+
+        f.write("]}")
@@ -8,6 +8,9 @@ from rrtv_httprunner.models import (
     TStep,
     TRequest,
     MethodEnum,
+    RecordPolicy,
+    ConnectionPool,
+    ValidationSampling,
     TestCase,
 )
 from rrtv_httprunner.utils import split_with
@@ -22,6 +25,11 @@ class Config(object):
         self.__export = []
         self.__weight = 1
         self.__datasource = {}
+        self.__lazy_variables = False
+        self.__parallel_steps = False
+        self.__record = RecordPolicy.ALWAYS
+        self.__connection_pool = None
+        self.__validation_sampling = None
         caller_frame = inspect.stack()[1]
         self.__path = caller_frame.filename
 
@@ -57,6 +65,82 @@ class Config(object):
         self.__weight = weight
         return self
 
+    def lazy_variables(self, lazy: bool = True) -> "Config":
+        """ evaluate variables the first time they are referenced, and memoize the evaluated value,
+            unreferenced variables (functions, sql/redis/mongo statements) will never be evaluated.
+
+        Examples:
+            >>> Config("testcase name").variables(**{"token": "${gen_token()}"}).lazy_variables()
+
+        """
+        self.__lazy_variables = lazy
+        return self
+
+    def parallel_steps(self, parallel: bool = True) -> "Config":
+        """ run teststeps concurrently if they do not reference variables extracted by each other,
+            extracted variables and step datas are still saved in teststeps order.
+            teststeps depending on cookies or other side effects of previous teststeps should not
+            be run in this mode.
+
+        Examples:
+            >>> Config("testcase name").parallel_steps()
+
+        """
+        self.__parallel_steps = parallel
+        return self
+
+    def record(self, policy: Text = RecordPolicy.ALWAYS) -> "Config":
+        """ when to record request & response details and curl of teststeps.
+            always: record every teststep, they are saved in summary and logged in debug level.
+            on_failure: only record teststeps failed in validation, useful under load.
+            off: never record, failed request & response are still logged.
+
+        Examples:
+            >>> Config("testcase name").record("on_failure")
+
+        """
+        self.__record = RecordPolicy(policy)
+        return self
+
+    def connection_pool(
+            self, pool_connections: int = 10, pool_maxsize: int = 10
+    ) -> "Config":
+        """ send requests with connection pool shared by testcases with the same pool settings in
+            current process, thus TCP and TLS handshakes are not repeated for each testcase.
+            cookies are still isolated for each testcase.
+
+        Args:
+            pool_connections: number of hosts which connection pools are kept for
+            pool_maxsize: max number of connections kept for each host
+
+        Examples:
+            >>> Config("testcase name").connection_pool(pool_maxsize=50)
+
+        """
+        self.__connection_pool = ConnectionPool(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize
+        )
+        return self
+
+    def sample_validation(self, every: int = 1, percent: float = 100) -> "Config":
+        """ only run validators of sampled responses, e.g. in locust or long soak runs, status_code
+            checks are always run. sampled out validators are counted in summary.
+
+        Args:
+            every: validate 1 in every responses of testcases with the same sampling settings
+            percent: validate percent of responses randomly, used if every is 1
+
+        Raises:
+            pydantic.ValidationError: every is less than 1, or percent is not in 0~100
+
+        Examples:
+            >>> Config("testcase name").sample_validation(every=10)
+            >>> Config("testcase name").sample_validation(percent=5)
+
+        """
+        self.__validation_sampling = ValidationSampling(every=every, percent=percent)
+        return self
+
     def datasource(self, **datasource) -> "Config":
         """
 
@@ -91,7 +175,12 @@ class Config(object):
             export=list(set(self.__export)),
             path=self.__path,
             weight=self.__weight,
-            datasource=self.__datasource
+            datasource=self.__datasource,
+            lazy_variables=self.__lazy_variables,
+            parallel_steps=self.__parallel_steps,
+            record=self.__record,
+            connection_pool=self.__connection_pool,
+            validation_sampling=self.__validation_sampling,
         )
 
 
@@ -566,6 +655,13 @@ class RequestWithOptionalArgs(object):
         self.__step_context.request.allow_redirects = allow_redirects
         return self
 
+    def set_stream(self, stream: bool = True) -> "RequestWithOptionalArgs":
+        """ search body paths of extractors and validators in one pass over response stream,
+            instead of loading very large JSON response body, requires ijson.
+        """
+        self.__step_context.request.stream = stream
+        return self
+
     def upload(self, **file_info) -> "RequestWithOptionalArgs":
         self.__step_context.request.upload.update(file_info)
         return self
@@ -7,7 +7,7 @@ import platform
 import re
 import uuid
 from multiprocessing import Queue
-from typing import Dict, List, Any, Text, NoReturn, Union
+from typing import Dict, List, Any, Text, NoReturn, Union, Iterable, Iterator
 from urllib.parse import quote, unquote
 
 import sentry_sdk
@@ -202,9 +202,13 @@ def merge_variables(
         variables: VariablesMapping, variables_to_be_overridden: VariablesMapping
 ) -> VariablesMapping:
     """ merge two variables mapping, the first variables have higher priority
+
+        lazy variables mapping is merged without evaluating its variables,
+        and the merged variables mapping is lazy as well.
     """
+    lazy_items = getattr(variables, "lazy_items", None)
     step_new_variables = {}
-    for key, value in variables.items():
+    for key, value in (lazy_items() if lazy_items else variables.items()):
         if f"${key}" == value or "${" + key + "}" == value:
             # e.g. {"base_url": "$base_url"}
             # or {"base_url": "${base_url}"}
@@ -213,6 +217,10 @@ def merge_variables(
         step_new_variables[key] = value
 
     merged_variables = copy.copy(variables_to_be_overridden)
+    if lazy_items and not hasattr(merged_variables, "lazy_items"):
+        # variables not evaluated yet should not be exposed in plain dict
+        merged_variables = type(variables)(merged_variables, variables.functions_mapping)
+
     merged_variables.update(step_new_variables)
     return merged_variables
 
@@ -275,6 +283,38 @@ def gen_cartesian_product(*args: List[Dict]) -> List[Dict]:
     return product_list
 
 
+def iter_cartesian_product(*args: Iterable[Dict]) -> Iterator[Dict]:
+    """ generate cartesian product lazily, same items and order as gen_cartesian_product,
+        but product items are generated one by one instead of being loaded into list.
+
+        the first iterable is consumed only once, thus it can be streamed, e.g. a huge csv file;
+        the others are iterated once per item of previous ones, one-shot iterators among them are
+        loaded into list first.
+
+    Examples:
+        >>> arg1 = [{"a": 1}, {"a": 2}]
+        >>> arg2 = [{"x": 111, "y": 112}, {"x": 121, "y": 122}]
+        >>> product_iterator = iter_cartesian_product(arg1, arg2)
+        >>> next(product_iterator)
+            {'a': 1, 'x': 111, 'y': 112}
+
+    """
+    if not args:
+        return
+
+    args = [args[0]] + [list(arg) if iter(arg) is arg else arg for arg in args[1:]]
+
+    def product(index: int, product_item_dict: Dict) -> Iterator[Dict]:
+        if index == len(args):
+            yield product_item_dict
+            return
+
+        for item in args[index]:
+            yield from product(index + 1, {**product_item_dict, **item})
+
+    yield from product(0, {})
+
+
 def split_with(str_params) -> Dict:
     var = str_params.strip().split("&")
     dict_var = {}
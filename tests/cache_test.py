@@ -0,0 +1,106 @@
+import time
+import unittest
+
+from rrtv_httprunner import loader
+from rrtv_httprunner.cache import FunctionCacheScope, memoize
+
+
+class TestCache(unittest.TestCase):
+    def test_memoize(self):
+        calls = []
+
+        @memoize
+        def gen_app_version(platform, major=1):
+            calls.append(platform)
+            return f"{platform}/{major}.0"
+
+        self.assertEqual(gen_app_version("iOS"), "iOS/1.0")
+        self.assertEqual(gen_app_version("iOS"), "iOS/1.0")
+        self.assertEqual(gen_app_version("iOS", major=2), "iOS/2.0")
+        self.assertEqual(calls, ["iOS", "iOS"])
+        self.assertEqual(gen_app_version.function_cache.hits, 1)
+        self.assertEqual(gen_app_version.function_cache.misses, 2)
+
+        # unhashable arguments are not cached
+        gen_app_version(["iOS"])
+        gen_app_version(["iOS"])
+        self.assertEqual(len(calls), 4)
+
+        gen_app_version.function_cache.clear()
+        gen_app_version("iOS")
+        self.assertEqual(len(calls), 5)
+
+    def test_memoize_ttl(self):
+        calls = []
+
+        @memoize(ttl=0.05)
+        def get_sign_key():
+            calls.append(1)
+            return "key"
+
+        get_sign_key()
+        get_sign_key()
+        self.assertEqual(len(calls), 1)
+        time.sleep(0.06)
+        get_sign_key()
+        self.assertEqual(len(calls), 2)
+
+    def test_memoize_scope(self):
+        calls = []
+
+        @memoize
+        def gen_token(user):
+            calls.append(user)
+            return f"token-{user}"
+
+        with FunctionCacheScope() as scope_a:
+            gen_token(1)
+            with FunctionCacheScope() as scope_b:
+                # results of other testcase run are not shared
+                gen_token(1)
+                gen_token(1)
+            gen_token(1)
+
+        self.assertEqual(calls, [1, 1])
+        self.assertEqual(scope_a.get_stat(gen_token.function_cache), (1, 1))
+        self.assertEqual(scope_b.get_stat(gen_token.function_cache), (1, 1))
+
+        # results are released with scope
+        with FunctionCacheScope():
+            gen_token(1)
+        self.assertEqual(calls, [1, 1, 1])
+
+    def test_memoize_maxsize(self):
+        calls = []
+
+        @memoize(maxsize=2)
+        def gen_token(user):
+            calls.append(user)
+            return f"token-{user}"
+
+        for user in [1, 2, 1, 3, 1, 2]:
+            gen_token(user)
+
+        # least recently used result of 2 is evicted by 3
+        self.assertEqual(calls, [1, 2, 3, 2])
+
+    def test_memoize_ttl_evict_expired(self):
+        @memoize(ttl=0.05)
+        def get_sign_key(app_id):
+            return f"key-{app_id}"
+
+        for app_id in range(10):
+            get_sign_key(app_id)
+        time.sleep(0.06)
+        get_sign_key(10)
+        self.assertEqual(len(get_sign_key.function_cache._FunctionCache__entries), 1)
+
+    def test_load_function_caches(self):
+        @memoize
+        def sign(content):
+            return content
+
+        function_caches = loader.load_function_caches(
+            {"sign": sign, "gen_md5": lambda *args: "md5"}
+        )
+        self.assertEqual(function_caches, {"sign": sign.function_cache})
@@ -0,0 +1,126 @@
+import gzip
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from rrtv_httprunner import HttpRunner, Config, Step, RunRequest, globalvar
+from rrtv_httprunner.cassette import open_cassette, ReplayCassetteAdapter
+from rrtv_httprunner.client import get_shared_adapter
+from rrtv_httprunner.models import ConnectionPool, ProjectMeta
+
+
+class CounterHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    count = 0
+
+    def do_GET(self):
+        CounterHandler.count += 1
+        content = f'{{"count": {CounterHandler.count}, "cookie": "{self.headers.get("Cookie")}"}}'
+        content = content.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if self.path.startswith("/gzip"):
+            content = gzip.compress(content)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(content)))
+        if self.path == "/login":
+            self.send_header("Set-Cookie", "session=abc; Path=/")
+            self.send_header("Set-Cookie", "user=leo; Path=/")
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+server = ThreadingHTTPServer(("127.0.0.1", 0), CounterHandler)
+
+
+class CassetteTestCase(HttpRunner):
+    _HttpRunner__project_meta = ProjectMeta(RootDir=tempfile.gettempdir())
+
+    config = Config("cassette").base_url(f"http://127.0.0.1:{server.server_address[1]}")
+    teststeps = [
+        Step(RunRequest("login").get("/login").extract().with_jmespath("body.count", "count")),
+        Step(
+            RunRequest("count")
+                .get("/count")
+                .with_params(**{"after": "$count"})
+                .validate()
+                .assert_equal("body.cookie", "session=abc; user=leo")
+        ),
+        Step(RunRequest("count again").get("/count").with_params(**{"after": "$count"})),
+        Step(RunRequest("gzip count").get("/gzip/count")),
+    ]
+
+
+class TestCassette(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cassette_path = os.path.join(self.temp_dir.name, "cassettes", "demo.cassette")
+
+    def tearDown(self):
+        globalvar.set_value("cassette_adapter", None)
+        self.temp_dir.cleanup()
+
+    def run_with_cassette(self, cassette_adapter):
+        globalvar.set_value("cassette_adapter", cassette_adapter)
+        try:
+            self.runner = CassetteTestCase().test_start()
+        finally:
+            cassette_adapter.close_cassette()
+
+        return [
+            step_data.data.req_resps[0].response.body
+            for step_data in self.runner.get_step_datas()
+        ]
+
+    def test_record_and_replay(self):
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            recorded_bodies = self.run_with_cassette(open_cassette(record_path=self.cassette_path))
+        finally:
+            server.shutdown()
+        self.assertEqual([body["count"] for body in recorded_bodies], [1, 2, 3, 4])
+
+        replay_adapter = open_cassette(replay_path=self.cassette_path)
+        self.assertIsInstance(replay_adapter, ReplayCassetteAdapter)
+        self.assertEqual(self.run_with_cassette(replay_adapter), recorded_bodies)
+
+        # body is recorded decoded, headers are rewritten to match it
+        gzip_response = self.runner.get_step_datas()[3].data.req_resps[0].response
+        self.assertNotIn("Content-Encoding", gzip_response.headers)
+        self.assertEqual(
+            gzip_response.headers["Content-Length"],
+            str(len(b'{"count": 4, "cookie": "session=abc; user=leo"}')),
+        )
+
+    def test_record_with_connection_pool(self):
+        connection_pool = ConnectionPool(pool_connections=2, pool_maxsize=2)
+        globalvar.set_value("connection_pool", connection_pool)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            self.run_with_cassette(open_cassette(record_path=self.cassette_path))
+        finally:
+            server.shutdown()
+            globalvar.set_value("connection_pool", None)
+
+        # requests are sent with shared adapter of connection pool, and recorded
+        adapter = self.runner._HttpRunner__session.get_adapter("http://127.0.0.1")
+        self.assertIs(adapter.adapter, get_shared_adapter(connection_pool))
+        self.assertGreater(self.runner.get_step_datas()[0].data.stat.ttfb_ms, 0)
+        with open(self.cassette_path, encoding="utf-8") as f:
+            self.assertEqual(len(f.readlines()), 4)
+
+    def test_replay_not_recorded(self):
+        os.makedirs(os.path.dirname(self.cassette_path))
+        open(self.cassette_path, "w").close()
+        globalvar.set_value("cassette_adapter", open_cassette(replay_path=self.cassette_path))
+        runner = CassetteTestCase()
+        with self.assertRaises(Exception):
+            runner.test_start()
+
+        session_data = runner._HttpRunner__session.data
+        self.assertEqual(session_data.req_resps[0].response.status_code, 0)
@@ -0,0 +1,68 @@
+import tempfile
+import unittest
+
+from rrtv_httprunner import HttpRunner, Config, Step, RunRequest
+from rrtv_httprunner.executor import run_testcases
+from rrtv_httprunner.models import ProjectMeta
+from tests.stub_server import LoginTestCase, base_url, server
+
+
+class SharedPoolTestCase(HttpRunner):
+    _HttpRunner__project_meta = ProjectMeta(RootDir=tempfile.gettempdir())
+
+    config = Config("shared pool").base_url(base_url).connection_pool(pool_maxsize=2)
+    teststeps = [
+        Step(RunRequest("login").get("/login")),
+        Step(RunRequest("get profile").get("/profile")),
+    ]
+
+
+class NetworkTimingAssertions(object):
+    """ assertions of network timing shared with async runner tests
+    """
+
+    def assert_network_timing(self, runner: HttpRunner):
+        self.assertTrue(runner.success)
+        stats = [step_data.data.stat for step_data in runner.get_step_datas()]
+        self.assertGreater(stats[0].connect_ms, 0)
+        self.assertEqual(stats[0].tls_ms, 0)
+        # connection is reused by the second request
+        self.assertEqual(stats[1].connect_ms, 0)
+        for stat in stats:
+            self.assertGreater(stat.ttfb_ms, 0)
+            self.assertGreater(stat.download_ms, 0)
+            self.assertEqual(stat.body_bytes, stat.content_size)
+            self.assertGreater(stat.content_size, 0)
+            self.assertLessEqual(stat.ttfb_ms, stat.elapsed_ms)
+
+        connection_stat = runner.get_summary().connection_stat
+        self.assertAlmostEqual(connection_stat.ttfb_ms, sum(stat.ttfb_ms for stat in stats))
+        self.assertEqual(connection_stat.body_bytes, sum(stat.body_bytes for stat in stats))
+
+
+class TestHttpSession(NetworkTimingAssertions, unittest.TestCase):
+    def test_shared_connection_pool(self):
+        summary = run_testcases([SharedPoolTestCase] * 10, 2)
+        self.assertTrue(summary.success)
+        self.assertLessEqual(summary.connection_stat.created, 2)
+        self.assertEqual(
+            summary.connection_stat.created + summary.connection_stat.reused, 20
+        )
+        self.assertEqual(summary.testcases[-1].connection_stat.reused, 2)
+        # cookies are not shared between testcases
+        self.assertIsNone(
+            summary.testcases[-1].step_datas[0].data.req_resps[0].response.body["cookie"]
+        )
+
+    def test_address_recorded(self):
+        runner = LoginTestCase().test_start()
+        self.assertTrue(runner.success)
+        session_datas = [step_data.data for step_data in runner.get_step_datas()]
+        self.assertEqual(session_datas[1].address.server_port, server.server_address[1])
+        self.assertEqual(session_datas[0].address.client_port, session_datas[1].address.client_port)
+        self.assertFalse(session_datas[0].stat.connection_reused)
+        # response body is read before next request, connection is released to pool
+        self.assertTrue(session_datas[1].stat.connection_reused)
+
+    def test_network_timing(self):
+        self.assert_network_timing(LoginTestCase().test_start())
@@ -0,0 +1,60 @@
+import threading
+import time
+import unittest
+
+from rrtv_httprunner import HttpRunner
+from rrtv_httprunner.executor import run_testcases
+from rrtv_httprunner.models import TestCaseSummary, TestCaseTime
+
+
+class FakeTestCase(HttpRunner):
+    running = 0
+    max_running = 0
+    lock = threading.Lock()
+
+    def test_start(self, param=None):
+        with self.lock:
+            FakeTestCase.running += 1
+            FakeTestCase.max_running = max(FakeTestCase.max_running, FakeTestCase.running)
+        time.sleep(0.05)
+        with self.lock:
+            FakeTestCase.running -= 1
+
+        self.param = param or {}
+        self.success = self.param.get("success", True)
+        return self
+
+    def get_summary(self) -> TestCaseSummary:
+        return TestCaseSummary(
+            name=f"fake {self.param}",
+            success=self.success,
+            case_id="",
+            time=TestCaseTime(),
+        )
+
+
+class FailedTestCase(FakeTestCase):
+    def test_start(self, param=None):
+        raise RuntimeError("failed")
+
+
+class TestExecutor(unittest.TestCase):
+    def test_run_testcases(self):
+        testcase_items = [(FakeTestCase, {"index": index}) for index in range(8)]
+        testcase_items.append((FakeTestCase, {"success": False}))
+        testcase_items.append(FailedTestCase)
+
+        summary = run_testcases(testcase_items, max_workers=4)
+        self.assertFalse(summary.success)
+        self.assertEqual(summary.stat.total, 10)
+        self.assertEqual(summary.stat.success, 8)
+        self.assertEqual(summary.stat.fail, 2)
+        self.assertEqual(summary.testcases[0].name, "fake {'index': 0}")
+        self.assertEqual(summary.testcases[-1].name, "FailedTestCase")
+        self.assertEqual(FakeTestCase.max_running, 4)
+
+    def test_runner_state_isolated(self):
+        runner1, runner2 = HttpRunner(), HttpRunner()
+        runner1.with_variables({"foo": "bar"})
+        self.assertEqual(runner2.get_step_datas(), [])
+        self.assertIsNone(runner2._HttpRunner__session_variables)
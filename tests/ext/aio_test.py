@@ -0,0 +1,65 @@
+import asyncio
+import unittest
+
+from rrtv_httprunner.exceptions import ParamsError
+from rrtv_httprunner.ext.aio import AsyncHttpRunner, AsyncHttpSession, run_testcases_async
+from tests.client_test import NetworkTimingAssertions
+from tests.stub_server import EchoHandler, LoginTestCase, ParallelStepsTestCase, base_url
+
+
+class TestAsyncHttpRunner(NetworkTimingAssertions, unittest.TestCase):
+    def test_async_runner(self):
+        runner = asyncio.run(AsyncHttpRunner(LoginTestCase()).test_start())
+        self.assertTrue(runner.success)
+
+        step_datas = runner.get_step_datas()
+        self.assertEqual(len(step_datas), 2)
+        self.assertEqual(step_datas[0].export_vars, {"login_path": "/login"})
+
+        session_data = step_datas[1].data
+        self.assertTrue(session_data.success)
+        self.assertEqual(session_data.address.server_ip, "127.0.0.1")
+        self.assertGreater(session_data.address.client_port, 0)
+        self.assertGreater(session_data.stat.response_time_ms, 0)
+        request_data = session_data.req_resps[0].request
+        self.assertEqual(request_data.method, "GET")
+        self.assertEqual(request_data.cookies, {"session": "abc"})
+        self.assertEqual(session_data.req_resps[0].response.body["path"], "/profile?from=%2Flogin")
+
+    def test_run_testcases_async(self):
+        summary = asyncio.run(run_testcases_async([LoginTestCase] * 20, 5))
+        self.assertTrue(summary.success)
+        self.assertEqual(summary.stat.total, 20)
+        self.assertEqual(summary.stat.success, 20)
+        self.assertEqual(len({testcase.case_id for testcase in summary.testcases}), 20)
+
+    def test_network_timing_async(self):
+        self.assert_network_timing(asyncio.run(AsyncHttpRunner(LoginTestCase()).test_start()))
+
+    def test_parallel_steps_async(self):
+        EchoHandler.max_slow_running = 0
+        runner = asyncio.run(AsyncHttpRunner(ParallelStepsTestCase()).test_start())
+        self.assertTrue(runner.success)
+        # independent slow teststeps are sent concurrently
+        self.assertEqual(EchoHandler.max_slow_running, 3)
+        self.assertEqual(
+            [step_data.name for step_data in runner.get_step_datas()],
+            ["login", "slow 0", "slow 1", "slow 2", "summary"],
+        )
+
+    def test_session_request_options(self):
+        async def request(**kwargs):
+            session = AsyncHttpSession()
+            try:
+                url = "http://example.invalid/profile"
+                return session, await session.request("GET", url, **kwargs)
+            finally:
+                await session.close()
+
+        # requests proxies are mapped to aiohttp proxy, stub server echoes absolute url as proxy
+        session, response = asyncio.run(request(proxies={"http": base_url}))
+        self.assertEqual(response.json()["path"], "http://example.invalid/profile")
+        self.assertEqual(session.data.address.server_ip, "127.0.0.1")
+
+        with self.assertRaises(ParamsError):
+            asyncio.run(request(hooks={"response": []}))
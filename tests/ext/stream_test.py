@@ -0,0 +1,186 @@
+import gzip
+import io
+import json
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from rrtv_httprunner import HttpRunner, Config, Step, RunRequest
+from rrtv_httprunner.client import STREAMED_BODY
+from rrtv_httprunner.exceptions import ParamsError, ValidationFailure
+from rrtv_httprunner.ext.stream import search_json_stream
+from rrtv_httprunner.models import ProjectMeta
+
+export_body = json.dumps(
+    {
+        "meta": {"total": 1000, "ratio": 0.5},
+        "data": [{"id": index, "name": f"user{index}", "tags": ["a", "b"]} for index in range(1000)],
+        "tail": {"ok": True},
+    }
+).encode("utf-8")
+
+
+class ExportHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path.startswith("/gzip"):
+            content = gzip.compress(export_body)
+        elif self.path.startswith("/invalid"):
+            content = b"<html></html>"
+        else:
+            content = export_body
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        if self.path.startswith("/gzip"):
+            self.send_header("Content-Encoding", "gzip")
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+server = ThreadingHTTPServer(("127.0.0.1", 0), ExportHandler)
+base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+
+class StreamExportTestCase(HttpRunner):
+    _HttpRunner__project_meta = ProjectMeta(RootDir=tempfile.gettempdir())
+
+    config = Config("stream export").base_url(base_url).variables(**{"index": 2})
+    teststeps = [
+        Step(
+            RunRequest("export")
+                .get("/export")
+                .set_stream()
+                .extract()
+                .with_jmespath("body.meta.total", "total")
+                .with_jmespath("body.data[1]", "user")
+                .validate()
+                .assert_equal("status_code", 200)
+                .assert_equal("body.data[$index].name", "user2")
+                .assert_equal("body.data[999].tags[1]", "b")
+                .assert_equal("body.tail.ok", True)
+        ),
+        Step(
+            RunRequest("gzip export")
+                .get("/gzip/export")
+                .set_stream()
+                .validate()
+                .assert_equal("body.data[3].id", 3)
+                .assert_equal("body.missing", None)
+        ),
+    ]
+
+
+class StreamNegativeIndexTestCase(HttpRunner):
+    _HttpRunner__project_meta = ProjectMeta(RootDir=tempfile.gettempdir())
+
+    config = Config("stream negative index").base_url(base_url)
+    teststeps = [
+        Step(
+            RunRequest("export")
+                .get("/export")
+                .set_stream()
+                .validate()
+                .assert_equal("body.data[-1].id", 999)
+        ),
+    ]
+
+
+class StreamInvalidJSONTestCase(HttpRunner):
+    _HttpRunner__project_meta = ProjectMeta(RootDir=tempfile.gettempdir())
+
+    config = Config("stream invalid json").base_url(base_url)
+    teststeps = [
+        Step(
+            RunRequest("export")
+                .get("/invalid/export")
+                .set_stream()
+                .validate()
+                .assert_equal("body.data", None)
+        ),
+    ]
+
+
+class StreamExtractedCheckTestCase(HttpRunner):
+    _HttpRunner__project_meta = ProjectMeta(RootDir=tempfile.gettempdir())
+
+    config = Config("stream extracted check").base_url(base_url).variables(**{"index": 2})
+    teststeps = [
+        Step(
+            RunRequest("export")
+                .get("/export")
+                .set_stream()
+                .extract()
+                .with_jmespath("body.meta.ratio", "index")
+                .validate()
+                .assert_equal("body.data[$index].name", "user2")
+        ),
+    ]
+
+
+class TestSearchJSONStream(unittest.TestCase):
+    def test_search_paths(self):
+        values = search_json_stream(
+            io.BytesIO(export_body),
+            [("meta",), ("meta", "ratio"), ("data", 2, "tags", 0), ("data", 1000), ("tail", "ok")],
+        )
+        self.assertEqual(
+            values,
+            {
+                ("meta",): {"total": 1000, "ratio": 0.5},
+                ("meta", "ratio"): 0.5,
+                ("data", 2, "tags", 0): "a",
+                ("tail", "ok"): True,
+            },
+        )
+
+    def test_stop_when_paths_found(self):
+        content = json.dumps({"meta": {"total": 100000}, "data": list(range(100000))}).encode()
+        stream = io.BytesIO(content)
+        values = search_json_stream(stream, [("meta", "total")])
+        self.assertEqual(values, {("meta", "total"): 100000})
+        self.assertLess(stream.tell(), len(content))
+
+    def test_invalid_json(self):
+        with self.assertRaises(ValueError):
+            search_json_stream(io.BytesIO(b"<html></html>"), [("data",)])
+
+
+class TestStreamedResponse(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        server.shutdown()
+
+    def test_stream_extract_validate(self):
+        runner = StreamExportTestCase().test_start()
+        self.assertTrue(runner.success)
+        step_datas = runner.get_step_datas()
+        self.assertEqual(
+            step_datas[0].export_vars,
+            {"total": 1000, "user": {"id": 1, "name": "user1", "tags": ["a", "b"]}},
+        )
+        self.assertEqual(step_datas[0].data.req_resps[0].response.body, STREAMED_BODY)
+        # response body is read to the end, connection is released to pool
+        self.assertTrue(step_datas[1].data.stat.connection_reused)
+
+    def test_stream_negative_index(self):
+        with self.assertRaises(ParamsError):
+            StreamNegativeIndexTestCase().test_start()
+
+    def test_stream_invalid_json(self):
+        with self.assertRaises(ValidationFailure):
+            StreamInvalidJSONTestCase().test_start()
+
+    def test_stream_check_extracted_variable(self):
+        # check item can not be searched with variable extracted from the same stream
+        with self.assertRaises(ParamsError):
+            StreamExtractedCheckTestCase().test_start()
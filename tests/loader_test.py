@@ -69,6 +69,17 @@ class TestLoader(unittest.TestCase):
             ],
         )
 
+    def test_lazy_csv_file(self):
+        csv_file_path = os.path.join(os.getcwd(), "examples/httpbin/account.csv")
+        csv_content = loader.LazyCSVFile(csv_file_path)
+        self.assertEqual(next(iter(csv_content)), {"username": "test1", "password": "111111"})
+        # csv file is read again each time it is iterated
+        self.assertEqual(len(list(csv_content)), 3)
+        self.assertEqual(list(csv_content), loader.load_csv_file(csv_file_path))
+
+        with self.assertRaises(exceptions.CSVNotFound):
+            loader.LazyCSVFile(os.path.join(os.getcwd(), "examples/httpbin/not_exist.csv"))
+
     def test_load_folder_files(self):
         folder = os.path.join(os.getcwd(), "examples")
         file1 = os.path.join(os.getcwd(), "examples", "test_utils.py")
@@ -121,3 +132,25 @@ class TestLoader(unittest.TestCase):
             loader.locate_file("examples/httpbin/", "debugtalk.py"),
             os.path.join(os.getcwd(), "examples", "httpbin", "debugtalk.py"),
         )
+
+    def test_load_functions_resolver(self):
+        from rrtv_httprunner.builtin import comparators
+
+        gen_md5 = lambda *args: "md5"
+        equal = lambda *args: None
+        functions_resolver = loader.load_functions_resolver(
+            {"gen_md5": gen_md5, "equal": equal}
+        )
+        self.assertIs(functions_resolver["gen_md5"], gen_md5)
+        # project functions take precedence over builtin functions
+        self.assertIs(functions_resolver["equal"], equal)
+        self.assertIs(functions_resolver["less_than"], comparators.less_than)
+        self.assertIs(functions_resolver["parameterize"], loader.load_csv_file)
+        self.assertIs(functions_resolver["len"], len)
+
+        # builtin functions are loaded only once
+        self.assertIs(
+            loader.load_builtin_functions_resolver(),
+            loader.load_builtin_functions_resolver(),
+        )
+        self.assertNotIn("gen_md5", loader.load_builtin_functions_resolver())
@@ -189,6 +189,17 @@ from request_methods.request_with_functions_test import (
             """Config("request methods testcase: validate with functions").variables(**{'foo1': 'bar1', 'foo2': 22}).base_url("https://postman_echo.com").verify(False)""",
         )
 
+        config["lazy_variables"] = True
+        self.assertTrue(make_config_chain_style(config).endswith(".lazy_variables()"))
+        config["parallel_steps"] = True
+        self.assertTrue(make_config_chain_style(config).endswith(".parallel_steps()"))
+        config["record"] = "on_failure"
+        self.assertTrue(make_config_chain_style(config).endswith('.record("on_failure")'))
+        config["connection_pool"] = {"pool_maxsize": 50}
+        self.assertTrue(
+            make_config_chain_style(config).endswith(".connection_pool(**{'pool_maxsize': 50})")
+        )
+
     def test_make_teststep_chain_style(self):
         step = {
             "name": "get with params",
@@ -215,6 +226,19 @@ from request_methods.request_with_functions_test import (
             """Step(RunRequest("get with params").with_variables(**{'foo1': 'bar1', 'foo2': 123, 'sum_v': '${sum_two(1, 2)}'}).get("/get").with_params(**{'foo1': '$foo1', 'foo2': '$foo2', 'sum_v': '$sum_v'}).with_headers(**{'User-Agent': 'HttpRunner/${get_httprunner_version()}'}).extract().with_jmespath('body.args.foo1', 'session_foo1').with_jmespath('body.args.foo2', 'session_foo2').validate().assert_equal("status_code", 200).assert_equal("body.args.sum_v", "3"))""",
         )
 
+    def test_make_conditional_validator_chain_style(self):
+        step = {
+            "name": "get with conditional validator",
+            "request": {"method": "GET", "url": "/get"},
+            "validate": [
+                {"eq": ["$is_new == 1", "body.args.foo1", "bar1", None, "foo1"]},
+            ],
+        }
+        self.assertEqual(
+            make_teststep_chain_style(step),
+            """Step(RunRequest("get with conditional validator").get("/get").validate().assert_if_equal('$is_new == 1', "body.args.foo1", "bar1", None, 'foo1'))""",
+        )
+
     def test_make_requests_with_json_chain_style(self):
         step = {
             "name": "get with params",
@@ -1,10 +1,17 @@
 import os
 import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 
 from rrtv_httprunner import parser
-from rrtv_httprunner.exceptions import VariableNotFound, FunctionNotFound
+from rrtv_httprunner.exceptions import (
+    VariableNotFound,
+    FunctionNotFound,
+    VariableCircularReference,
+)
 from rrtv_httprunner.loader import load_project_meta
+from rrtv_httprunner.models import TRequest, TStep
+from rrtv_httprunner.utils import merge_variables
 
 
 class TestParserBasic(unittest.TestCase):
@@ -20,6 +27,192 @@ class TestParserBasic(unittest.TestCase):
         with self.assertRaises(VariableNotFound):
             parser.parse_variables_mapping(variables)
 
+    def test_parse_variables_mapping_circular_reference(self):
+        variables = {"varA": "$varB", "varB": "${func($varC)}", "varC": "abc$varA"}
+        with self.assertRaises(VariableCircularReference) as cm:
+            parser.parse_variables_mapping(variables)
+        self.assertEqual(str(cm.exception), "varA -> varB -> varC -> varA")
+
+        with self.assertRaises(VariableNotFound):
+            parser.parse_variables_mapping({"token": "abc$token"})
+
+    def test_parse_variables_mapping_evaluate_once(self):
+        calls = []
+
+        def gen_token(user):
+            calls.append(user)
+            return f"token-{user}"
+
+        variables = {
+            "url": "/api/$user_id?token=$token",
+            "header": {"token": "$token"},
+            "token": "${gen_token($user_id)}",
+            "user_id": 1000,
+        }
+        parsed_variables = parser.parse_variables_mapping(
+            variables, {"gen_token": gen_token}
+        )
+        self.assertEqual(calls, [1000])
+        self.assertEqual(list(parsed_variables), list(variables))
+        self.assertEqual(parsed_variables["url"], "/api/1000?token=token-1000")
+        self.assertEqual(parsed_variables["header"], {"token": "token-1000"})
+
+    def test_lazy_variables_mapping(self):
+        calls = []
+
+        def gen_token(user):
+            calls.append(user)
+            return f"token-{user}"
+
+        functions_mapping = {"gen_token": gen_token}
+        variables_mapping = parser.LazyVariablesMapping(
+            {
+                "token": "${gen_token($user_id)}",
+                "user_id": 1000,
+                "unused": "${gen_token(0)}",
+            },
+            functions_mapping,
+        )
+        self.assertEqual(calls, [])
+        for _ in range(2):
+            self.assertEqual(
+                parser.parse_data("/api/$user_id?token=$token", variables_mapping, functions_mapping),
+                "/api/1000?token=token-1000",
+            )
+        self.assertEqual(calls, [1000])
+        self.assertEqual(
+            variables_mapping.get_evaluated_variables(),
+            {"token": "token-1000", "user_id": 1000},
+        )
+
+        # evaluated value of outer scope variable is shared
+        step_variables = parser.LazyVariablesMapping(
+            {"auth": "Bearer $token", "token": dict.__getitem__(variables_mapping, "unused")},
+            functions_mapping,
+        )
+        self.assertEqual(step_variables["auth"], "Bearer token-0")
+        self.assertEqual(variables_mapping["unused"], "token-0")
+        self.assertEqual(calls, [1000, 0])
+
+    def test_lazy_variables_mapping_copy(self):
+        calls = []
+
+        def gen_token(user):
+            calls.append(user)
+            return f"token-{user}"
+
+        variables_mapping = parser.LazyVariablesMapping(
+            {"token": "${gen_token($user_id)}", "user_id": 1000}, {"gen_token": gen_token}
+        )
+        merged_variables = merge_variables({"token": "$token", "page": 1}, variables_mapping)
+        self.assertIsInstance(merged_variables, parser.LazyVariablesMapping)
+        merged_variables = merge_variables(merged_variables, {"size": 20})
+        self.assertIsInstance(merged_variables, parser.LazyVariablesMapping)
+        self.assertEqual(calls, [])
+
+        expected = {"token": "token-1000", "user_id": 1000, "page": 1, "size": 20}
+        self.assertEqual(dict(merged_variables), expected)
+        self.assertEqual({**merged_variables}, expected)
+        self.assertEqual(dict(merged_variables.items()), expected)
+        self.assertCountEqual(merged_variables.values(), expected.values())
+        self.assertEqual(dict(variables_mapping.copy()), {"token": "token-1000", "user_id": 1000})
+        self.assertEqual(calls, [1000])
+
+    def test_lazy_variables_mapping_exception(self):
+        variables_mapping = parser.LazyVariablesMapping({"varA": "$varB", "varB": "$varA"})
+        with self.assertRaises(VariableCircularReference) as cm:
+            parser.parse_data("$varA", variables_mapping)
+        self.assertEqual(str(cm.exception), "varA -> varB -> varA")
+
+        variables_mapping = parser.LazyVariablesMapping({"varA": "$varB"})
+        with self.assertRaises(VariableNotFound):
+            parser.parse_data("$varA", variables_mapping)
+
+    def test_parse_data_concurrently(self):
+        functions_mapping = {"add_one": lambda x: x + 1}
+
+        def render(index):
+            return parser.parse_data(
+                {"url": "/api/$uid", "num": "${add_one($uid)}", "items": ["$user['id']"]},
+                {"uid": index, "user": {"id": index}},
+                functions_mapping,
+            )
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(render, range(200)))
+
+        for index, result in enumerate(results):
+            self.assertEqual(
+                result, {"url": f"/api/{index}", "num": index + 1, "items": [index]}
+            )
+
+    def test_lazy_variables_mapping_concurrently(self):
+        calls = []
+
+        def gen_token():
+            calls.append(1)
+            time.sleep(0.05)
+            return "abc"
+
+        variables_mapping = parser.LazyVariablesMapping(
+            {"token": "${gen_token()}"}, {"gen_token": gen_token}
+        )
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(
+                executor.map(
+                    lambda _: parser.parse_data("token=$token", variables_mapping),
+                    range(8),
+                )
+            )
+
+        self.assertEqual(results, ["token=abc"] * 8)
+        self.assertEqual(len(calls), 1)
+
+    def test_resolve_variables_order(self):
+        self.assertEqual(
+            parser.resolve_variables_order(
+                {"varA": ["varB"], "varB": ["varC"], "varC": [], "a": []}
+            ),
+            ["varC", "varB", "varA", "a"],
+        )
+
+    def test_resolve_steps_levels(self):
+        def request_step(name, url, extract=None):
+            return TStep(
+                name=name,
+                request=TRequest(method="GET", url=url),
+                extract=extract or {},
+            )
+
+        teststeps = [
+            request_step("login", "/login", {"token": "body.token"}),
+            request_step("get user", "/user?token=$token"),
+            request_step("get order", "/order?token=$token", {"uid": "body.uid"}),
+            request_step("get item", "/item/$uid"),
+            TStep(name="referenced testcase", testcase="testcases/demo.yml"),
+            request_step("get static", "/static"),
+            request_step("read token", "/token/$token"),
+            request_step("refresh token", "/refresh", {"token": "body.token"}),
+            request_step("read new token", "/token/$token"),
+        ]
+        self.assertEqual(
+            parser.resolve_steps_levels(teststeps),
+            [[0], [1, 2], [3], [4], [5, 6, 7], [8]],
+        )
+
+        # variables referenced by validators and extractors are dependencies too
+        teststeps = [
+            request_step("login", "/login", {"token": "body.token", "index": "body.index"}),
+            TStep(
+                name="validate token",
+                request=TRequest(method="GET", url="/user"),
+                validate=[{"eq": ["body.token", "$token"]}],
+            ),
+            request_step("extract item", "/items", {"item": "body.items[$index]"}),
+            request_step("get static", "/static"),
+        ]
+        self.assertEqual(parser.resolve_steps_levels(teststeps), [[0, 3], [1, 2]])
+
     def test_parse_string_value(self):
         self.assertEqual(parser.parse_string_value("123"), 123)
         self.assertEqual(parser.parse_string_value("12.3"), 12.3)
@@ -91,6 +284,42 @@ class TestParserBasic(unittest.TestCase):
             {"args": ["$request", "12 3"], "kwargs": {}},
         )
 
+    def test_parse_function_params_tokenized(self):
+        self.assertEqual(
+            parser.parse_function_params("${gen(1, 2)}, 'a,b', [1, 2], c={'d': 'e=f'}"),
+            {"args": ["${gen(1, 2)}", "a,b", [1, 2]], "kwargs": {"c": {"d": "e=f"}}},
+        )
+        self.assertEqual(
+            parser.parse_function_params("don't, stop"),
+            {"args": ["don't", "stop"], "kwargs": {}},
+        )
+        self.assertEqual(
+            parser.parse_function_params("hi :), a=1"),
+            {"args": ["hi :)"], "kwargs": {"a": 1}},
+        )
+        self.assertEqual(
+            parser.parse_function_params("select * from t where id=1", "execute_sql"),
+            {"args": ["select * from t where id=1"], "kwargs": {}},
+        )
+        self.assertEqual(
+            parser.tokenize_function_params("$a, b=$c"), (("$a", -1), (" b=$c", 2))
+        )
+
+    def test_parse_data_nested_function_args(self):
+        functions_mapping = {
+            "add": lambda a, b=0: a + b,
+            "append_one": lambda items: items.append(1) or items,
+        }
+        self.assertEqual(
+            parser.parse_data("${add(${add(1, 2)}, b=$num)}", {"num": 3}, functions_mapping),
+            6,
+        )
+        # literal arguments are not shared between renders
+        for _ in range(2):
+            self.assertEqual(
+                parser.parse_data("${append_one([0])}", {}, functions_mapping), [0, 1]
+            )
+
     def test_extract_functions(self):
         self.assertEqual(parser.regex_findall_functions("${func()}"), [("func", "")])
         self.assertEqual(parser.regex_findall_functions("${func(5)}"), [("func", "5")])
@@ -336,6 +565,60 @@ class TestParserBasic(unittest.TestCase):
         )
         self.assertEqual(value, "ABCabc123abc--abc123abc")
 
+    def test_compile_string(self):
+        self.assertEqual(parser.compile_string("abc"), ("abc",))
+        self.assertEqual(
+            parser.compile_string("/api/$uid?token=${token}"),
+            (
+                "/api/",
+                parser.VariableToken("uid"),
+                "?token=",
+                parser.VariableToken("token"),
+            ),
+        )
+        self.assertEqual(
+            parser.compile_string("$resp['data']"),
+            (parser.VariableToken("resp", suffix="data", whole=True),),
+        )
+        self.assertEqual(
+            parser.compile_string("ABC$$var_1${add_one(3)}"),
+            (
+                "ABC$var_1",
+                parser.FunctionToken("add_one", "3", (3,), {}),
+            ),
+        )
+        self.assertEqual(
+            parser.compile_string("${func1($var_1, a=1)}"),
+            (
+                parser.FunctionToken(
+                    "func1", "$var_1, a=1", ("$var_1",), {"a": 1}, whole=True
+                ),
+            ),
+        )
+
+    def test_compile_string_cached(self):
+        raw_string = "/api/${add_one($num)}/$num"
+        compiled = parser.compile_string(raw_string)
+        self.assertIs(parser.compile_string(raw_string), compiled)
+
+        functions_mapping = {"add_one": lambda x: x + 1}
+        for num in range(3):
+            self.assertEqual(
+                parser.parse_string(raw_string, {"num": num}, functions_mapping),
+                f"/api/{num + 1}/{num}",
+            )
+
+    def test_parse_data_variable_with_suffix(self):
+        variables_mapping = {"resp": {"data": {"id": 1}, "msg": "ok"}, "name": "abc"}
+        self.assertEqual(
+            parser.parse_data("$resp['data']", variables_mapping), {"id": 1}
+        )
+        self.assertEqual(
+            parser.parse_data("msg: $resp['msg']", variables_mapping), "msg: ok"
+        )
+        self.assertEqual(parser.parse_data("$name['x']", variables_mapping), "abc")
+        self.assertEqual(parser.parse_data("]$name['x']", variables_mapping), "]abc['x']")
+
     def test_parse_data_func_abnormal(self):
         variables_mapping = {
             "var_1": "abc",
@@ -423,6 +706,60 @@ class TestParserBasic(unittest.TestCase):
         self.assertEqual("", result["request"]["data"]["empty_str"])
         self.assertEqual("abc4def", result["request"]["data"]["value"])
 
+    def test_compile_data(self):
+        self.assertIsNone(parser.compile_data({"a": [1, "abc", {"b": None}]}))
+        self.assertIsNone(parser.compile_data("abc"))
+        self.assertEqual(parser.compile_data("$var"), "$var")
+        self.assertEqual(parser.compile_data(" abc"), " abc")
+        self.assertEqual(parser.compile_data("cmd:echo 1"), "cmd:echo 1")
+
+        data_template = parser.compile_data(
+            {"static": {"a": [1, 2]}, "url": "/api/$uid", "items": [1, "$uid"]}
+        )
+        self.assertIsInstance(data_template, parser.DataTemplate)
+        self.assertEqual(list(data_template.items), ["url", "items"])
+        self.assertFalse(data_template.templated_keys)
+        self.assertEqual(data_template.items["items"][1].items, ((1, "$uid"),))
+
+        # tuple is always converted to list
+        self.assertEqual(parser.parse_data((1, 2)), [1, 2])
+
+    def test_parse_data_template_free_subtree(self):
+        static_body = {"items": [{"id": i, "name": f"item-{i}"} for i in range(100)]}
+        content = {
+            "url": "/api/$uid",
+            "json": {"body": static_body, "token": "$token"},
+            "headers": {"${header_name}": "abc"},
+        }
+        variables_mapping = {"uid": 1000, "token": "abc123", "header_name": "X-Token"}
+
+        result = parser.parse_data(content, variables_mapping)
+        self.assertEqual(
+            result,
+            {
+                "url": "/api/1000",
+                "json": {"body": static_body, "token": "abc123"},
+                "headers": {"X-Token": "abc"},
+            },
+        )
+        # templated containers are rebuilt, template-free subtree is shared without copying
+        self.assertIsNot(result["json"], content["json"])
+        self.assertIs(result["json"]["body"], static_body)
+        self.assertIsNot(parser.parse_data(static_body), static_body)
+        self.assertIs(parser.parse_data(static_body)["items"], static_body["items"])
+
+        # raw data is compiled once, and precompiled data can be rendered repeatedly
+        self.assertIs(parser.get_data_template(content), parser.get_data_template(content))
+        data_template = parser.compile_data(content)
+        for uid in range(3):
+            result = parser.parse_data(data_template, dict(variables_mapping, uid=uid))
+            self.assertEqual(result["url"], f"/api/{uid}")
+            self.assertIs(result["json"]["body"], static_body)
+
+        static_template = parser.DataTemplate(content, {})
+        self.assertIsNot(parser.parse_data(static_template), content)
+        self.assertEqual(parser.parse_data(static_template), content)
+
     def test_parse_data_testcase(self):
         variables = {
             "uid": "1000",
@@ -1,8 +1,38 @@
+import tempfile
 import unittest
 
 import requests
+from pydantic import ValidationError
 
-from rrtv_httprunner.response import ResponseObject
+from rrtv_httprunner import HttpRunner, Config, Step, RunRequest
+from rrtv_httprunner.client import load_response_json
+from rrtv_httprunner.exceptions import ParamsError, ValidationFailure
+from rrtv_httprunner.executor import run_testcases
+from rrtv_httprunner.models import ProjectMeta
+from rrtv_httprunner.response import (
+    ResponseObject,
+    compile_jmespath,
+    compile_validator,
+    parse_validation_sampling,
+    uniform_validator,
+)
+from tests.stub_server import base_url
+
+
+class SampledValidationTestCase(HttpRunner):
+    _HttpRunner__project_meta = ProjectMeta(RootDir=tempfile.gettempdir())
+
+    config = Config("sampled validation").base_url(base_url).sample_validation(every=4)
+    teststeps = [
+        Step(
+            RunRequest("get profile")
+                .get("/profile")
+                .validate()
+                .assert_equal("status_code", 200)
+                .assert_equal("body.path", "/profile")
+                .assert_type_match("body.cookie", "None")
+        ),
+    ]
 
 
 class TestResponse(unittest.TestCase):
@@ -53,3 +83,139 @@ class TestResponse(unittest.TestCase):
             variables_mapping=variables_mapping,
             functions_mapping=functions_mapping,
         )
+
+
+class TestResponseBody(unittest.TestCase):
+    @staticmethod
+    def build_response(body: str) -> requests.Response:
+        resp = requests.Response()
+        resp.status_code = 200
+        resp.encoding = "utf-8"
+        resp._content = body.encode("utf-8")
+        return resp
+
+    def test_decode_json_once(self):
+        resp = self.build_response('{"code": 0, "data": {"id": 1}}')
+        decode_times = []
+        resp_json = resp.json
+        resp.json = lambda: decode_times.append(1) or resp_json()
+
+        self.assertEqual(load_response_json(resp), {"code": 0, "data": {"id": 1}})
+        resp_obj = ResponseObject(resp)
+        self.assertIs(resp_obj.body, load_response_json(resp))
+        self.assertEqual(resp_obj.extract({"id": "body.data.id"}, {}), {"id": 1})
+        self.assertEqual(len(decode_times), 1)
+
+    def test_decode_lenient_json(self):
+        resp_obj = ResponseObject(self.build_response("{'code': 0, data: {1: 'a'},}"))
+        self.assertEqual(resp_obj.body, {"code": 0, "data": {"1": "a"}})
+
+    def test_decode_not_json(self):
+        resp = self.build_response("<html>hello</html>")
+        with self.assertRaises(ValueError):
+            load_response_json(resp)
+        self.assertEqual(ResponseObject(resp).body, {"data": "<html>hello</html>"})
+        self.assertEqual(ResponseObject(self.build_response("")).body, {})
+
+    def test_search_compiled_jmespath(self):
+        resp = self.build_response('{"data": {"items": [{"id": 1}, {"id": 2}], "name": "a"}}')
+        resp.headers["Content-Type"] = "application/json"
+        resp_obj = ResponseObject(resp)
+        self.assertEqual(compile_jmespath("body.data.items[-1].id"), ("body", "data", "items", -1, "id"))
+        self.assertEqual(resp_obj._search_jmespath("body.data.items[-1].id"), 2)
+        self.assertIsNone(resp_obj._search_jmespath("body.data.items[2].id"))
+        self.assertIsNone(resp_obj._search_jmespath("body.data.name.first"))
+        self.assertEqual(resp_obj._search_jmespath("headers.content_type"), None)
+        self.assertEqual(resp_obj._search_jmespath('headers."content-type"'), "application/json")
+        self.assertEqual(resp_obj._search_jmespath("body.data.items[*].id"), [1, 2])
+        # not jmespath syntax
+        self.assertEqual(resp_obj._search_jmespath("abc"), "abc")
+        self.assertEqual(resp_obj._search_jmespath("body..id"), "body..id")
+
+    def test_search_status_code_without_decoding(self):
+        resp_obj = ResponseObject(self.build_response('{"code": 0}'))
+        self.assertEqual(resp_obj._search_jmespath("status_code"), 200)
+        self.assertEqual(resp_obj.decode_time_ms, 0)
+        self.assertNotIn("body", resp_obj.__dict__)
+
+    def test_uniform_validator(self):
+        self.assertEqual(
+            uniform_validator({"len_eq": ["body.data.items", 2, "count"]}),
+            {"check": "body.data.items", "expect": 2, "assert": "length_equal", "message": "count"},
+        )
+        conditional = {"eq": ["$is_new == 1", "body.data.name", "a", None]}
+        self.assertEqual(uniform_validator(conditional, {"is_new": 1})["expect"], "a")
+        self.assertIsNone(uniform_validator(conditional, {"is_new": 0}))
+        # the same normalization is shared with compiled validators
+        compiled = compile_validator(conditional)
+        self.assertEqual(
+            (compiled.comparator, compiled.condition, compiled.check, compiled.expect),
+            ("equal", "$is_new == 1", "body.data.name", "a"),
+        )
+
+    def test_validate_compiled_validators(self):
+        validators = [
+            compile_validator(validator)
+            for validator in [
+                {"eq": ["status_code", 200]},
+                {"len_eq": ["body.data.items", "$count"]},
+                {"eq": ["${get_key()}", 1, "message: $count"]},
+                {"eq": ["$is_new", "body.data.items[0]", 1, None]},
+                {"equal": ["$is_new == 1", "body.data.name", "a", "b", "name"]},
+            ]
+        ]
+        self.assertEqual(validators[1].comparator, "length_equal")
+        self.assertEqual(validators[0].check_path, ("status_code",))
+        self.assertIsNone(validators[0].expect_template)
+
+        resp_obj = ResponseObject(self.build_response('{"data": {"items": [1, 2], "name": "b"}}'))
+        variables_mapping = {"count": 2, "is_new": "0"}
+        functions_mapping = {"get_key": lambda: 1}
+        for _ in range(2):
+            resp_obj.validate(validators, variables_mapping, functions_mapping)
+
+        results = resp_obj.validation_results["validate_extractor"]
+        # conditional validator without else expect value is skipped
+        self.assertEqual(len(results), 4)
+        self.assertEqual(results[1]["expect_value"], 2)
+        self.assertEqual(results[2]["check"], 1)
+        self.assertEqual(results[2]["message"], "message: 2")
+        self.assertEqual(results[3]["expect"], "b")
+
+        with self.assertRaises(ValidationFailure):
+            resp_obj.validate(validators, {"count": 3, "is_new": "0"}, functions_mapping)
+
+    def test_validate_not_sampled(self):
+        resp_obj = ResponseObject(self.build_response('{"code": 0}'))
+        resp_obj.validate(
+            [{"eq": ["status_code", 200]}, {"eq": ["body.code", 1]}, {"regex_match": ["body.code", "1"]}],
+            sampled=False,
+        )
+        self.assertEqual(len(resp_obj.validation_results["validate_extractor"]), 1)
+        self.assertEqual(resp_obj.validation_results["sampled_out"], 2)
+
+        self.assertEqual(parse_validation_sampling("10").every, 10)
+        self.assertEqual(parse_validation_sampling("2.5%").percent, 2.5)
+        with self.assertRaises(ParamsError):
+            parse_validation_sampling("0")
+        with self.assertRaises(ParamsError):
+            parse_validation_sampling("120%")
+        # the same ranges are validated for sampling configured in testcase
+        with self.assertRaises(ValidationError):
+            Config("invalid sampling").sample_validation(every=0)
+        with self.assertRaises(ValidationError):
+            Config("invalid sampling").sample_validation(percent=-1)
+
+
+class TestValidationSampling(unittest.TestCase):
+    def test_sample_validation(self):
+        summary = run_testcases([SampledValidationTestCase] * 8, 2)
+        self.assertTrue(summary.success)
+        # 2 in 8 responses are sampled, status_code is always validated
+        self.assertEqual(summary.validation_stat.sampled_out, 12)
+        self.assertEqual(summary.validation_stat.validated, 12)
+        validated = [
+            len(testcase.step_datas[0].data.validators["validate_extractor"])
+            for testcase in summary.testcases
+        ]
+        self.assertEqual(sorted(validated), [1] * 6 + [3] * 2)
@@ -1,9 +1,71 @@
+import contextlib
+import io
 import os
+import tempfile
+import threading
 import unittest
 
-from rrtv_httprunner import loader
+from loguru import logger
+
+from rrtv_httprunner import loader, memoize, Config, Step, RunRequest, RunTestCase
 from rrtv_httprunner.cli import main_run
-from rrtv_httprunner.runner import HttpRunner
+from rrtv_httprunner.exceptions import ValidationFailure
+from rrtv_httprunner.models import ProjectMeta
+from rrtv_httprunner.runner import CaseLogSink, HttpRunner
+from tests.stub_server import EchoHandler, LoginTestCase, ParallelStepsTestCase, base_url
+
+
+class RecordOnFailureTestCase(HttpRunner):
+    _HttpRunner__project_meta = ProjectMeta(RootDir=tempfile.gettempdir())
+
+    config = Config("record on failure").base_url(base_url).record("on_failure")
+    teststeps = [
+        Step(RunRequest("login").get("/login").validate().assert_equal("status_code", 200)),
+        Step(RunRequest("get profile").get("/profile").validate().assert_equal("status_code", 404)),
+    ]
+
+
+class ParallelFailureTestCase(HttpRunner):
+    _HttpRunner__project_meta = ProjectMeta(RootDir=tempfile.gettempdir())
+
+    config = Config("parallel failure").base_url(base_url).parallel_steps()
+    teststeps = [
+        Step(RunRequest("slow 0").get("/slow/0").validate().assert_equal("status_code", 404)),
+        Step(RunRequest("slow 1").get("/slow/1").validate().assert_equal("status_code", 200)),
+    ]
+
+
+token_calls = []
+
+
+@memoize
+def gen_token(user):
+    token_calls.append(user)
+    return f"token-{user}"
+
+
+memoized_project_meta = ProjectMeta(
+    RootDir=tempfile.gettempdir(),
+    functions={"gen_token": gen_token},
+    function_caches={"gen_token": gen_token.function_cache},
+)
+
+
+class MemoizedInnerTestCase(HttpRunner):
+    _HttpRunner__project_meta = memoized_project_meta
+
+    config = Config("memoized inner").base_url(base_url)
+    teststeps = [Step(RunRequest("inner").get("/profile").with_params(token="${gen_token(leo)}"))]
+
+
+class MemoizedOuterTestCase(HttpRunner):
+    _HttpRunner__project_meta = memoized_project_meta
+
+    config = Config("memoized outer").base_url(base_url)
+    teststeps = [
+        Step(RunRequest("outer").get("/login").with_params(token="${gen_token(leo)}")),
+        Step(RunTestCase("reference inner").call(MemoizedInnerTestCase)),
+    ]
 
 
 class TestHttpRunner(unittest.TestCase):
@@ -30,6 +92,12 @@ class TestHttpRunner(unittest.TestCase):
         self.assertEqual(result.name, "request methods testcase: reference testcase")
         self.assertEqual(result.step_datas[0].name, "request with functions")
         self.assertEqual(len(result.step_datas), 2)
+        # time of referenced testcase is sum of its teststeps
+        self.assertEqual(
+            result.step_datas[0].time.request_ms,
+            sum(step_data.time.request_ms for step_data in result.step_datas[0].data),
+        )
+        self.assertGreater(result.step_time.request_ms, 0)
 
     def test_run_testcase_with_abnormal_path(self):
         exit_code = main_run(["tests/data/a-b.c/2 3.yml"])
@@ -38,3 +106,114 @@ class TestHttpRunner(unittest.TestCase):
         self.assertTrue(os.path.exists("tests/data/debugtalk.py"))
         self.assertTrue(os.path.exists("tests/data/a_b_c/T1_test.py"))
         self.assertTrue(os.path.exists("tests/data/a_b_c/T2_3_test.py"))
+
+
+class TestCaseLogSink(unittest.TestCase):
+    def test_remove_while_logging(self):
+        sink = CaseLogSink()
+        temp_dir = tempfile.TemporaryDirectory()
+        errors = io.StringIO()
+
+        def log(case_id):
+            with logger.contextualize(case_id=case_id):
+                for _ in range(20):
+                    logger.debug("step")
+
+        # log file of testcase is removed while its thread is still logging
+        with contextlib.redirect_stderr(errors):
+            for index in range(50):
+                case_id = f"case-{index}"
+                sink.add(case_id, os.path.join(temp_dir.name, f"{case_id}.log"))
+                thread = threading.Thread(target=log, args=(case_id,))
+                thread.start()
+                sink.remove(case_id)
+                thread.join()
+
+        logger.remove(sink._CaseLogSink__handler_id)
+        temp_dir.cleanup()
+        self.assertNotIn("Logging error", errors.getvalue())
+
+
+class TestHttpRunnerWithStubServer(unittest.TestCase):
+    def test_execution_plan_reused(self):
+        request_ids = []
+        for _ in range(2):
+            runner = LoginTestCase().test_start()
+            self.assertTrue(runner.success)
+            request_data = runner.get_step_datas()[0].data.req_resps[0].request
+            request_ids.append(request_data.headers["HRUN-Request-ID"])
+
+        self.assertNotEqual(request_ids[0], request_ids[1])
+        plan = LoginTestCase._HttpRunner__execution_plan
+        self.assertTrue(plan.is_compiled_from(LoginTestCase.config, LoginTestCase.teststeps))
+        self.assertEqual(plan.teststeps[0].request.headers, {})
+        self.assertEqual(plan.teststeps[0].variables, {})
+        self.assertEqual(plan.config.variables, {"user": "leo"})
+        # validators are compiled by the first run and shared
+        self.assertEqual(len(plan.compiled_validators), 2)
+
+    def test_step_time(self):
+        summary = LoginTestCase().test_start().get_summary()
+        step_time = summary.step_datas[0].time
+        self.assertGreater(step_time.request_ms, 0)
+        self.assertGreater(step_time.decode_ms, 0)
+        self.assertGreater(step_time.validate_ms, 0)
+        self.assertLessEqual(
+            step_time.parse_ms + step_time.request_ms + step_time.decode_ms
+            + step_time.extract_ms + step_time.validate_ms,
+            step_time.total_ms,
+        )
+        self.assertAlmostEqual(
+            summary.step_time.total_ms,
+            sum(step_data.time.total_ms for step_data in summary.step_datas),
+        )
+
+    def test_record_on_failure(self):
+        runner = RecordOnFailureTestCase()
+        with self.assertRaises(ValidationFailure):
+            runner.test_start()
+
+        # passed teststep is not recorded
+        self.assertEqual(runner.get_step_datas()[0].data.req_resps, [])
+        self.assertGreater(runner.get_step_datas()[0].data.stat.response_time_ms, 0)
+        req_resps = runner._HttpRunner__session.data.req_resps
+        self.assertEqual(req_resps[0].request.url, f"{base_url}/profile")
+        self.assertEqual(req_resps[0].response.status_code, 200)
+
+    def test_parallel_steps(self):
+        EchoHandler.max_slow_running = 0
+        runner = ParallelStepsTestCase().test_start()
+        self.assertTrue(runner.success)
+        # independent slow teststeps are sent concurrently, and saved in teststeps order
+        self.assertEqual(EchoHandler.max_slow_running, 3)
+        self.assertEqual(
+            [step_data.name for step_data in runner.get_step_datas()],
+            ["login", "slow 0", "slow 1", "slow 2", "summary"],
+        )
+        self.assertEqual(
+            runner.get_step_datas()[2].export_vars, {"path_1": "/slow/1?from=%2Flogin"}
+        )
+
+    def test_parallel_steps_failure(self):
+        runner = ParallelFailureTestCase()
+        with self.assertRaises(ValidationFailure):
+            runner.test_start()
+
+        # result is not overwritten by the passed teststep running concurrently
+        self.assertFalse(runner.success)
+
+    def test_function_cache_scope_of_referenced_testcase(self):
+        del token_calls[:]
+        runner = MemoizedOuterTestCase()
+        self.assertIsNone(runner._HttpRunner__function_cache_scope)
+        summary = runner.test_start().get_summary()
+
+        # referenced testcase reuses memoized results of its parent testcase
+        self.assertEqual(token_calls, ["leo"])
+        stat = summary.function_cache_stats["gen_token"]
+        self.assertEqual((stat.hits, stat.misses), (1, 1))
+
+        # each run has its own scope
+        MemoizedOuterTestCase().test_start()
+        self.assertEqual(token_calls, ["leo", "leo"])
+        self.assertIsNone(MemoizedOuterTestCase._HttpRunner__function_cache_scope)
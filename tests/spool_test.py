@@ -0,0 +1,114 @@
+import json
+import os
+import tempfile
+import unittest
+
+from rrtv_httprunner.executor import run_testcases
+from rrtv_httprunner.models import SessionData, StepData
+from rrtv_httprunner.response import ResponseObject
+from rrtv_httprunner.spool import open_spool, JSONLinesSpool, SQLiteSpool, dump_summary_with_spool
+from tests.stub_server import LoginTestCase
+
+
+class TestSpool(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def append_step_datas(self, spool):
+        for index in range(3):
+            for case_id in ["case-a", "case-b"]:
+                spool.append(
+                    case_id,
+                    StepData(
+                        name=f"{case_id} step {index}",
+                        success=True,
+                        data=SessionData(success=True),
+                        export_vars={"index": index},
+                    ),
+                )
+
+    def assert_spool(self, spool):
+        self.append_step_datas(spool)
+        step_datas = list(spool.iter_step_datas("case-b"))
+        self.assertEqual(
+            [step_data["name"] for step_data in step_datas],
+            ["case-b step 0", "case-b step 1", "case-b step 2"],
+        )
+        self.assertEqual(step_datas[2]["export_vars"], {"index": 2})
+        self.assertTrue(step_datas[0]["data"]["success"])
+        self.assertEqual(list(spool.iter_step_datas("case-c")), [])
+        spool.close()
+
+    def test_jsonlines_spool(self):
+        spool = open_spool(os.path.join(self.temp_dir.name, "results", "steps.jsonl"))
+        self.assertIsInstance(spool, JSONLinesSpool)
+        self.assert_spool(spool)
+
+        with open(spool.path, encoding="utf-8") as f:
+            lines = f.readlines()
+        self.assertEqual(len(lines), 6)
+        self.assertEqual(json.loads(lines[1])["case_id"], "case-b")
+
+    def test_sqlite_spool(self):
+        spool = open_spool(os.path.join(self.temp_dir.name, "steps.db"))
+        self.assertIsInstance(spool, SQLiteSpool)
+        self.assert_spool(spool)
+
+    def test_dump_summary_with_spool(self):
+        spool = open_spool(os.path.join(self.temp_dir.name, "steps.jsonl"))
+        self.append_step_datas(spool)
+        summary_path = os.path.join(self.temp_dir.name, "summary.json")
+        summary = {
+            "success": True,
+            "details": [
+                {"name": "a", "case_id": "case-a", "records": []},
+                {"name": "b", "case_id": "case-b", "records": []},
+            ],
+        }
+        dump_summary_with_spool(summary, "details", "records", spool, summary_path)
+        spool.close()
+
+        with open(summary_path, encoding="utf-8") as f:
+            dumped_summary = json.load(f)
+        self.assertTrue(dumped_summary["success"])
+        self.assertEqual(len(dumped_summary["details"]), 2)
+        self.assertEqual(dumped_summary["details"][1]["name"], "b")
+        self.assertEqual(
+            [record["name"] for record in dumped_summary["details"][0]["records"]],
+            ["case-a step 0", "case-a step 1", "case-a step 2"],
+        )
+
+    def test_run_testcases_with_spool(self):
+        spool = open_spool(os.path.join(self.temp_dir.name, "steps.jsonl"))
+        summary = run_testcases([LoginTestCase] * 3, 2, spool)
+        self.assertTrue(summary.success)
+        testcase_summary = summary.testcases[0]
+        # request & response data are only in spool
+        self.assertIsNone(testcase_summary.step_datas[1].data)
+        self.assertEqual(testcase_summary.step_datas[0].export_vars, {"login_path": "/login"})
+
+        step_datas = list(spool.iter_step_datas(testcase_summary.case_id))
+        spool.close()
+        self.assertEqual([step_data["name"] for step_data in step_datas], ["login", "get profile"])
+        self.assertEqual(
+            step_datas[1]["data"]["req_resps"][0]["response"]["body"]["path"],
+            "/profile?from=%2Flogin",
+        )
+
+    def test_runner_releases_spooled_steps(self):
+        spool = open_spool(os.path.join(self.temp_dir.name, "steps.jsonl"))
+        runner = LoginTestCase().with_spool(spool).test_start()
+        spool.close()
+        self.assertTrue(runner.success)
+        # runner instances are kept by pytest until session ends, they hold no responses
+        for step in runner._HttpRunner__teststeps:
+            self.assertNotIn("request", step.variables)
+            self.assertNotIn("response", step.variables)
+            self.assertFalse(
+                any(isinstance(value, ResponseObject) for value in step.variables.values())
+            )
+        self.assertEqual(runner._HttpRunner__session.data.req_resps, [])
+        self.assertTrue(all(step_data.data is None for step_data in runner.get_step_datas()))
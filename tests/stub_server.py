@@ -0,0 +1,117 @@
+""" local stub server shared by tests which run testcases against real HTTP connections.
+"""
+
+import json
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from rrtv_httprunner import HttpRunner, Config, Step, RunRequest
+from rrtv_httprunner.models import ProjectMeta
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+    """ echo path, body and cookie of request in JSON, /login sets session cookie,
+        /slow responds after 0.3 seconds.
+    """
+
+    protocol_version = "HTTP/1.1"
+    # number of /slow requests being handled, and max number of them handled concurrently
+    slow_running = 0
+    max_slow_running = 0
+    lock = threading.Lock()
+
+    def do_request(self):
+        if self.path.startswith("/slow"):
+            with EchoHandler.lock:
+                EchoHandler.slow_running += 1
+                EchoHandler.max_slow_running = max(
+                    EchoHandler.max_slow_running, EchoHandler.slow_running
+                )
+            time.sleep(0.3)
+            with EchoHandler.lock:
+                EchoHandler.slow_running -= 1
+
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode("utf-8") if length else ""
+        content = json.dumps(
+            {"path": self.path, "body": body, "cookie": self.headers.get("Cookie")}
+        ).encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        if self.path.startswith("/login"):
+            self.send_header("Set-Cookie", "session=abc; Path=/")
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = do_POST = do_request
+
+    def log_message(self, *args):
+        pass
+
+
+server = ThreadingHTTPServer(("127.0.0.1", 0), EchoHandler)
+base_url = f"http://127.0.0.1:{server.server_address[1]}"
+threading.Thread(target=server.serve_forever, daemon=True).start()
+
+
+class LoginTestCase(HttpRunner):
+    _HttpRunner__project_meta = ProjectMeta(RootDir=tempfile.gettempdir())
+
+    config = Config("login").base_url(base_url).variables(**{"user": "leo"})
+    teststeps = [
+        Step(
+            RunRequest("login")
+                .post("/login")
+                .with_json({"user": "$user"})
+                .extract()
+                .with_jmespath("body.path", "login_path")
+                .validate()
+                .assert_equal("status_code", 200)
+                .assert_equal("body.body", '{"user": "leo"}')
+        ),
+        Step(
+            RunRequest("get profile")
+                .get("/profile")
+                .with_params(**{"from": "$login_path"})
+                .validate()
+                .assert_equal("body.path", "/profile?from=%2Flogin")
+                .assert_equal("body.cookie", "session=abc")
+        ),
+    ]
+
+
+class ParallelStepsTestCase(HttpRunner):
+    _HttpRunner__project_meta = ProjectMeta(RootDir=tempfile.gettempdir())
+
+    config = Config("parallel steps").base_url(base_url).parallel_steps()
+    teststeps = [
+        Step(
+            RunRequest("login")
+                .get("/login")
+                .extract()
+                .with_jmespath("body.path", "login_path")
+        ),
+    ] + [
+        Step(
+            RunRequest(f"slow {index}")
+                .get(f"/slow/{index}")
+                .with_params(**{"from": "$login_path"})
+                .extract()
+                .with_jmespath("body.path", f"path_{index}")
+                .validate()
+                .assert_equal("body.cookie", "session=abc")
+        )
+        for index in range(3)
+    ] + [
+        Step(
+            RunRequest("summary")
+                .post("/summary")
+                .with_data("$path_0,$path_2")
+                .validate()
+                .assert_equal("body.body", "/slow/0?from=%2Flogin,/slow/2?from=%2Flogin")
+        ),
+    ]
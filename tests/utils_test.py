@@ -148,6 +148,24 @@ class TestUtils(unittest.TestCase):
             ],
         )
 
+    def test_iter_cartesian_product(self):
+        parameters_content_list = [
+            iter([{"a": 1}, {"a": 2}]),
+            [{"x": 111, "y": 112}, {"x": 121, "y": 122}],
+            iter([{"z": 1}]),
+        ]
+        product_iterator = utils.iter_cartesian_product(*parameters_content_list)
+        self.assertEqual(next(product_iterator), {"a": 1, "x": 111, "y": 112, "z": 1})
+        self.assertEqual(
+            list(product_iterator),
+            [
+                {"a": 1, "x": 121, "y": 122, "z": 1},
+                {"a": 2, "x": 111, "y": 112, "z": 1},
+                {"a": 2, "x": 121, "y": 122, "z": 1},
+            ],
+        )
+        self.assertEqual(list(utils.iter_cartesian_product()), [])
+
     def test_cartesian_product_empty(self):
         parameters_content_list = []
         product_list = utils.gen_cartesian_product(*parameters_content_list)